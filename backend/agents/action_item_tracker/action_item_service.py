@@ -1,19 +1,52 @@
-import json
-import os
-from datetime import datetime
-from lib.database import update_minutes_with_action_items
+import time
+from lib.database import save_action_items_bulk
 
-def save_action_items(minutes_id: str, action_items: list):
+def save_action_items(user_id: str, minutes_id: str, action_items: list) -> list:
     """
-    Updates a minutes document in MongoDB with the extracted action items.
-    
+    Saves extracted action items to the action_items collection and to the
+    minutes document in one batch, so the two never drift apart.
+
     Args:
+        user_id (str): The owner of the minutes.
         minutes_id (str): The MongoDB document _id for the minutes.
         action_items (list): The list of action items to save.
+
+    Returns:
+        list: The saved action items with their string `_id`s.
     """
     if not minutes_id:
         print("⚠️ Cannot save action items: minutes_id is missing.")
-        return None
-    
-    modified_count = update_minutes_with_action_items(minutes_id, action_items)
-    return modified_count
\ No newline at end of file
+        return []
+
+    saved_items = save_action_items_bulk(action_items, user_id, minutes_id)
+    print(f"📝 Saved {len(saved_items)} action items for minutes {minutes_id}.")
+    return saved_items
+
+# Benchmark against the configured MongoDB:
+#   python -m agents.action_item_tracker.action_item_service
+if __name__ == "__main__":
+    import uuid
+    from lib.database import get_db, save_action_item
+
+    db = get_db()
+    bench_user = f"bench_action_items_{uuid.uuid4().hex}"
+    minutes_id = str(db.minutes.insert_one({"user_id": bench_user, "action_items": []}).inserted_id)
+
+    def make_items(count):
+        return [{"task": f"Task {i}", "owner": "Alex", "deadline": "2025-09-10", "duration": 60} for i in range(count)]
+
+    try:
+        print(f"{'items':>6} {'per-item (ms)':>14} {'bulk (ms)':>10}")
+        for count in (1, 10, 50, 200):
+            started_at = time.perf_counter()
+            for item in make_items(count):
+                save_action_item(item, bench_user, minutes_id)
+            per_item_ms = (time.perf_counter() - started_at) * 1000
+
+            started_at = time.perf_counter()
+            save_action_items(bench_user, minutes_id, make_items(count))
+            bulk_ms = (time.perf_counter() - started_at) * 1000
+            print(f"{count:>6} {per_item_ms:>14.1f} {bulk_ms:>10.1f}")
+    finally:
+        db.action_items.delete_many({"user_id": bench_user})
+        db.minutes.delete_many({"user_id": bench_user})
@@ -3,9 +3,9 @@ import os
 from dotenv import load_dotenv
 import json
 import re
-import time
-import random
-from google.api_core.exceptions import ResourceExhausted
+from typing import TypedDict
+from lib.rate_limiter import call_gemini, estimate_tokens
+from lib.llm_cache import cached_llm_call, llm_cache_key
 
 load_dotenv()
 # Corrected to use GOOGLE_API_KEY from your .env file
@@ -15,9 +15,21 @@ if not api_key:
 genai.configure(api_key=api_key)
 
 # Using a valid model from the list you provided.
-model = genai.GenerativeModel("gemini-2.0-flash-exp") # Using the latest flash model
+MODEL_NAME = "gemini-2.0-flash-exp"
+model = genai.GenerativeModel(MODEL_NAME) # Using the latest flash model
 
-def clean_json_output(raw_output: str):
+# Bump a template's version when its prompt changes so cached responses are not reused
+PROMPT_VERSIONS = {
+    "action_items": "v1",
+    "summary": "v1",
+    "decisions": "v1",
+    "future_topics": "v1",
+    "minutes_content": "v1",
+    "minutes_reduce": "v1",
+}
+
+def parse_json_output(raw_output: str):
+    """Parses a JSON reply, tolerating a ```json fence or text around a list. Raises ValueError if there is no JSON."""
     try:
         # The response might be wrapped in ```json ... ```, remove it.
         if raw_output.strip().startswith("```json"):
@@ -26,66 +38,125 @@ def clean_json_output(raw_output: str):
     except json.JSONDecodeError:
         # Fallback for cases where the output is not perfect JSON
         match = re.search(r"\[.*]", raw_output, re.DOTALL)
-        if match:
-            try:
-                return json.loads(match.group())
-            except json.JSONDecodeError:
-                 return [{"error": "Failed to parse cleaned JSON", "raw": match.group()}]
+        if not match:
+            raise
+        return json.loads(match.group())
+
+def clean_json_output(raw_output: str):
+    try:
+        return parse_json_output(raw_output)
+    except json.JSONDecodeError:
         return [{"error": "Failed to parse JSON", "raw": raw_output}]
 
+def parses(parse):
+    """Returns a cache validator accepting the responses `parse` can handle."""
+    def validate(raw: str) -> bool:
+        try:
+            parse(raw)
+            return True
+        except ValueError:
+            return False
+    return validate
+
 # --- NEW: Helper function to handle API calls with retries ---
-def generate_with_retry(prompt: str, max_retries: int = 3):
+def generate_with_retry(prompt: str, max_retries: int = 3, generation_config: dict = None):
     """
-    Calls the Gemini API with a prompt and implements exponential backoff for rate limit errors.
+    Calls the Gemini API with a prompt through the shared rate limiter, which
+    queues the call for RPM/TPM budget and handles rate limit retries.
     """
-    base_delay = 5  # seconds
-    for attempt in range(max_retries):
-        try:
-            print(f"🤖 Calling AI model (Attempt {attempt + 1}/{max_retries})...")
-            response = model.generate_content(prompt)
-            return response # Success
-        except ResourceExhausted as e:
-            print(f"Attempt {attempt + 1} failed with ResourceExhausted: {e}")
-            if attempt < max_retries - 1:
-                # Calculate wait time with jitter (randomness)
-                wait_time = base_delay * (2 ** attempt) + random.uniform(0, 1)
-                print(f"Rate limit exceeded. Retrying in {wait_time:.2f} seconds...")
-                time.sleep(wait_time)
-            else:
-                print("Max retries reached. AI call failed.")
-                # Re-raise the exception if all retries fail
-                raise e
-        except Exception as e:
-            print(f"An unexpected error occurred during AI call: {e}")
-            raise e
-
-def extract_action_items(meeting_text:str):
+    def call():
+        print("🤖 Calling AI model...")
+        return model.generate_content(prompt, generation_config=generation_config)
+
+    try:
+        return call_gemini(call, estimated_tokens=2 * estimate_tokens(prompt), max_retries=max_retries)
+    except Exception as e:
+        print(f"AI call failed: {e}")
+        raise e
+
+def generate_text_cached(template: str, text: str, prompt: str, generation_config: dict = None, use_cache: bool = True, parse=None) -> str:
+    """
+    Returns the response text for `prompt`, built from `template` applied to
+    `text`, reusing a cached response for the same model, template version and
+    input. Pass use_cache=False to force a fresh call. With `parse`, only
+    responses it can parse are cached.
+    """
+    name = template.split(":")[0]
+    key = llm_cache_key(MODEL_NAME, f"{template}:{PROMPT_VERSIONS[name]}", text, generation_config)
+    return cached_llm_call(key, lambda: generate_with_retry(prompt, generation_config=generation_config).text, use_cache=use_cache, validate=parse and parses(parse))
+
+def extract_action_items(meeting_text:str, use_cache: bool = True):
     prompt = f"""
     Extract action items from this meeting. Respond ONLY with a JSON list of objects.
     Each object must have: "owner", "task", and "deadline" (if any, otherwise null).
     Meeting text: {meeting_text}
     """
-    # --- MODIFIED: Use the retry helper ---
-    response = generate_with_retry(prompt)
-    return clean_json_output(response.text)
+    return clean_json_output(generate_text_cached("action_items", meeting_text, prompt, use_cache=use_cache, parse=parse_json_output))
 
-def generate_summary_gemini(text: str) -> str:
+def generate_summary_gemini(text: str, use_cache: bool = True) -> str:
     prompt = f"Summarize the following text:\n{text}"
-    # --- MODIFIED: Use the retry helper ---
-    response = generate_with_retry(prompt)
-    return response.text.strip()
+    return generate_text_cached("summary", text, prompt, use_cache=use_cache).strip()
 
-def extract_key_decisions_gemini(text: str) -> list:
+def extract_key_decisions_gemini(text: str, use_cache: bool = True) -> list:
     prompt = f"Extract key decisions from the following text. Respond with a JSON list of strings. For example: [\"Decision one\", \"Decision two\"]\n\nText: {text}"
-    # --- MODIFIED: Use the retry helper ---
-    response = generate_with_retry(prompt)
-    return clean_json_output(response.text)
+    return clean_json_output(generate_text_cached("decisions", text, prompt, use_cache=use_cache, parse=parse_json_output))
 
-def extract_future_topics_gemini(text: str) -> list:
+def extract_future_topics_gemini(text: str, use_cache: bool = True) -> list:
     prompt = f"Extract future discussion topics from the following text. Respond with a JSON list of strings. For example: [\"Topic one\", \"Topic two\"]\n\nText: {text}"
-    # --- MODIFIED: Use the retry helper ---
-    response = generate_with_retry(prompt)
-    return clean_json_output(response.text)
+    return clean_json_output(generate_text_cached("future_topics", text, prompt, use_cache=use_cache, parse=parse_json_output))
+
+class MinutesContent(TypedDict):
+    summary: str
+    decisions: list[str]
+    future_discussion_points: list[str]
+
+_MINUTES_JSON_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_schema": MinutesContent,
+}
+
+def _parse_minutes_content(raw: str) -> dict:
+    content = json.loads(raw)
+    if not isinstance(content, dict):
+        raise ValueError(f"Expected a JSON object for minutes content, got {type(content).__name__}")
+    return {
+        "summary": (content.get("summary") or "").strip(),
+        "decisions": content.get("decisions") or [],
+        "future_discussion_points": content.get("future_discussion_points") or [],
+    }
+
+def generate_minutes_content_gemini(text: str, part: str = None, use_cache: bool = True) -> dict:
+    """
+    Extracts the summary, key decisions and future discussion topics in a single
+    schema-constrained call, so the transcript is only sent (and billed) once.
+    `part` (e.g. "3 of 8") marks the text as one section of a longer meeting.
+    Sections are cached by their text alone, so a section that only moved
+    (e.g. after an edit earlier in the transcript) is not summarized again.
+    """
+    source = f"section {part} of a longer meeting transcript" if part else "meeting transcript"
+    prompt = (
+        f"You are writing meeting minutes. From the {source} below, produce:\n"
+        "- summary: a concise summary of the meeting\n"
+        "- decisions: the key decisions that were made\n"
+        "- future_discussion_points: topics to discuss at a future meeting\n\n"
+        f"Transcript: {text}"
+    )
+    template = "minutes_content:part" if part else "minutes_content"
+    return _parse_minutes_content(generate_text_cached(template, text, prompt, _MINUTES_JSON_CONFIG, use_cache=use_cache, parse=_parse_minutes_content))
+
+def reduce_minutes_content_gemini(partials: list, use_cache: bool = True) -> dict:
+    """
+    Merges minutes produced for consecutive sections of one meeting into a
+    single summary with de-duplicated decisions and future topics.
+    """
+    sections = json.dumps(partials)
+    prompt = (
+        "The following JSON list holds minutes written for consecutive sections of one meeting, in order. "
+        "Merge them into minutes for the whole meeting: one coherent summary, and the decisions and "
+        "future_discussion_points with duplicates merged and superseded items removed.\n\n"
+        f"Sections: {sections}"
+    )
+    return _parse_minutes_content(generate_text_cached("minutes_reduce", sections, prompt, _MINUTES_JSON_CONFIG, use_cache=use_cache, parse=_parse_minutes_content))
 
 ###########################################################
 #Sample Output
@@ -1,58 +1,120 @@
 import os
+import time
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
-import dateparser
+from googleapiclient.errors import HttpError
+from googleapiclient.http import BatchHttpRequest
 from lib.database import get_google_credentials, save_google_credentials
+from lib.deadlines import parse_datetime
 
 SCOPES = ['https://www.googleapis.com/auth/calendar']
 
-def get_calendar_service(user_id: str):
-    """
-    Builds a user-specific Google Calendar service object.
-    It fetches credentials from the database for the given user_id.
-    """
+# --- Cached Calendar Services ---
+# Building a Calendar service parses the discovery document, and loading it
+# reads (and possibly refreshes) the user's credentials. Services are cached per
+# user for CALENDAR_SERVICE_TTL_SECONDS; a per-user lock means concurrent
+# callers share one build and one token refresh. The lock is also held while a
+# service is in use, because the underlying httplib2 client is not thread-safe.
+CALENDAR_SERVICE_TTL_SECONDS = float(os.getenv("CALENDAR_SERVICE_TTL_SECONDS", "1800"))
+CALENDAR_BATCH_SIZE = 50  # Calendar API limit for requests per batch
+# Point the client at another server (e.g. a local stub) instead of googleapis.com
+CALENDAR_API_ENDPOINT = os.getenv("GOOGLE_CALENDAR_API_ENDPOINT")
+CALENDAR_TIMEZONE = 'Asia/Colombo'
+
+_services = {}  # user_id -> (service, credentials, built_at)
+_user_locks = {}
+_user_locks_guard = threading.Lock()
+
+def _user_lock(user_id: str) -> threading.Lock:
+    with _user_locks_guard:
+        return _user_locks.setdefault(user_id, threading.Lock())
+
+def _load_calendar_service(user_id: str):
+    """Loads credentials from the database, refreshing them if needed, and builds a service."""
     creds_info = get_google_credentials(user_id)
     if not creds_info or "credentials" not in creds_info:
         print(f"No Google credentials found for user {user_id}")
-        return None
+        return None, None
 
     creds = Credentials.from_authorized_user_info(creds_info["credentials"], SCOPES)
+    if not _ensure_valid(user_id, creds):
+        return None, None
 
-    if not creds.valid:
-        if creds.expired and creds.refresh_token:
-            print(f"Refreshing expired token for user {user_id}")
-            creds.refresh(Request())
-            
-            # --- THE CORRECT FIX: Pass the flat credentials dictionary directly ---
-            # The save_google_credentials function in database.py handles nesting it.
-            save_google_credentials(user_id, {
-                'token': creds.token,
-                'refresh_token': creds.refresh_token,
-                'token_uri': creds.token_uri,
-                'client_id': creds.client_id,
-                'client_secret': creds.client_secret,
-                'scopes': creds.scopes
-            })
-        else:
-            # This case should ideally trigger a re-authentication flow
-            print(f"Credentials for user {user_id} are invalid and cannot be refreshed.")
-            return None
-            
-    return build('calendar', 'v3', credentials=creds)
+    client_options = {"api_endpoint": CALENDAR_API_ENDPOINT} if CALENDAR_API_ENDPOINT else None
+    service = build('calendar', 'v3', credentials=creds, client_options=client_options, cache_discovery=False)
+    return service, creds
 
-def schedule_action_item(user_id: str, task_name: str, description: str, deadline_str: str, owner: str, duration_minutes: int = 60):
-    print(f"Scheduling Google Calendar event for user {user_id}: {task_name}")
-    service = get_calendar_service(user_id)
-    
-    if not service:
-        print(f"Cannot schedule event for user {user_id}, calendar service not available.")
-        return None
-
-    # Parse deadline_str as full datetime (date + time)
-    deadline = dateparser.parse(deadline_str, settings={'PREFER_DATES_FROM': 'future'})
+def _ensure_valid(user_id: str, creds: Credentials) -> bool:
+    """Refreshes expired credentials and saves the new token. Returns False if they are unusable."""
+    if creds.valid:
+        return True
+    if creds.expired and creds.refresh_token:
+        print(f"Refreshing expired token for user {user_id}")
+        creds.refresh(Request())
+
+        # --- THE CORRECT FIX: Pass the flat credentials dictionary directly ---
+        # The save_google_credentials function in database.py handles nesting it.
+        save_google_credentials(user_id, {
+            'token': creds.token,
+            'refresh_token': creds.refresh_token,
+            'token_uri': creds.token_uri,
+            'client_id': creds.client_id,
+            'client_secret': creds.client_secret,
+            'scopes': creds.scopes,
+            # Without the expiry, every process that loads these credentials refreshes them again
+            'expiry': creds.expiry.isoformat() + 'Z' if creds.expiry else None,
+        })
+        return True
+    # This case should ideally trigger a re-authentication flow
+    print(f"Credentials for user {user_id} are invalid and cannot be refreshed.")
+    return False
+
+def _get_service_locked(user_id: str):
+    entry = _services.get(user_id)
+    if entry and time.monotonic() - entry[2] < CALENDAR_SERVICE_TTL_SECONDS:
+        service, creds, _ = entry
+        # The service holds the credentials object, so a refresh applies in place
+        if _ensure_valid(user_id, creds):
+            return service
+    _services.pop(user_id, None)
+
+    service, creds = _load_calendar_service(user_id)
+    if service:
+        _services[user_id] = (service, creds, time.monotonic())
+    return service
+
+@contextmanager
+def calendar_session(user_id: str):
+    """Yields the user's cached Calendar service (or None), holding it for exclusive use."""
+    with _user_lock(user_id):
+        yield _get_service_locked(user_id)
+
+def get_calendar_service(user_id: str):
+    """
+    Returns a user-specific Google Calendar service object, built from the
+    credentials stored for user_id. Prefer calendar_session() when the service
+    may be used from several threads.
+    """
+    with _user_lock(user_id):
+        return _get_service_locked(user_id)
+
+def forget_calendar_service(user_id: str):
+    """Drops the cached service, e.g. after the user reconnects or disconnects Google Calendar."""
+    # No user lock: this is called from the event loop and must not wait for a batch in flight
+    _services.pop(user_id, None)
+
+def build_event(task_name: str, description: str, deadline_str: str, owner: str, duration_minutes: int = 60, event_id: str = None) -> dict:
+    """
+    Builds the Calendar event body for a task due at deadline_str. A fixed
+    event_id (lowercase hex is valid) makes inserting the event idempotent.
+    """
+    # Parse deadline_str as full datetime (date + time); normalized deadlines are ISO
+    deadline = parse_datetime(deadline_str, prefer_future=True)
     if not deadline:
         deadline = datetime.now() + timedelta(days=2)
     # Do NOT override hour/minute here!
@@ -62,10 +124,64 @@ def schedule_action_item(user_id: str, task_name: str, description: str, deadlin
     event = {
         'summary': f"{task_name} ({owner})",
         'description': description,
-        'start': {'dateTime': start_time.isoformat(), 'timeZone': 'Asia/Colombo'},
-        'end': {'dateTime': end_time.isoformat(), 'timeZone': 'Asia/Colombo'},
+        'start': {'dateTime': start_time.isoformat(), 'timeZone': CALENDAR_TIMEZONE},
+        'end': {'dateTime': end_time.isoformat(), 'timeZone': CALENDAR_TIMEZONE},
     }
+    if event_id:
+        event['id'] = event_id
+    return event
+
+def _new_batch(service, callback) -> BatchHttpRequest:
+    if CALENDAR_API_ENDPOINT:
+        # new_batch_http_request() always targets the discovery document's rootUrl
+        return BatchHttpRequest(callback=callback, batch_uri=f"{CALENDAR_API_ENDPOINT.rstrip('/')}/batch/calendar/v3")
+    return service.new_batch_http_request(callback=callback)
+
+def schedule_action_item(user_id: str, task_name: str, description: str, deadline_str: str, owner: str, duration_minutes: int = 60):
+    print(f"Scheduling Google Calendar event for user {user_id}: {task_name}")
+    with calendar_session(user_id) as service:
+        if not service:
+            print(f"Cannot schedule event for user {user_id}, calendar service not available.")
+            return None
 
-    created_event = service.events().insert(calendarId='primary', body=event).execute()
+        event = build_event(task_name, description, deadline_str, owner, duration_minutes)
+        created_event = service.events().insert(calendarId='primary', body=event).execute()
     print(f"Event created: {created_event.get('htmlLink')}")
     return created_event
+
+def schedule_action_items(user_id: str, items: list) -> list:
+    """
+    Creates one Calendar event per item using batch requests (up to
+    CALENDAR_BATCH_SIZE events per HTTP round trip). Each item holds the
+    keyword arguments of build_event(). Returns the created events in item
+    order, with None for any event that failed.
+    """
+    results = [None] * len(items)
+    if not items:
+        return results
+
+    def on_response(request_id, response, exception):
+        index = int(request_id)
+        if exception is None:
+            results[index] = response
+        elif isinstance(exception, HttpError) and exception.resp.status == 409 and items[index].get("event_id"):
+            # Created by an earlier attempt of the same run
+            results[index] = {"id": items[index]["event_id"]}
+        else:
+            print(f"Failed to create Calendar event {request_id}: {exception}")
+
+    print(f"Scheduling {len(items)} Google Calendar events for user {user_id}")
+    with calendar_session(user_id) as service:
+        if not service:
+            print(f"Cannot schedule events for user {user_id}, calendar service not available.")
+            return results
+
+        for start in range(0, len(items), CALENDAR_BATCH_SIZE):
+            batch = _new_batch(service, on_response)
+            for index, item in enumerate(items[start:start + CALENDAR_BATCH_SIZE], start):
+                batch.add(service.events().insert(calendarId='primary', body=build_event(**item)), request_id=str(index))
+            batch.execute()
+
+    created = sum(1 for event in results if event)
+    print(f"Created {created}/{len(items)} Calendar events for user {user_id}")
+    return results
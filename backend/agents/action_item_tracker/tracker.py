@@ -1,14 +1,17 @@
 import os
+import hashlib
 from .ai_providers import gemini_provider
-from .calendar_service import schedule_action_item
+from .calendar_service import schedule_action_items
 from .agenda_service import read_agenda
 from .action_item_service import save_action_items
 from ..agenda_planner.agenda_planner import generate_agenda
 import nltk
 from datetime import datetime, timedelta
-import dateparser
 # NEW: Import the function to get a specific minutes document
-from lib.database import get_minutes_by_id, save_action_item, get_google_credentials
+from lib.database import get_minutes_by_id, get_google_credentials, get_action_items_for_minutes
+from lib.deadlines import normalize_deadline
+from lib.dag import Stage, run_dag
+from lib.executors import get_stage_executor
 from .ai_providers.gemini_provider import extract_action_items
 
 # The NLTK download logic has been moved to a central setup file (lib/nltk_setup.py)
@@ -30,28 +33,20 @@ def run_action_item_tracker(meeting_text: str):
         "action_items": gemini_provider.extract_action_items(meeting_text)
     }
 
-def extract_action_items_nlp(meeting_text: str):
+def extract_action_items_nlp(meeting_text: str, use_cache: bool = True):
     """
     Extracts action items using the Gemini API.
     """
     return {
         "provider": "Gemini",
-        "action_items": extract_action_items(meeting_text),
+        "action_items": extract_action_items(meeting_text, use_cache=use_cache),
     }
 
-def extract_and_schedule_tasks(user_id: str, minutes_id: str, schedule=True):
+def prepare_action_items(minutes_doc: dict, use_cache: bool = True) -> dict:
     """
-    Reads a specific minutes document, extracts action items, and schedules them.
+    Extracts action items from a minutes document and assigns their deadlines
+    and durations. Returns the extraction result ({"provider", "action_items"}).
     """
-    print("\n--- 🚀 Starting Action Item Tracker ---")
-    
-    # Step 1: Fetch the minutes document
-    print(f"[DEBUG] Fetching minutes document with ID: {minutes_id} for user: {user_id}")
-    minutes_doc = get_minutes_by_id(minutes_id, user_id)
-    if not minutes_doc:
-        print(f"[ERROR] Minutes document not found. ID: {minutes_id}, User: {user_id}")
-        return None
-
     # Step 2: Combine summary and decisions for context
     summary_text = minutes_doc.get("summary", "")
     decisions_text = " ".join(minutes_doc.get("decisions", []))
@@ -60,7 +55,7 @@ def extract_and_schedule_tasks(user_id: str, minutes_id: str, schedule=True):
 
     # Step 3: Extract action items
     print("[DEBUG] Extracting action items...")
-    result = extract_action_items_nlp(meeting_text)
+    result = extract_action_items_nlp(meeting_text, use_cache=use_cache)
     action_items = result.get("action_items", [])
     print(f"[DEBUG] Extracted {len(action_items)} action items.")
 
@@ -79,51 +74,109 @@ def extract_and_schedule_tasks(user_id: str, minutes_id: str, schedule=True):
             else:
                 item["deadline"] = (datetime.now() + timedelta(days=7)).strftime('%Y-%m-%d')
             print(f"[DEBUG] No deadline from AI. Assigned fallback deadline: {item['deadline']}")
+
+        # Resolve relative deadlines ("Friday", "next week") once, against the meeting date
+        normalized = normalize_deadline(item["deadline"], meeting_date)
+        if normalized and normalized != item["deadline"]:
+            item["deadline_text"] = item["deadline"]
+            item["deadline"] = normalized
         
         item["duration"] = 60  # Default duration
         print(f"[DEBUG] Action item {idx + 1}: {item}")
+    return result
 
-    # Step 5: Schedule action items (if enabled)
-    if schedule:
-        # --- THE FIX: Check for credentials BEFORE trying to schedule ---
-        print("[DEBUG] Checking for Google Calendar integration...")
-        if not get_google_credentials(user_id):
-            print("[WARN] Google Calendar not connected for this user. Skipping scheduling.")
-        else:
-            print("[DEBUG] Google Calendar connected. Proceeding with scheduling action items...")
-            for idx, item in enumerate(action_items):
-                task = item.get("task")
-                owner = item.get("owner")
-                deadline = item.get("deadline")
-                duration = item.get("duration")
-                print(f"[DEBUG] Scheduling task {idx + 1}: {task}, Owner: {owner}, Deadline: {deadline}, Duration: {duration} minutes")
-                schedule_action_item(
-                    user_id=user_id,
-                    task_name=task,
-                    description=f"Action item assigned to {owner}",
-                    deadline_str=deadline,
-                    owner=owner,
-                    duration_minutes=duration
-                )
-
-    # Step 6: Save action items to the database
-    print("[DEBUG] Saving action items to the database...")
-    saved_items = []
-    for item in action_items:
-        saved_item = save_action_item(item, user_id, minutes_doc["_id"])
-        saved_items.append(saved_item)
-        print(f"[DEBUG] Saved action item: {saved_item.get('task')} with ID: {saved_item.get('_id')}")
-
-    # Step 7: Generate the next agenda
-    if minutes_doc.get("next_meeting_date"):
-        print("[DEBUG] Generating next agenda...")
-        next_meeting_input = {
-            "topics": minutes_doc.get("future_discussion_points", ["Review previous action items"]),
-            "discussion_points": [],
-            "date": minutes_doc.get("next_meeting_date")
+def schedule_in_calendar(user_id: str, action_items: list, idempotency_key: str = None):
+    """
+    Step 5: Creates Google Calendar events for the action items, if the user
+    connected a calendar. With an idempotency_key, event IDs are derived from
+    it, so a repeated run does not create the same events twice.
+    """
+    # --- THE FIX: Check for credentials BEFORE trying to schedule ---
+    print("[DEBUG] Checking for Google Calendar integration...")
+    if not get_google_credentials(user_id):
+        print("[WARN] Google Calendar not connected for this user. Skipping scheduling.")
+        return None
+    if not action_items:
+        return []
+    print(f"[DEBUG] Google Calendar connected. Scheduling {len(action_items)} action items in one batch...")
+    return schedule_action_items(user_id, [
+        {
+            "task_name": item.get("task"),
+            "description": f"Action item assigned to {item.get('owner')}",
+            "deadline_str": item.get("deadline"),
+            "owner": item.get("owner"),
+            "duration_minutes": item.get("duration"),
+            "event_id": hashlib.sha1(f"{idempotency_key}:{idx}".encode()).hexdigest() if idempotency_key else None,
         }
-        new_agenda = generate_agenda(next_meeting_input, user_id=user_id)
-        print(f"[DEBUG] Next agenda generated with ID: {new_agenda.get('meeting_id')}")
+        for idx, item in enumerate(action_items)
+    ])
+
+def generate_next_agenda(user_id: str, minutes_doc: dict):
+    """Step 7: Generates the agenda for the next meeting, if the minutes name a date for it."""
+    if not minutes_doc.get("next_meeting_date"):
+        return None
+    print("[DEBUG] Generating next agenda...")
+    next_meeting_input = {
+        "topics": minutes_doc.get("future_discussion_points", ["Review previous action items"]),
+        "discussion_points": [],
+        "date": minutes_doc.get("next_meeting_date")
+    }
+    new_agenda = generate_agenda(next_meeting_input, user_id=user_id)
+    print(f"[DEBUG] Next agenda generated with ID: {new_agenda.get('meeting_id')}")
+    return new_agenda.get("meeting_id")
+
+def save_action_items_once(user_id: str, minutes_id: str, action_items: list) -> list:
+    """Step 6 for a resumed run: keeps the items an earlier attempt already saved for these minutes."""
+    existing = get_action_items_for_minutes(user_id, minutes_id)
+    if existing:
+        print(f"[DEBUG] {len(existing)} action items already saved for minutes {minutes_id}.")
+        return existing
+    return save_action_items(user_id, minutes_id, action_items)
+
+def action_item_stages(user_id: str, schedule: bool = True, use_cache: bool = True, idempotency_key: str = None) -> list:
+    """
+    The tracker's pipeline stages, to run with lib.dag.run_dag after a stage
+    named "minutes" that returns the minutes document. Scheduling, saving and
+    the next agenda only depend on the minutes and the extracted items, so
+    they run concurrently. An idempotency_key makes saving and scheduling safe
+    to repeat for the same minutes.
+    """
+    save = save_action_items_once if idempotency_key else save_action_items
+
+    def minutes(results):
+        return results["minutes"]
+
+    def items(results):
+        return results["extract_action_items"]["action_items"]
+
+    stages = [
+        Stage("extract_action_items", lambda r: prepare_action_items(minutes(r), use_cache), deps=("minutes",)),
+        # Step 6: Save action items to the database (one batch, mirrored onto the minutes)
+        Stage("save_action_items", lambda r: save(user_id, minutes(r)["_id"], [dict(item) for item in items(r)]), deps=("extract_action_items",)),
+        Stage("next_agenda", lambda r: generate_next_agenda(user_id, minutes(r)), deps=("minutes",)),
+    ]
+    if schedule:
+        stages.append(Stage("schedule_calendar", lambda r: schedule_in_calendar(user_id, items(r), idempotency_key and f"{idempotency_key}:{minutes(r)['_id']}"), deps=("extract_action_items",)))
+    return stages
+
+def extract_and_schedule_tasks(user_id: str, minutes_id: str, schedule=True, use_cache: bool = True):
+    """
+    Reads a specific minutes document, extracts action items, and schedules them.
+    """
+    print("\n--- 🚀 Starting Action Item Tracker ---")
+    
+    # Step 1: Fetch the minutes document
+    print(f"[DEBUG] Fetching minutes document with ID: {minutes_id} for user: {user_id}")
+    minutes_doc = get_minutes_by_id(minutes_id, user_id)
+    if not minutes_doc:
+        print(f"[ERROR] Minutes document not found. ID: {minutes_id}, User: {user_id}")
+        return None
+
+    stages = [Stage("minutes", lambda r: minutes_doc)] + action_item_stages(user_id, schedule, use_cache)
+    # Called on the AI pool; stages go to the shared stage pool so concurrent requests stay bounded
+    results = run_dag(stages, executor=get_stage_executor(), on_stage=lambda name, timing: print(f"[DEBUG] Stage '{name}' {timing['status']} in {timing['seconds']}s"))
+    result = results["extract_action_items"]
+    result["action_items"] = results["save_action_items"]
 
     print("--- ✅ Action Item Tracker Completed ---")
     return result
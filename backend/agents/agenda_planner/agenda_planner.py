@@ -5,13 +5,11 @@ from .utils import (
 )
 from lib.database import save_agenda
 from datetime import datetime
-from transformers import pipeline
-
-# 🧠 Initialize AI models once to be reused.
-# This prevents reloading large models on every function call.
-priority_classifier = pipeline("zero-shot-classification", model="facebook/bart-large-mnli")
-# ✨ NEW: Add a summarization model for generating meeting titles
-summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
+from .priority_classifier import classify_priorities
+# 🧠 AI models are loaded on first use (or served by the shared model server)
+# so importing this module stays cheap.
+from .models import get_priority_classifier, get_summarizer
+from .topic_cache import topic_cache, title_cache, topic_key, title_key
 
 
 def assign_priority(topic):
@@ -19,16 +17,31 @@ def assign_priority(topic):
     Assign priority based on the semantic meaning of the topic using an AI model.
     """
     print(f"🤖 Analyzing topic for priority: '{topic}'")
-    candidate_labels = ["urgent issue", "strategic discussion", "general information"]
-    result = priority_classifier(topic, candidate_labels)
-    top_label = result['labels'][0]
-
-    if "urgent" in top_label:
-        return "urgent"
-    elif "discussion" in top_label:
-        return "discussion"
-    else:
-        return "info"
+    return classify_priorities(get_priority_classifier(), [topic])[0]
+
+def assign_priorities(topics):
+    """
+    Assign priorities to all topics in one batched classifier call.
+    """
+    print(f"🤖 Analyzing {len(topics)} topics for priority...")
+    return classify_priorities(get_priority_classifier(), topics)
+
+def analyze_topics(topics):
+    """
+    Returns (short_topic, priority) for each topic. Topics seen before are
+    served from the topic cache; the rest are classified in one batch.
+    """
+    keys = [topic_key(topic) for topic in topics]
+    results = [topic_cache.get(key) for key in keys]
+    missing = [i for i, result in enumerate(results) if result is None]
+    print(f"♻️ {len(topics) - len(missing)}/{len(topics)} agenda topics served from cache.")
+    if missing:
+        priorities = assign_priorities([topics[i] for i in missing])
+        for i, priority in zip(missing, priorities):
+            short_topics = extract_keywords_rake(topics[i], top_n=1) or [topics[i]]
+            results[i] = {"short_topic": short_topics[0].title(), "priority": priority}
+            topic_cache.set(keys[i], results[i])
+    return [(result["short_topic"], result["priority"]) for result in results]
 
 def allocate_time(priority):
     """Allocate time based on priority"""
@@ -48,12 +61,24 @@ def generate_meeting_name_ai(text):
 
     print(f"🤖 Generating meeting name with AI from topics...")
     # Generate a summary. We ask for a very short one (3-10 words).
-    result = summarizer(text, max_length=10, min_length=3, do_sample=False)
+    result = get_summarizer()(text, max_length=10, min_length=3, do_sample=False)
     
     # Extract and clean up the title
     title = result[0]['summary_text'].strip()
     return title.title() # Capitalize words for a proper title
 
+def generate_meeting_name(topics):
+    """
+    Returns the meeting name for a set of topics, reusing the cached title
+    when the same topics were seen before.
+    """
+    key = title_key(topics)
+    title = title_cache.get(key)
+    if title is None:
+        title = generate_meeting_name_ai(". ".join(topics))
+        title_cache.set(key, title)
+    return title
+
 def generate_agenda(user_input=None, user_id="user_placeholder_123"):
     """
     Generate structured agenda JSON.
@@ -74,10 +99,7 @@ def generate_agenda(user_input=None, user_id="user_placeholder_123"):
 
     # 3️⃣ Generate agenda items
     agenda_items = []
-    for topic in all_topics:
-        short_topics = extract_keywords_rake(topic, top_n=1) or [topic]
-        short_topic = short_topics[0].title()
-        priority = assign_priority(topic)
+    for short_topic, priority in analyze_topics(all_topics):
         time_alloc = allocate_time(priority)
 
         agenda_items.append({
@@ -88,11 +110,11 @@ def generate_agenda(user_input=None, user_id="user_placeholder_123"):
 
     # 4️⃣ Generate meeting name using the new AI function ✨
     # We combine the main 'topics' to give the AI the most important context.
-    title_source_text = ". ".join(user_input.get("topics", []))
-    if not title_source_text.strip(): # Fallback to discussion points if no topics
-        title_source_text = ". ".join(user_input.get("discussion_points", []))
+    title_topics = user_input.get("topics", [])
+    if not ". ".join(title_topics).strip(): # Fallback to discussion points if no topics
+        title_topics = user_input.get("discussion_points", [])
 
-    meeting_name = generate_meeting_name_ai(title_source_text)
+    meeting_name = generate_meeting_name(title_topics)
 
     # 5️⃣ Build final agenda JSON
     agenda_json = {
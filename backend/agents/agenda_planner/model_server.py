@@ -0,0 +1,86 @@
+import os
+import argparse
+import threading
+from multiprocessing.connection import Listener, AuthenticationError, deliver_challenge, answer_challenge
+from .models import LOADERS, MODEL_SERVER_ADDRESS, get_model_server_authkey, parse_address
+
+# --- Shared model server ---
+# Hosts the agenda planner's BART pipelines in one process so API workers do
+# not each hold a copy. Start it next to the API:
+#   python -m agents.agenda_planner.model_server --address /tmp/minuteme-models.sock
+# and run the API with MODEL_SERVER_ADDRESS set to the same address. Both need
+# the same MODEL_SERVER_AUTHKEY; the server refuses to start without one.
+# Each connection carries one (model name, args, kwargs) request. Requests for
+# the same model run one at a time; different models run concurrently. The
+# authkey handshake runs on the connection's own thread, so a stalled client
+# cannot hold up the accept loop.
+DEFAULT_ADDRESS = "/tmp/minuteme-models.sock"
+
+class ModelServer:
+    def __init__(self, address: str, preload: bool = True):
+        self.address = parse_address(address)
+        self.authkey = get_model_server_authkey()
+        self._models = {}
+        self._locks = {name: threading.Lock() for name in LOADERS}
+        if preload:
+            for name in LOADERS:
+                self._get(name)
+
+    def _get(self, name: str):
+        if name not in self._models:
+            print(f"🧠 Loading '{name}' model...")
+            self._models[name] = LOADERS[name]()
+        return self._models[name]
+
+    def _authenticate(self, conn) -> bool:
+        """The handshake Listener.accept() does when given an authkey (both sides prove the key)."""
+        try:
+            deliver_challenge(conn, self.authkey)
+            answer_challenge(conn, self.authkey)
+            return True
+        except (AuthenticationError, EOFError, OSError) as e:  # e.g. a client with the wrong authkey
+            print(f"⚠️ Rejected model server connection: {e}")
+            return False
+
+    def _handle(self, conn):
+        with conn:
+            if not self._authenticate(conn):
+                return
+            try:
+                name, args, kwargs = conn.recv()
+                if name not in LOADERS:
+                    raise ValueError(f"Unknown model: {name}")
+                with self._locks[name]:
+                    result = self._get(name)(*args, **kwargs)
+                conn.send((True, result))
+            except EOFError:
+                pass
+            except Exception as e:
+                print(f"❌ Model server request failed: {e}")
+                conn.send((False, str(e)))
+
+    def serve_forever(self):
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.remove(self.address)  # stale socket from a previous run
+        # No authkey on the Listener: accept() would run the handshake on this thread
+        with Listener(self.address) as listener:
+            if isinstance(self.address, str):
+                os.chmod(self.address, 0o600)  # only this user's processes may connect
+            print(f"🚀 Model server listening on {self.address}")
+            while True:
+                try:
+                    conn = listener.accept()
+                except OSError as e:
+                    print(f"⚠️ Failed to accept model server connection: {e}")
+                    continue
+                threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the agenda planner models to all API workers.")
+    parser.add_argument("--address", default=MODEL_SERVER_ADDRESS or DEFAULT_ADDRESS, help="Unix socket path or host:port.")
+    parser.add_argument("--lazy", action="store_true", help="Load models on first request instead of at startup.")
+    args = parser.parse_args()
+    ModelServer(args.address, preload=not args.lazy).serve_forever()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import os
+import threading
+from multiprocessing.connection import Client
+
+# --- Lazily loaded agenda models ---
+# The BART pipelines take several GB of RAM and tens of seconds to load, so
+# they are only built the first time an agenda needs them, not when api.py or
+# tracker.py import the agenda planner. If MODEL_SERVER_ADDRESS is set, the
+# models are not loaded in this process at all: calls are forwarded to the
+# shared model server (agents/agenda_planner/model_server.py), so any number
+# of API workers share a single copy.
+MODEL_SERVER_ADDRESS = os.getenv("MODEL_SERVER_ADDRESS")  # unix socket path or host:port
+# Shared secret of the server and its clients. Requests are pickled, so anyone
+# holding the key can run code on the server: there is deliberately no default.
+MODEL_SERVER_AUTHKEY = os.getenv("MODEL_SERVER_AUTHKEY")
+
+SUMMARIZER_MODEL = "facebook/bart-large-cnn"
+
+def parse_address(address: str):
+    """'host:port' becomes a TCP address; anything else is a unix socket path."""
+    host, _, port = address.rpartition(":")
+    if host and port.isdigit():
+        return (host, int(port))
+    return address
+
+def get_model_server_authkey() -> bytes:
+    if not MODEL_SERVER_AUTHKEY:
+        raise ValueError("MODEL_SERVER_AUTHKEY must be set in your .env file to use the model server.")
+    return MODEL_SERVER_AUTHKEY.encode()
+
+class RemotePipeline:
+    """Calls a pipeline hosted by the model server as if it were local."""
+    def __init__(self, name: str, address: str):
+        self.name = name
+        self.address = parse_address(address)
+        self.authkey = get_model_server_authkey()
+
+    def __call__(self, *args, **kwargs):
+        with Client(self.address, authkey=self.authkey) as conn:
+            conn.send((self.name, args, kwargs))
+            ok, result = conn.recv()
+        if not ok:
+            raise RuntimeError(f"Model server error in '{self.name}': {result}")
+        return result
+
+def load_summarizer():
+    from transformers import pipeline
+    return pipeline("summarization", model=SUMMARIZER_MODEL)
+
+def _load_priority_classifier():
+    from .priority_classifier import load_priority_classifier
+    return load_priority_classifier()
+
+LOADERS = {
+    "priority_classifier": _load_priority_classifier,
+    "summarizer": load_summarizer,
+}
+
+_models = {}
+_models_lock = threading.Lock()
+
+def get_model(name: str):
+    """Returns the named pipeline, loading it (or connecting to the model server) on first use."""
+    model = _models.get(name)
+    if model is not None:
+        return model
+    with _models_lock:
+        if name not in _models:
+            if MODEL_SERVER_ADDRESS:
+                print(f"🔌 Using model server at {MODEL_SERVER_ADDRESS} for '{name}'.")
+                _models[name] = RemotePipeline(name, MODEL_SERVER_ADDRESS)
+            else:
+                print(f"🧠 Loading '{name}' model...")
+                _models[name] = LOADERS[name]()
+        return _models[name]
+
+def get_priority_classifier():
+    return get_model("priority_classifier")
+
+def get_summarizer():
+    return get_model("summarizer")
@@ -0,0 +1,98 @@
+import os
+import time
+
+# --- Batched zero-shot priority classification ---
+# Zero-shot classification runs one NLI forward pass per (topic, label) pair.
+# Classifying topics one at a time means 3 sequential passes per topic; here
+# all topics of an agenda are classified in one call so the pipeline can pad
+# and run the topic x label pairs in batches of PRIORITY_BATCH_SIZE.
+# PRIORITY_BACKEND=onnx runs the model on ONNX Runtime instead of PyTorch
+# (requires `optimum[onnxruntime]`); PRIORITY_ONNX_QUANTIZE=true additionally
+# uses a dynamically int8-quantized copy, which is faster on CPU.
+PRIORITY_MODEL = "facebook/bart-large-mnli"
+PRIORITY_BATCH_SIZE = int(os.getenv("PRIORITY_BATCH_SIZE", "16"))
+PRIORITY_BACKEND = os.getenv("PRIORITY_BACKEND", "torch")  # "torch" or "onnx"
+PRIORITY_ONNX_QUANTIZE = os.getenv("PRIORITY_ONNX_QUANTIZE", "false").lower() == "true"
+PRIORITY_ONNX_DIR = os.getenv("PRIORITY_ONNX_DIR", "data/models/bart-large-mnli-onnx")
+
+CANDIDATE_LABELS = ["urgent issue", "strategic discussion", "general information"]
+
+def _load_onnx_classifier():
+    """Exports (once) and loads the NLI model on ONNX Runtime, optionally int8-quantized."""
+    from transformers import pipeline, AutoTokenizer
+    from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+    if not os.path.exists(os.path.join(PRIORITY_ONNX_DIR, "model.onnx")):
+        print(f"📦 Exporting {PRIORITY_MODEL} to ONNX in {PRIORITY_ONNX_DIR}...")
+        ORTModelForSequenceClassification.from_pretrained(PRIORITY_MODEL, export=True).save_pretrained(PRIORITY_ONNX_DIR)
+        AutoTokenizer.from_pretrained(PRIORITY_MODEL).save_pretrained(PRIORITY_ONNX_DIR)
+
+    model_dir, file_name = PRIORITY_ONNX_DIR, "model.onnx"
+    if PRIORITY_ONNX_QUANTIZE:
+        quantized_dir = f"{PRIORITY_ONNX_DIR}-int8"
+        file_name = "model_quantized.onnx"
+        if not os.path.exists(os.path.join(quantized_dir, file_name)):
+            print(f"📦 Quantizing ONNX model to int8 in {quantized_dir}...")
+            quantizer = ORTQuantizer.from_pretrained(PRIORITY_ONNX_DIR)
+            quantizer.quantize(save_dir=quantized_dir, quantization_config=AutoQuantizationConfig.avx2(is_static=False, per_channel=False))
+            AutoTokenizer.from_pretrained(PRIORITY_ONNX_DIR).save_pretrained(quantized_dir)
+        model_dir = quantized_dir
+
+    model = ORTModelForSequenceClassification.from_pretrained(model_dir, file_name=file_name)
+    return pipeline("zero-shot-classification", model=model, tokenizer=AutoTokenizer.from_pretrained(model_dir))
+
+def load_priority_classifier():
+    """Builds the zero-shot pipeline for the configured backend, falling back to PyTorch."""
+    if PRIORITY_BACKEND == "onnx":
+        try:
+            return _load_onnx_classifier()
+        except ImportError:
+            print("⚠️ optimum[onnxruntime] is not installed. Falling back to the PyTorch classifier.")
+    from transformers import pipeline
+    return pipeline("zero-shot-classification", model=PRIORITY_MODEL)
+
+def label_to_priority(label: str) -> str:
+    if "urgent" in label:
+        return "urgent"
+    elif "discussion" in label:
+        return "discussion"
+    return "info"
+
+def classify_priorities(classifier, topics: list, batch_size: int = PRIORITY_BATCH_SIZE) -> list:
+    """Returns a priority ("urgent", "discussion" or "info") for each topic."""
+    if not topics:
+        return []
+    results = classifier(list(topics), CANDIDATE_LABELS, batch_size=batch_size)
+    if isinstance(results, dict):  # a single topic returns a single result
+        results = [results]
+    return [label_to_priority(result["labels"][0]) for result in results]
+
+# Benchmark: python -m agents.agenda_planner.priority_classifier [num_topics]
+if __name__ == "__main__":
+    import sys
+
+    sample_topics = [
+        "The production server is down and needs immediate attention.",
+        "Reviewing the financial projections for the next quarter.",
+        "Let's go over the designs for the new user dashboard.",
+        "Quick update on the team's holiday leave schedule.",
+        "Customer data breach reported this morning.",
+    ]
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    topics = [sample_topics[i % len(sample_topics)] + f" (item {i + 1})" for i in range(count)]
+    classifier = load_priority_classifier()
+    classifier(topics[0], CANDIDATE_LABELS)  # warm-up
+
+    started_at = time.perf_counter()
+    looped = [label_to_priority(classifier(topic, CANDIDATE_LABELS)["labels"][0]) for topic in topics]
+    loop_seconds = time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    batched = classify_priorities(classifier, topics)
+    batch_seconds = time.perf_counter() - started_at
+
+    print(f"Backend: {PRIORITY_BACKEND}{' (int8)' if PRIORITY_ONNX_QUANTIZE else ''}, {count} topics x {len(CANDIDATE_LABELS)} labels")
+    print(f"Per-topic loop: {loop_seconds:.2f}s")
+    print(f"Batched (batch_size={PRIORITY_BATCH_SIZE}): {batch_seconds:.2f}s ({loop_seconds / batch_seconds:.1f}x)")
+    print(f"Same priorities: {looped == batched}")
@@ -0,0 +1,38 @@
+import os
+import re
+import hashlib
+from lib.two_tier_cache import TwoTierCache
+from .priority_classifier import PRIORITY_MODEL, PRIORITY_BACKEND, PRIORITY_ONNX_QUANTIZE
+from .models import SUMMARIZER_MODEL
+
+# --- Memoized agenda topic analysis ---
+# Agendas are built from the previous meeting's decisions and future
+# discussion points, so the same topics come back week after week. Results
+# are cached by normalized text: topic -> (short topic, priority) and
+# topic set -> meeting title. Keys include the model setup so switching
+# backends (e.g. to int8 ONNX) does not serve results from the old one.
+AGENDA_CACHE_TTL_HOURS = float(os.getenv("AGENDA_CACHE_TTL_HOURS", str(24 * 90)))
+AGENDA_CACHE_MEMORY_ENTRIES = int(os.getenv("AGENDA_CACHE_MEMORY_ENTRIES", "2048"))
+
+_TOPIC_VERSION = f"topic:v1:{PRIORITY_MODEL}:{PRIORITY_BACKEND}:{'int8' if PRIORITY_ONNX_QUANTIZE else 'fp32'}"
+_TITLE_VERSION = f"title:v1:{SUMMARIZER_MODEL}"
+
+topic_cache = TwoTierCache("agenda_topics", "agenda_cache", AGENDA_CACHE_TTL_HOURS, AGENDA_CACHE_MEMORY_ENTRIES)
+title_cache = TwoTierCache("agenda_titles", "agenda_cache", AGENDA_CACHE_TTL_HOURS, AGENDA_CACHE_MEMORY_ENTRIES)
+
+def normalize_topic(topic: str) -> str:
+    """Lowercases, collapses whitespace and drops trailing punctuation."""
+    return re.sub(r"\s+", " ", (topic or "").lower()).strip().rstrip(".!?;:,")
+
+def _key(version: str, text: str) -> str:
+    return hashlib.sha256(f"{version}\n{text}".encode()).hexdigest()
+
+def topic_key(topic: str) -> str:
+    return _key(_TOPIC_VERSION, normalize_topic(topic))
+
+def title_key(topics: list) -> str:
+    """Same key for the same set of topics, whatever their order."""
+    return _key(_TITLE_VERSION, "\n".join(sorted({normalize_topic(t) for t in topics if t and t.strip()})))
+
+def get_topic_cache_stats() -> dict:
+    return {"topics": topic_cache.get_stats(), "titles": title_cache.get_stats()}
@@ -12,7 +12,7 @@ for resource in ['stopwords', 'punkt']:
     except LookupError:
         nltk.download(resource)
 from rake_nltk import Rake
-from lib.database import get_document_count # Import the new DB function
+from lib.database import get_next_meeting_number
 # Import the service that reads from the DB
 from ..action_item_tracker.previous_minutes_service import read_previous_minutes
 
@@ -41,9 +41,8 @@ def save_json(data, file_path):
 
 
 def get_next_meeting_id(user_id: str):
-    """Generate next meeting ID based on count in DB for that user."""
-    count = get_document_count("agendas", user_id)
-    next_id = count + 1
+    """Generate next meeting ID from an atomic per-user counter in the DB."""
+    next_id = get_next_meeting_number(user_id)
     return f"meetingId_{user_id}_{next_id:02d}"
 
 
@@ -0,0 +1,98 @@
+import os
+import hashlib
+import nltk
+from concurrent.futures import ThreadPoolExecutor
+from agents.action_item_tracker.ai_providers.gemini_provider import (
+    generate_minutes_content_gemini,
+    reduce_minutes_content_gemini,
+)
+
+# --- Hierarchical (map-reduce) minutes for long transcripts ---
+# Transcripts above MAP_REDUCE_THRESHOLD_CHARS are split into chunks along
+# speaker turns (and sentences for very long turns). Each chunk is summarized
+# in parallel (map), then the partial minutes are merged by one more call
+# (reduce). Chunk boundaries are content-defined -- a turn ends a chunk when
+# its hash says so -- so editing part of a transcript only changes the chunks
+# around the edit. Chunk results go through the LLM cache keyed on the chunk
+# text, so regenerating minutes after an edit only re-runs the chunks that
+# actually changed.
+MAP_REDUCE_THRESHOLD_CHARS = int(os.getenv("MINUTES_MAP_REDUCE_THRESHOLD_CHARS", "60000"))
+CHUNK_TARGET_CHARS = int(os.getenv("MINUTES_CHUNK_TARGET_CHARS", "12000"))
+CHUNK_MIN_CHARS = CHUNK_TARGET_CHARS // 4
+CHUNK_MAX_CHARS = CHUNK_TARGET_CHARS * 2
+# A speaker turn is ~150 characters on average, so this puts one boundary
+# roughly every CHUNK_TARGET_CHARS.
+_BOUNDARY_MODULUS = max(2, CHUNK_TARGET_CHARS // 150)
+MAP_CONCURRENCY = int(os.getenv("MINUTES_MAP_CONCURRENCY", "4"))
+
+def split_units(transcript: str) -> list:
+    """Splits a transcript into speaker turns, breaking overly long turns into sentences."""
+    units = []
+    for line in transcript.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if len(line) <= CHUNK_TARGET_CHARS // 4:
+            units.append(line)
+        else:
+            units.extend(nltk.sent_tokenize(line))
+    return units
+
+def _is_boundary(unit: str) -> bool:
+    """Content-defined cut point, decided by the unit's own text only."""
+    digest = int(hashlib.md5(unit.encode()).hexdigest()[:8], 16)
+    return digest % _BOUNDARY_MODULUS == 0
+
+def chunk_transcript(transcript: str) -> list:
+    """
+    Groups transcript units into chunks between CHUNK_MIN_CHARS and
+    CHUNK_MAX_CHARS, cutting after content-defined boundary units.
+    """
+    chunks, current, size = [], [], 0
+    for unit in split_units(transcript):
+        current.append(unit)
+        size += len(unit) + 1
+        if size >= CHUNK_MAX_CHARS or (size >= CHUNK_MIN_CHARS and _is_boundary(unit)):
+            chunks.append("\n".join(current))
+            current, size = [], 0
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+def summarize_chunk(chunk: str, index: int, total: int, use_cache: bool = True) -> dict:
+    """Map step: minutes content for one chunk, served from the LLM cache when unchanged."""
+    print(f"[DEBUG] Chunk {index + 1}/{total}: summarizing {len(chunk)} characters...")
+    return generate_minutes_content_gemini(chunk, part=f"{index + 1} of {total}", use_cache=use_cache)
+
+def _merge_locally(partials: list) -> dict:
+    """Fallback reduce: concatenate summaries and de-duplicate list items."""
+    def unique(items):
+        seen, result = set(), []
+        for item in items:
+            key = str(item).strip().lower()
+            if key and key not in seen:
+                seen.add(key)
+                result.append(item)
+        return result
+
+    return {
+        "summary": "\n\n".join(p["summary"] for p in partials if p.get("summary")),
+        "decisions": unique(d for p in partials for d in p.get("decisions", [])),
+        "future_discussion_points": unique(t for p in partials for t in p.get("future_discussion_points", [])),
+    }
+
+def map_reduce_minutes_content(transcript: str, use_cache: bool = True) -> dict:
+    """Generates minutes content for a long transcript via map-reduce."""
+    chunks = chunk_transcript(transcript)
+    print(f"[DEBUG] Map-reduce minutes: {len(chunks)} chunks.")
+    with ThreadPoolExecutor(max_workers=MAP_CONCURRENCY, thread_name_prefix="minutes-map") as executor:
+        futures = [executor.submit(summarize_chunk, chunk, i, len(chunks), use_cache) for i, chunk in enumerate(chunks)]
+        partials = [future.result() for future in futures]
+
+    if len(partials) == 1:
+        return partials[0]
+    try:
+        return reduce_minutes_content_gemini(partials, use_cache=use_cache)
+    except Exception as e:
+        print(f"[WARN] Reduce step failed ({e}). Merging chunk results locally.")
+        return _merge_locally(partials)
@@ -1,15 +1,21 @@
 import os
 import json
 import nltk
-from transformers import pipeline
 from lib.database import save_minutes, get_latest_transcript
 from datetime import datetime, timedelta
 from bson.objectid import ObjectId
+from concurrent.futures import ThreadPoolExecutor
 from agents.action_item_tracker.ai_providers.gemini_provider import (
     generate_summary_gemini,
     extract_key_decisions_gemini,
     extract_future_topics_gemini,
+    generate_minutes_content_gemini,
 )
+from .map_reduce import map_reduce_minutes_content, MAP_REDUCE_THRESHOLD_CHARS
+
+# "combined": one schema-constrained call returns summary, decisions and topics.
+# "parallel": the three separate prompts, run concurrently.
+MINUTES_GENERATION_MODE = os.getenv("MINUTES_GENERATION_MODE", "combined")
 
 # Ensure NLTK sentence tokenizer is downloaded
 try:
@@ -31,19 +37,43 @@ def load_transcript_from_db(user_id: str, transcript_id: str = None) -> str:
     print("⚠️ No transcript found in DB.")
     return ""
 
-def generate_summary(text: str) -> str:
+def generate_summary(text: str, use_cache: bool = True) -> str:
     """Generates a summary using the Gemini API."""
-    return generate_summary_gemini(text)
+    return generate_summary_gemini(text, use_cache=use_cache)
 
-def extract_key_decisions(text: str) -> list:
+def extract_key_decisions(text: str, use_cache: bool = True) -> list:
     """Extracts key decisions using the Gemini API."""
-    return extract_key_decisions_gemini(text)
+    return extract_key_decisions_gemini(text, use_cache=use_cache)
 
-def extract_future_topics(text: str) -> list:
+def extract_future_topics(text: str, use_cache: bool = True) -> list:
     """Extracts future topics using the Gemini API."""
-    return extract_future_topics_gemini(text)
+    return extract_future_topics_gemini(text, use_cache=use_cache)
+
+def generate_minutes_content(text: str, use_cache: bool = True) -> tuple:
+    """
+    Returns (summary, decisions, future_topics) for a transcript. Uses a single
+    combined call, falling back to three concurrent calls if that fails.
+    Transcripts longer than MAP_REDUCE_THRESHOLD_CHARS go through map-reduce.
+    use_cache=False bypasses the LLM response cache.
+    """
+    if len(text) > MAP_REDUCE_THRESHOLD_CHARS:
+        content = map_reduce_minutes_content(text, use_cache=use_cache)
+        return content["summary"], content["decisions"], content["future_discussion_points"]
+
+    if MINUTES_GENERATION_MODE == "combined":
+        try:
+            content = generate_minutes_content_gemini(text, use_cache=use_cache)
+            return content["summary"], content["decisions"], content["future_discussion_points"]
+        except Exception as e:
+            print(f"[WARN] Combined minutes generation failed ({e}). Falling back to parallel calls.")
 
-def generate_minutes(user_id: str = "user_placeholder_123", transcript_id: str = None, transcript_text: str = None):
+    with ThreadPoolExecutor(max_workers=3, thread_name_prefix="minutes") as executor:
+        summary = executor.submit(generate_summary, text, use_cache)
+        decisions = executor.submit(extract_key_decisions, text, use_cache)
+        future_topics = executor.submit(extract_future_topics, text, use_cache)
+        return summary.result(), decisions.result(), future_topics.result()
+
+def generate_minutes(user_id: str = "user_placeholder_123", transcript_id: str = None, transcript_text: str = None, use_cache: bool = True):
     """Main function to generate and save meeting minutes to MongoDB."""
     print("\n--- 🚀 Starting Minutes Generator ---")
     
@@ -56,19 +86,11 @@ def generate_minutes(user_id: str = "user_placeholder_123", transcript_id: str =
 
     print(f"[DEBUG] Transcript loaded. Length: {len(transcript)} characters.")
 
-    # Step 2: Generate summary
-    print("[DEBUG] Generating summary...")
-    summary = generate_summary(transcript)
+    # Steps 2-4: Generate summary, key decisions and future topics
+    print(f"[DEBUG] Generating summary, decisions and future topics (mode: {MINUTES_GENERATION_MODE})...")
+    summary, decisions, future_topics = generate_minutes_content(transcript, use_cache=use_cache)
     print(f"[DEBUG] Summary generated. Length: {len(summary)} characters.")
-
-    # Step 3: Extract key decisions
-    print("[DEBUG] Extracting key decisions...")
-    decisions = extract_key_decisions(transcript)
     print(f"[DEBUG] Extracted {len(decisions)} decisions. Data: {decisions}")
-
-    # Step 4: Extract future topics
-    print("[DEBUG] Extracting future discussion topics...")
-    future_topics = extract_future_topics(transcript)
     print(f"[DEBUG] Extracted {len(future_topics)} future topics. Data: {future_topics}")
 
     # Step 5: Structure and save minutes
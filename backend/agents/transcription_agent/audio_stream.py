@@ -0,0 +1,182 @@
+import os
+import re
+import time
+import shutil
+import tempfile
+import subprocess
+
+# --- Streaming audio extraction with ffmpeg ---
+# Instead of downloading the whole video and re-encoding it with moviepy,
+# ffmpeg reads the source directly (HTTP range requests for URLs) and writes
+# only a low-bitrate mono audio track. While it runs, a silencedetect filter
+# reports pauses in speech and a progress file reports how much audio has
+# been written. That lets us cut overlapping, silence-aligned transcription
+# windows from the growing audio file and hand each one to a callback before
+# the download has finished.
+AUDIO_BITRATE = os.getenv("TRANSCRIBE_AUDIO_BITRATE", "24k")
+AUDIO_CODEC = os.getenv("TRANSCRIBE_AUDIO_CODEC", "libopus")
+
+# Window planning (seconds)
+CHUNK_SECONDS = int(os.getenv("TRANSCRIBE_CHUNK_SECONDS", "300"))
+CHUNK_OVERLAP_SECONDS = int(os.getenv("TRANSCRIBE_CHUNK_OVERLAP_SECONDS", "15"))
+CHUNK_SEARCH_SECONDS = int(os.getenv("TRANSCRIBE_CHUNK_SEARCH_SECONDS", "30"))
+SILENCE_NOISE = os.getenv("TRANSCRIBE_SILENCE_NOISE", "-35dB")
+SILENCE_MIN_DURATION = float(os.getenv("TRANSCRIBE_SILENCE_MIN_DURATION", "0.4"))
+
+# Seconds of already-written audio to keep between the window end and the
+# encoder position, so we never cut into a page that is still being written.
+_WRITE_GUARD_SECONDS = 2
+
+# No random stream serials or encoder tags, so the same recording always gives
+# byte-identical audio files (the transcription cache hashes them)
+_BITEXACT = ["-fflags", "+bitexact", "-flags:a", "+bitexact"]
+
+# codec -> (file extension, MIME type accepted by Gemini)
+AUDIO_FORMATS = {
+    "libopus": ("ogg", "audio/ogg"),
+    "libmp3lame": ("mp3", "audio/mpeg"),
+}
+
+_SILENCE_START_RE = re.compile(r"silence_start: (-?[\d.]+)")
+_SILENCE_END_RE = re.compile(r"silence_end: (-?[\d.]+)")
+_OUT_TIME_RE = re.compile(r"out_time_(?:us|ms)=(\d+)")
+
+def get_ffmpeg_exe() -> str:
+    """Returns the ffmpeg binary bundled with moviepy (imageio-ffmpeg), or the one on PATH."""
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        exe = shutil.which("ffmpeg")
+        if not exe:
+            raise RuntimeError("ffmpeg not found. Install ffmpeg or imageio-ffmpeg.")
+        return exe
+
+def resolve_stream_url(video_url: str) -> str:
+    """
+    Converts a Google Drive share link into a direct download URL that ffmpeg
+    can read. Other URLs are returned unchanged.
+    """
+    if "drive.google.com" not in video_url:
+        return video_url
+    match = re.search(r"/d/([\w-]+)", video_url) or re.search(r"[?&]id=([\w-]+)", video_url)
+    if not match:
+        return video_url
+    return f"https://drive.usercontent.google.com/download?id={match.group(1)}&export=download&confirm=t"
+
+def audio_mime_type(codec: str = AUDIO_CODEC) -> str:
+    """Returns the MIME type of the audio files produced for a codec."""
+    return AUDIO_FORMATS.get(codec, AUDIO_FORMATS["libopus"])[1]
+
+def audio_output_path(out_dir: str, codec: str = AUDIO_CODEC) -> str:
+    """Returns where stream_audio_windows writes the full audio track."""
+    ext = AUDIO_FORMATS.get(codec, AUDIO_FORMATS["libopus"])[0]
+    return os.path.join(out_dir, f"audio.{ext}")
+
+def parse_silences(log_text: str) -> list:
+    """Parses silencedetect output into a list of (start, end) tuples in seconds."""
+    starts = [float(s) for s in _SILENCE_START_RE.findall(log_text)]
+    ends = [float(e) for e in _SILENCE_END_RE.findall(log_text)]
+    return [(max(0.0, start), end) for start, end in zip(starts, ends)]
+
+def plan_window_end(start: float, silences: list, target: float = CHUNK_SECONDS, search: float = CHUNK_SEARCH_SECONDS) -> float:
+    """
+    Picks where a window starting at `start` should end: the middle of the
+    silence closest to `start + target`, searching +/- `search` seconds.
+    Falls back to a hard cut at `start + target` if nobody paused.
+    """
+    ideal = start + target
+    best, best_distance = ideal, None
+    for silence_start, silence_end in silences:
+        midpoint = (silence_start + silence_end) / 2
+        distance = abs(midpoint - ideal)
+        if distance <= search and (best_distance is None or distance < best_distance):
+            best, best_distance = midpoint, distance
+    return best
+
+def _read_text(path: str) -> str:
+    if not os.path.exists(path):
+        return ""
+    with open(path, "r", errors="replace") as f:
+        return f.read()
+
+def _written_seconds(progress_text: str) -> float:
+    """Returns how many seconds of audio ffmpeg has written so far."""
+    matches = _OUT_TIME_RE.findall(progress_text)
+    return int(matches[-1]) / 1_000_000 if matches else 0.0
+
+def cut_window(audio_path: str, out_path: str, start: float, end: float = None):
+    """Copies [start, end) out of an audio file without re-encoding."""
+    cmd = [get_ffmpeg_exe(), "-hide_banner", "-loglevel", "error", "-nostdin", "-y", "-ss", f"{start:.3f}", "-i", audio_path]
+    if end is not None:
+        cmd += ["-t", f"{end - start:.3f}"]
+    cmd += ["-c", "copy", *_BITEXACT, out_path]
+    subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+def stream_audio_windows(source: str, out_dir: str, on_window=None, codec: str = AUDIO_CODEC, poll_interval: float = 0.5) -> list:
+    """
+    Runs ffmpeg over a video URL or local path, writing one audio-only file
+    into out_dir, and cuts it into overlapping, silence-aligned windows while
+    it is still being written. `on_window(path, index, start, end)` is called
+    as soon as each window is ready. Returns the ordered list of windows as
+    (path, start, end) tuples.
+    """
+    ext = AUDIO_FORMATS.get(codec, AUDIO_FORMATS["libopus"])[0]
+    audio_path = audio_output_path(out_dir, codec)
+    progress_path = os.path.join(out_dir, "progress.txt")
+    cmd = [
+        get_ffmpeg_exe(), "-hide_banner", "-nostats", "-loglevel", "info", "-nostdin", "-y",
+        "-i", source,
+        "-vn", "-map", "0:a:0", "-ac", "1", "-ar", "16000",
+        "-af", f"silencedetect=noise={SILENCE_NOISE}:d={SILENCE_MIN_DURATION}",
+        "-c:a", codec, "-b:a", AUDIO_BITRATE,
+        "-progress", progress_path,
+        *_BITEXACT,
+        audio_path,
+    ]
+
+    windows = []
+    next_start = 0.0
+
+    def emit(start: float, end: float = None):
+        index = len(windows)
+        window_path = os.path.join(out_dir, f"window_{index:03d}.{ext}")
+        cut_start = max(0.0, start - CHUNK_OVERLAP_SECONDS) if index > 0 else 0.0
+        cut_window(audio_path, window_path, cut_start, end)
+        windows.append((window_path, cut_start, end))
+        if on_window:
+            on_window(window_path, index, cut_start, end)
+
+    with tempfile.NamedTemporaryFile(mode="w+", dir=out_dir, suffix=".log", delete=False) as log_file:
+        log_path = log_file.name
+        process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=log_file)
+        try:
+            while process.poll() is None:
+                written = _written_seconds(_read_text(progress_path))
+                # A window can be planned once all candidate boundaries are written
+                while written >= next_start + CHUNK_SECONDS + CHUNK_SEARCH_SECONDS + _WRITE_GUARD_SECONDS:
+                    end = plan_window_end(next_start, parse_silences(_read_text(log_path)))
+                    emit(next_start, end)
+                    next_start = end
+                time.sleep(poll_interval)
+        except BaseException:
+            process.kill()
+            process.wait()
+            raise
+
+    log_text = _read_text(log_path)
+    if process.returncode != 0:
+        error_lines = [line for line in log_text.splitlines() if "silence_" not in line]
+        raise RuntimeError(f"ffmpeg audio extraction failed ({process.returncode}): {' '.join(error_lines)[-500:]}")
+    if not os.path.exists(audio_path) or os.path.getsize(audio_path) == 0:
+        raise RuntimeError("ffmpeg produced no audio. Does the video have an audio track?")
+
+    # Plan the remaining windows now that the whole file and all silences are known
+    total = _written_seconds(_read_text(progress_path))
+    silences = parse_silences(log_text)
+    while total - next_start > CHUNK_SECONDS + CHUNK_SEARCH_SECONDS:
+        end = plan_window_end(next_start, silences)
+        emit(next_start, end)
+        next_start = end
+    emit(next_start)
+    return windows
@@ -0,0 +1,127 @@
+import os
+import time
+import asyncio
+import threading
+from collections import deque
+import google.generativeai as genai
+from lib.cache_stats import Counters
+
+# --- Awaitable Gemini file-readiness waiter ---
+# Uploaded files are PROCESSING for a while before they can be used. Rather
+# than parking a thread in a `time.sleep(5)` loop per upload, every wait is a
+# coroutine on one shared event loop, so any number of uploads can wait at
+# once. Polling starts early and backs off exponentially; the first delay
+# adapts to the observed processing speed (seconds per MB) so small files are
+# picked up quickly and large ones are not polled needlessly.
+FILE_WAIT_MIN_DELAY = float(os.getenv("GEMINI_FILE_WAIT_MIN_DELAY", "0.5"))
+FILE_WAIT_MAX_DELAY = float(os.getenv("GEMINI_FILE_WAIT_MAX_DELAY", "10"))
+FILE_WAIT_BACKOFF = float(os.getenv("GEMINI_FILE_WAIT_BACKOFF", "1.6"))
+FILE_WAIT_TIMEOUT = float(os.getenv("GEMINI_FILE_WAIT_TIMEOUT", "900"))
+
+_EWMA_ALPHA = 0.2
+_metrics_lock = threading.Lock()
+_seconds_per_mb = None  # EWMA of time-to-ACTIVE per MB uploaded
+_recent_waits = deque(maxlen=200)  # recent (time-to-ACTIVE seconds, polls) samples
+# Waits happen in the worker processes, so totals are also summed across processes
+_totals = Counters("gemini_file_wait", events=("waits", "wait_seconds", "polls", "sized_waits", "sized_wait_seconds", "size_mb"))
+
+_loop = None
+_loop_lock = threading.Lock()
+
+def _file_size_mb(file_handle) -> float:
+    return (getattr(file_handle, "size_bytes", 0) or 0) / (1024 * 1024)
+
+def _initial_delay(file_handle) -> float:
+    """First poll at ~80% of the expected processing time for a file of this size."""
+    with _metrics_lock:
+        per_mb = _seconds_per_mb
+    if per_mb is None:
+        return FILE_WAIT_MIN_DELAY
+    return min(FILE_WAIT_MAX_DELAY, max(FILE_WAIT_MIN_DELAY, 0.8 * per_mb * _file_size_mb(file_handle)))
+
+def _record_wait(file_handle, seconds: float, polls: int):
+    global _seconds_per_mb
+    size_mb = _file_size_mb(file_handle)
+    with _metrics_lock:
+        _recent_waits.append((seconds, polls))
+        if size_mb > 0:
+            sample = seconds / size_mb
+            _seconds_per_mb = sample if _seconds_per_mb is None else (1 - _EWMA_ALPHA) * _seconds_per_mb + _EWMA_ALPHA * sample
+    _totals.record("waits")
+    _totals.record("wait_seconds", seconds)
+    _totals.record("polls", polls)
+    if size_mb > 0:
+        _totals.record("sized_waits")
+        _totals.record("sized_wait_seconds", seconds)
+        _totals.record("size_mb", size_mb)
+    print(f"⏱️ Gemini file '{file_handle.name}' ACTIVE after {seconds:.2f}s ({polls} polls, {size_mb:.1f} MB).")
+
+async def wait_for_file_active(file_handle, timeout: float = FILE_WAIT_TIMEOUT):
+    """
+    Waits until an uploaded Gemini file leaves the PROCESSING state and
+    returns the refreshed handle. Raises ValueError if processing failed and
+    TimeoutError if it takes longer than `timeout` seconds.
+    """
+    started_at = time.monotonic()
+    delay = _initial_delay(file_handle)
+    polls = 0
+    while file_handle.state.name == "PROCESSING":
+        if time.monotonic() - started_at > timeout:
+            raise TimeoutError(f"File '{file_handle.name}' still PROCESSING after {timeout:.0f}s.")
+        await asyncio.sleep(delay)
+        file_handle = await asyncio.to_thread(genai.get_file, file_handle.name)
+        polls += 1
+        delay = min(FILE_WAIT_MAX_DELAY, delay * FILE_WAIT_BACKOFF)
+
+    if file_handle.state.name == "FAILED":
+        raise ValueError(f"Audio file processing failed: {file_handle.state.name}")
+
+    _record_wait(file_handle, time.monotonic() - started_at, polls)
+    return file_handle
+
+def get_waiter_loop() -> asyncio.AbstractEventLoop:
+    """Returns the process-wide event loop that runs file waits from sync code."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="gemini-file-waiter", daemon=True).start()
+        return _loop
+
+def submit_file_wait(file_handle, timeout: float = FILE_WAIT_TIMEOUT):
+    """Schedules wait_for_file_active on the shared loop and returns a concurrent Future."""
+    return asyncio.run_coroutine_threadsafe(wait_for_file_active(file_handle, timeout), get_waiter_loop())
+
+def _process_wait_stats() -> dict:
+    with _metrics_lock:
+        samples = sorted(seconds for seconds, _ in _recent_waits)
+        polls = sum(p for _, p in _recent_waits)
+        per_mb = _seconds_per_mb
+    if not samples:
+        return {"count": 0}
+    return {
+        "count": len(samples),
+        "mean_seconds": round(sum(samples) / len(samples), 3),
+        "p50_seconds": round(samples[len(samples) // 2], 3),
+        "p95_seconds": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        "seconds_per_mb": round(per_mb, 3) if per_mb is not None else None,
+        "avg_polls": round(polls / len(samples), 2),
+    }
+
+def get_file_wait_stats() -> dict:
+    """
+    Returns time-to-ACTIVE metrics for tuning the polling parameters:
+    percentiles over this process's recent waits, and averages over the
+    totals summed across all processes.
+    """
+    _, totals = _totals.totals()
+    waits = totals["waits"]
+    return {
+        "process": _process_wait_stats(),
+        "global": {
+            "count": waits,
+            "mean_seconds": round(totals["wait_seconds"] / waits, 3) if waits else None,
+            "seconds_per_mb": round(totals["sized_wait_seconds"] / totals["size_mb"], 3) if totals["size_mb"] else None,
+            "avg_polls": round(totals["polls"] / waits, 2) if waits else None,
+        },
+    }
@@ -0,0 +1,121 @@
+import re
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+
+# --- Stitching chunk transcripts back together ---
+# Each audio window is transcribed on its own, so consecutive transcripts
+# repeat the words spoken in the overlap and number their speakers
+# independently ("Speaker 1" in one chunk may be "Speaker 2" in the next).
+# We align the tail of the stitched text with the head of the next chunk
+# word by word, drop the duplicated words, and use the aligned words to map
+# the next chunk's speaker labels onto the labels already in use.
+OVERLAP_SEARCH_WORDS = 150
+MIN_OVERLAP_MATCH_WORDS = 4
+
+_SPEAKER_LINE_RE = re.compile(r"^\s*\**\s*(Speaker\s*\d+|[A-Z][\w.'-]*(?: [A-Z][\w.'-]*){0,2})\s*\**\s*:\s*(.*)$")
+_GENERIC_SPEAKER_RE = re.compile(r"^Speaker\s*(\d+)$", re.IGNORECASE)
+
+def parse_words(transcript: str) -> list:
+    """Splits a transcript into (speaker, word) pairs. Speaker is None for unlabeled text."""
+    words = []
+    speaker = None
+    for line in transcript.splitlines():
+        match = _SPEAKER_LINE_RE.match(line)
+        if match:
+            speaker = re.sub(r"\s+", " ", match.group(1).strip())
+            line = match.group(2)
+        words.extend((speaker, word) for word in line.split())
+    return words
+
+def _normalize(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+def render_words(words: list) -> str:
+    """Joins (speaker, word) pairs back into 'Speaker: text' lines."""
+    lines = []
+    current_speaker, current_words = object(), []
+    for speaker, word in words:
+        if speaker != current_speaker and current_words:
+            lines.append(f"{current_speaker}: {' '.join(current_words)}" if current_speaker else " ".join(current_words))
+            current_words = []
+        current_speaker = speaker
+        current_words.append(word)
+    if current_words:
+        lines.append(f"{current_speaker}: {' '.join(current_words)}" if current_speaker else " ".join(current_words))
+    return "\n".join(lines)
+
+def _map_speakers(next_words: list, votes: dict, used_labels: set) -> dict:
+    """
+    Builds a label mapping for the next chunk. Labels seen in the overlap take
+    the label they were aligned with most often; other generic 'Speaker N'
+    labels get the next free number; named speakers keep their names.
+    """
+    mapping = {}
+    for label, counter in votes.items():
+        target, _ = counter.most_common(1)[0]
+        if target is not None and target not in mapping.values():
+            mapping[label] = target
+
+    taken = set(used_labels) | set(mapping.values())
+    next_number = max([int(m.group(1)) for m in (_GENERIC_SPEAKER_RE.match(l or "") for l in taken) if m] or [0]) + 1
+    for label in dict.fromkeys(speaker for speaker, _ in next_words):
+        if label is None or label in mapping:
+            continue
+        if _GENERIC_SPEAKER_RE.match(label):
+            mapping[label] = f"Speaker {next_number}"
+            next_number += 1
+        else:
+            mapping[label] = label
+    return mapping
+
+def stitch_transcripts(chunks: list) -> str:
+    """Merges ordered chunk transcripts into one, removing overlap duplicates."""
+    stitched = []
+    for chunk in chunks:
+        next_words = parse_words(chunk or "")
+        if not next_words:
+            continue
+        if not stitched:
+            stitched = next_words
+            continue
+
+        tail = stitched[-OVERLAP_SEARCH_WORDS:]
+        head = next_words[:OVERLAP_SEARCH_WORDS]
+        matcher = SequenceMatcher(None, [_normalize(w) for _, w in tail], [_normalize(w) for _, w in head], autojunk=False)
+
+        # Vote on speaker labels using every aligned word in the overlap
+        votes = defaultdict(Counter)
+        for block in matcher.get_matching_blocks():
+            for offset in range(block.size):
+                votes[head[block.b + offset][0]][tail[block.a + offset][0]] += 1
+        votes.pop(None, None)
+        mapping = _map_speakers(next_words, votes, {speaker for speaker, _ in stitched})
+        next_words = [(mapping.get(speaker, speaker), word) for speaker, word in next_words]
+
+        # Cut at the end of the longest aligned run: keep the earlier chunk up to
+        # there and continue with the later chunk, which heard those words in full.
+        longest = matcher.find_longest_match(0, len(tail), 0, len(head))
+        if longest.size >= MIN_OVERLAP_MATCH_WORDS:
+            keep = len(stitched) - len(tail) + longest.a + longest.size
+            stitched = stitched[:keep] + next_words[longest.b + longest.size:]
+        else:
+            stitched = stitched + next_words
+    return render_words(stitched)
+
+# Benchmark of stitching a 60-minute meeting (12 five-minute windows with a
+# 15-second overlap, ~150 words per minute):
+#   python -m agents.transcription_agent.stitching
+if __name__ == "__main__":
+    import time
+    import random
+
+    random.seed(7)
+    vocabulary = [f"word{i}" for i in range(2000)]
+    words = [(f"Speaker {random.randint(1, 4)}", random.choice(vocabulary)) for _ in range(60 * 150)]
+    per_window, overlap = 5 * 150, 40
+    chunks = [render_words(words[max(0, start - overlap):start + per_window]) for start in range(0, len(words), per_window)]
+
+    started_at = time.perf_counter()
+    stitched = stitch_transcripts(chunks)
+    elapsed_ms = (time.perf_counter() - started_at) * 1000
+    print(f"{len(chunks)} windows, {len(words)} words stitched in {elapsed_ms:.1f} ms; words kept: {len(parse_words(stitched))}")
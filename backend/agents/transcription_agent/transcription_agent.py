@@ -1,14 +1,26 @@
 import os
 import time
 import gdown
-import random
 import uuid
-from google.api_core.exceptions import ResourceExhausted
 import google.generativeai as genai
 from dotenv import load_dotenv
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, Future, wait
 from pymongo.errors import ConnectionFailure
-# --- RE-INTRODUCED: moviepy is essential for audio extraction ---
-import moviepy.editor as mp
+import hashlib
+import requests
+from lib.transcript_cache import find_cached_transcript, record_transcript_cache_hit, record_transcript_cache_miss
+from lib.rate_limiter import call_gemini
+from .audio_stream import stream_audio_windows, resolve_stream_url, audio_mime_type, audio_output_path, CHUNK_SECONDS, CHUNK_OVERLAP_SECONDS
+from .stitching import stitch_transcripts
+from .file_waiter import submit_file_wait
+
+TEMP_ROOT = "data/meeting_video/temp"
+CHUNK_CONCURRENCY = int(os.getenv("TRANSCRIBE_CHUNK_CONCURRENCY", "4"))
+# Gemini bills audio at 32 tokens/second; allow ~4 tokens/second of transcript output
+CHUNK_ESTIMATED_TOKENS = (CHUNK_SECONDS + CHUNK_OVERLAP_SECONDS) * (32 + 4)
+TRANSCRIBE_PROMPT = "Transcribe the following audio. Provide a clean, verbatim transcript. Include speaker labels (diarization) if possible, like 'Speaker 1:' and 'Speaker 2:'."
 
 def configure_gemini():
     """
@@ -20,95 +32,232 @@ def configure_gemini():
         raise ValueError("GOOGLE_API_KEY not found in environment variables. Please set it in your .env file.")
     genai.configure(api_key=api_key)
 
-def transcribe_video(video_path: str = None, video_url: str = None, user_id: str = "user_placeholder_123"):
+def upload_chunk(audio_path: str, index: int):
+    """Uploads one audio window to Gemini and returns the file handle."""
+    uploaded_file_handle = genai.upload_file(
+        path=audio_path,
+        display_name=f"meeting_audio_{index:03d}",
+        mime_type=audio_mime_type(),
+    )
+    print(f"[Chunk {index + 1}] Uploaded as '{uploaded_file_handle.name}'.")
+    return uploaded_file_handle
+
+def generate_chunk_transcript(uploaded_file_handle, index: int) -> str:
+    """
+    Transcribes one ACTIVE audio window. Rate-limit errors are retried here so
+    a failure only costs this chunk.
     """
-    Transcribes a video by first extracting its audio, then uploading the audio file.
+    prompt = (
+        f"{TRANSCRIBE_PROMPT} This audio is part {index + 1} of a longer meeting and may "
+        "start or end mid-sentence; transcribe exactly what is audible."
+    )
+    model = genai.GenerativeModel("gemini-2.0-flash-exp")
+
+    def call():
+        print(f"[Chunk {index + 1}] Generating transcription...")
+        return model.generate_content([prompt, uploaded_file_handle])
+
+    try:
+        response = call_gemini(call, estimated_tokens=CHUNK_ESTIMATED_TOKENS)
+    except Exception as e:
+        print(f"[Chunk {index + 1}] Transcription failed: {e}")
+        raise e
+    return response.text.strip()
+
+def _delete_upload(uploaded_file_handle):
+    print(f"Cleaning up uploaded file from Gemini: {uploaded_file_handle.name}")
+    try:
+        genai.delete_file(uploaded_file_handle.name)
+    except Exception as e:
+        print(f"Failed to delete uploaded file {uploaded_file_handle.name}: {e}")
+
+def submit_chunk(executor: ThreadPoolExecutor, audio_path: str, index: int) -> Future:
+    """
+    Runs upload -> wait for ACTIVE -> transcribe for one window and returns a
+    Future with its transcript. Upload and transcription use the executor's
+    threads; the wait in between runs on the shared file-waiter event loop, so
+    no thread is held while Gemini processes the file.
+    """
+    result = Future()
+
+    # The caller may cancel `result` while a stage is still running
+    def fail(error, uploaded_file_handle=None):
+        if uploaded_file_handle is not None:
+            _delete_upload(uploaded_file_handle)
+        if not result.done():
+            result.set_exception(error)
+
+    def after_generate(generate_future, uploaded_file_handle):
+        _delete_upload(uploaded_file_handle)
+        if result.done():
+            return
+        if generate_future.cancelled():
+            result.cancel()
+        elif generate_future.exception():
+            result.set_exception(generate_future.exception())
+        else:
+            result.set_result(generate_future.result())
+
+    def after_wait(wait_future, uploaded_file_handle):
+        if wait_future.exception():
+            return fail(wait_future.exception(), uploaded_file_handle)
+        if result.done():
+            return _delete_upload(uploaded_file_handle)
+        try:
+            generate_future = executor.submit(generate_chunk_transcript, wait_future.result(), index)
+        except RuntimeError as e:  # executor already shut down
+            return fail(e, uploaded_file_handle)
+        generate_future.add_done_callback(lambda f: after_generate(f, uploaded_file_handle))
+
+    def after_upload(upload_future):
+        if upload_future.cancelled():
+            return result.cancel()
+        if upload_future.exception():
+            return fail(upload_future.exception())
+        uploaded_file_handle = upload_future.result()
+        submit_file_wait(uploaded_file_handle).add_done_callback(lambda f: after_wait(f, uploaded_file_handle))
+
+    executor.submit(upload_chunk, audio_path, index).add_done_callback(after_upload)
+    return result
+
+def source_fingerprint(video_path: str = None, video_url: str = None):
+    """
+    Fingerprints a video source without downloading it: URL + ETag/size from a
+    HEAD request, or path + size + mtime for local files. Returns None if the
+    source exposes nothing stable to key on.
+    """
+    try:
+        if video_url:
+            response = requests.head(resolve_stream_url(video_url), allow_redirects=True, timeout=10)
+            etag = response.headers.get("ETag")
+            size = response.headers.get("Content-Length")
+            if not response.ok or not (etag or size):
+                return None
+            parts = [video_url.strip(), etag or "", size or "", response.headers.get("Last-Modified", "")]
+        else:
+            stat = os.stat(video_path)
+            parts = [os.path.abspath(video_path), str(stat.st_size), str(int(stat.st_mtime))]
+    except Exception as e:
+        print(f"Could not fingerprint video source: {e}")
+        return None
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+def hash_file(path: str) -> str:
+    """Returns the SHA-256 of a file, read in 1 MB blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def transcribe_video(video_path: str = None, video_url: str = None, user_id: str = "user_placeholder_123", use_cache: bool = True):
+    """
+    Transcribes a video and returns the transcript text.
+    See transcribe_video_with_fingerprints for details.
+    """
+    transcript, _ = transcribe_video_with_fingerprints(video_path, video_url, user_id, use_cache)
+    return transcript
+
+def transcribe_video_with_fingerprints(video_path: str = None, video_url: str = None, user_id: str = "user_placeholder_123", use_cache: bool = True):
+    """
+    Transcribes a video by streaming its audio track through ffmpeg, cutting it
+    into overlapping windows at pauses in speech, transcribing the windows
+    concurrently, and stitching the results back together in order.
+
+    Returns (transcript, fingerprints). Pass the fingerprints to save_transcript
+    so later requests for the same video can be served from the cache.
+
+    The same recording may arrive via a different link, so the first audio
+    window is also looked up by hash before anything is sent to Gemini. On a
+    match, the remaining windows are held back until the full audio hash
+    confirms it; a false match only costs the pipelining of this run.
     """
     if not video_path and not video_url:
         raise ValueError("Either video_path or video_url must be provided.")
 
-    local_video_path = video_path
-    is_temp_file = False
-    temp_video_path = None
-    temp_audio_path = None
-    uploaded_file_handle = None
+    started_at = time.monotonic()
+    fingerprints = {"source_key": source_fingerprint(video_path, video_url)}
+    if use_cache and fingerprints["source_key"]:
+        cached = find_cached_transcript(user_id, source_key=fingerprints["source_key"], count_miss=False)
+        if cached:
+            record_transcript_cache_hit()
+            return cached["transcript"], fingerprints
+
+    temp_dir = None
+    cache_hit = False
+    chunk_futures = []
+    held_windows = []  # windows not submitted while a cached candidate is pending
+    candidate = None  # cached transcript whose first audio window matches
+    chunk_executor = ThreadPoolExecutor(max_workers=CHUNK_CONCURRENCY, thread_name_prefix="transcribe-chunk")
+
+    def on_window(path, index, start, end):
+        nonlocal candidate
+        end_label = f"{end:.1f}s" if end is not None else "end"
+        if index == 0:
+            fingerprints["audio_prefix_hash"] = hash_file(path)
+            if use_cache:
+                candidate = find_cached_transcript(user_id, audio_prefix_hash=fingerprints["audio_prefix_hash"], count_miss=False)
+        if candidate:
+            print(f"Audio window {index + 1} ready ({start:.1f}s - {end_label}), held until the cached transcript is confirmed.")
+            held_windows.append((path, index))
+            return
+        print(f"Audio window {index + 1} ready ({start:.1f}s - {end_label}), queueing transcription.")
+        chunk_futures.append(submit_chunk(chunk_executor, path, index))
 
     try:
         configure_gemini()
-        temp_dir = "data/meeting_video/temp"
-        os.makedirs(temp_dir, exist_ok=True)
+        os.makedirs(TEMP_ROOT, exist_ok=True)
+        temp_dir = tempfile.mkdtemp(dir=TEMP_ROOT)
+        audio_dir = temp_dir
 
         if video_url:
-            print(f"Downloading video from URL: {video_url}")
-            temp_video_path = os.path.join(temp_dir, f"{uuid.uuid4()}.mp4")
-            gdown.download(video_url, temp_video_path, quiet=False, fuzzy=True)
-            local_video_path = temp_video_path
-            is_temp_file = True
-            print(f"Video downloaded to temporary path: {local_video_path}")
-
-        if not os.path.exists(local_video_path):
-            raise FileNotFoundError(f"Video file not found at {local_video_path}")
-
-        # --- HEART OF THE SYSTEM: Extract audio from the video file ---
-        print(f"Extracting audio from '{local_video_path}'...")
-        temp_audio_path = os.path.join(temp_dir, f"{uuid.uuid4()}.mp3")
-        with mp.VideoFileClip(local_video_path) as video_clip:
-            video_clip.audio.write_audiofile(temp_audio_path, codec='mp3')
-        print(f"Audio extracted successfully to '{temp_audio_path}'.")
-
-        # --- UPLOAD THE SMALLER AUDIO FILE, NOT THE VIDEO ---
-        print(f"Uploading audio file to Gemini: {temp_audio_path}")
-        uploaded_file_handle = genai.upload_file(path=temp_audio_path, display_name="meeting_audio")
-        print(f"File uploaded successfully. URI: {uploaded_file_handle.uri}")
-
-        print(f"Waiting for file '{uploaded_file_handle.name}' to be processed...")
-        while uploaded_file_handle.state.name == "PROCESSING":
-            time.sleep(5) # Check every 5 seconds
-            uploaded_file_handle = genai.get_file(uploaded_file_handle.name)
-        
-        if uploaded_file_handle.state.name == "FAILED":
-            raise ValueError(f"Audio file processing failed: {uploaded_file_handle.state.name}")
-        
-        print("File is now ACTIVE and ready for use.")
+            print(f"Streaming audio from URL: {video_url}")
+            try:
+                stream_audio_windows(resolve_stream_url(video_url), audio_dir, on_window=on_window)
+            except RuntimeError as e:
+                # Some hosts (e.g. Drive virus-scan pages) cannot be streamed directly;
+                # fall back to a full download with gdown.
+                print(f"Direct streaming failed ({e}). Falling back to full download...")
+                for future in chunk_futures:
+                    future.cancel()
+                wait(chunk_futures)
+                chunk_futures.clear()
+                held_windows.clear()
+                candidate = None
+                audio_dir = tempfile.mkdtemp(dir=temp_dir)
+                temp_video_path = os.path.join(audio_dir, f"{uuid.uuid4()}.mp4")
+                gdown.download(video_url, temp_video_path, quiet=False, fuzzy=True)
+                stream_audio_windows(temp_video_path, audio_dir, on_window=on_window)
+        else:
+            if not os.path.exists(video_path):
+                raise FileNotFoundError(f"Video file not found at {video_path}")
+            print(f"Extracting audio from '{video_path}'...")
+            stream_audio_windows(video_path, audio_dir, on_window=on_window)
 
-        prompt = "Transcribe the following audio. Provide a clean, verbatim transcript. Include speaker labels (diarization) if possible, like 'Speaker 1:' and 'Speaker 2:'."
-        model = genai.GenerativeModel("gemini-2.0-flash-exp")
-        max_retries = 3
-        base_delay = 5
+        fingerprints["audio_hash"] = hash_file(audio_output_path(audio_dir))
+        if candidate and candidate.get("audio_hash") == fingerprints["audio_hash"]:
+            cache_hit = True
+            record_transcript_cache_hit()
+            return candidate["transcript"], fingerprints
+        if use_cache:
+            record_transcript_cache_miss()
+        if held_windows:
+            print(f"Cached transcript only shares the first audio window; transcribing {len(held_windows)} held window(s).")
+            chunk_futures.extend(submit_chunk(chunk_executor, path, index) for path, index in held_windows)
 
-        for attempt in range(max_retries):
-            try:
-                print(f"Attempt {attempt + 1}/{max_retries}: Generating transcription...")
-                response = model.generate_content([prompt, uploaded_file_handle])
-                transcript = response.text.strip()
-                print("\n--- Transcription Successful ---")
-                return transcript
-            except ResourceExhausted as e:
-                print(f"Attempt {attempt + 1} failed: {e}")
-                if attempt < max_retries - 1:
-                    wait_time = base_delay * (2 ** attempt) + random.uniform(0, 1)
-                    print(f"Rate limit exceeded. Retrying in {wait_time:.2f} seconds...")
-                    time.sleep(wait_time)
-                else:
-                    print("Max retries reached. Transcription failed.")
-                    raise e
-            except Exception as e:
-                print(f"An unexpected error occurred during content generation: {e}")
-                raise e
+        # Results are collected in window order; a failed chunk raises here
+        chunk_transcripts = [future.result() for future in chunk_futures]
+        transcript = stitch_transcripts(chunk_transcripts)
+        print(f"\n--- Transcription Successful: {len(chunk_transcripts)} chunk(s) in {time.monotonic() - started_at:.1f}s ---")
+        return transcript, fingerprints
 
     finally:
         # --- ROBUST CLEANUP ---
-        if uploaded_file_handle:
-            print(f"Cleaning up uploaded file from Gemini: {uploaded_file_handle.name}")
-            genai.delete_file(uploaded_file_handle.name)
-        
-        if is_temp_file and temp_video_path and os.path.exists(temp_video_path):
-            os.remove(temp_video_path)
-            print(f"Deleted temporary video file: {temp_video_path}")
-            
-        if temp_audio_path and os.path.exists(temp_audio_path):
-            os.remove(temp_audio_path)
-            print(f"Deleted temporary audio file: {temp_audio_path}")
+        # On a cache hit, drop queued chunks and don't wait for running ones
+        chunk_executor.shutdown(wait=not cache_hit, cancel_futures=True)
+        if temp_dir and os.path.exists(temp_dir):
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            print(f"Deleted temporary audio directory: {temp_dir}")
 
 async def get_video_length(video_url: str) -> float:
     """
@@ -151,19 +300,35 @@ async def get_video_length(video_url: str) -> float:
         # Default to a safe value for development
         return 10.0
 
+# Wall-clock benchmark on a real recording, e.g. a 60-minute meeting. Needs
+# ffmpeg (and GOOGLE_API_KEY unless --extract-only); the transcription cache
+# is bypassed so every run transcribes. Concurrency 1 approximates the old
+# one-chunk-at-a-time flow.
+#   python -m agents.transcription_agent.transcription_agent <video path or URL> [--concurrency 1 4] [--extract-only]
 if __name__ == '__main__':
-    # --- How to use this script ---
-    # 1. Make sure you have a .env file in the `backend` directory with your GOOGLE_API_KEY.
-    # 2. Provide either a local video file path OR a public Google Drive URL.
-
-    # --- Example with a local file ---
-    # video_file_path = "data/meeting_video/meeting.mp4"
-    # video_drive_url = None
+    import argparse
 
-    # --- Example with a Google Drive URL ---
-    # Make sure the link is public / shareable
-    video_file_path = None
-    video_drive_url = "https://drive.google.com/file/d/1-sample-id-for-a-video/view?usp=sharing" # Replace with a real public video link
+    parser = argparse.ArgumentParser(description="Time the transcription of one recording.")
+    parser.add_argument("source", help="Local video path, or a public URL (Google Drive links work).")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, CHUNK_CONCURRENCY], help="Chunk concurrencies to compare.")
+    parser.add_argument("--extract-only", action="store_true", help="Only time audio extraction and windowing (no Gemini calls).")
+    args = parser.parse_args()
+    is_url = args.source.startswith(("http://", "https://"))
 
-    # Call the transcription function
-    transcribe_video(video_path=video_file_path, video_url=video_drive_url)
\ No newline at end of file
+    if args.extract_only:
+        with tempfile.TemporaryDirectory() as out_dir:
+            started_at = time.perf_counter()
+            ready = []
+            windows = stream_audio_windows(
+                resolve_stream_url(args.source) if is_url else args.source,
+                out_dir,
+                on_window=lambda path, index, start, end: ready.append(time.perf_counter() - started_at),
+            )
+            print(f"{len(windows)} window(s); first ready after {ready[0]:.1f}s, all after {time.perf_counter() - started_at:.1f}s")
+    else:
+        print(f"{'concurrency':>11} {'seconds':>8} {'characters':>10}")
+        for concurrency in args.concurrency:
+            CHUNK_CONCURRENCY = concurrency  # read by transcribe_video_with_fingerprints
+            started_at = time.perf_counter()
+            transcript = transcribe_video(video_path=None if is_url else args.source, video_url=args.source if is_url else None, use_cache=False)
+            print(f"{concurrency:>11} {time.perf_counter() - started_at:8.1f} {len(transcript):>10}")
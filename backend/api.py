@@ -1,29 +1,33 @@
-from fastapi import FastAPI, Body, Depends, HTTPException, BackgroundTasks # Import BackgroundTasks
+from fastapi import FastAPI, Body, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from agents.agenda_planner.agenda_planner import generate_agenda
 from agents.minutes_generator.minutes_generator import generate_minutes
 from agents.action_item_tracker.tracker import extract_and_schedule_tasks
-from agents.transcription_agent.transcription_agent import transcribe_video, get_video_length
-from agents.action_item_tracker.calendar_service import schedule_action_item, SCOPES
-import dateparser
-from bson import ObjectId
-from datetime import datetime
-import os
-from lib.auth import get_current_user
+from agents.transcription_agent.transcription_agent import transcribe_video_with_fingerprints, get_video_length
+from agents.transcription_agent.file_waiter import get_file_wait_stats
+from agents.action_item_tracker.calendar_service import schedule_action_item, forget_calendar_service, SCOPES
+from lib.auth import get_current_user, get_clerk_client
+from lib.executors import run_io, run_ai, shutdown_executors
 from lib.database import (
-    get_db,
-    get_all_agendas_for_user,
-    get_all_action_items_for_user,
     get_agenda,
-    get_all_minutes_for_user,
     get_minutes_by_id,
     update_agenda,
     save_meeting,
-    get_all_meetings_for_user,
     update_meeting,
     delete_meeting,
     save_transcript,
     delete_transcript, # <-- Import delete_transcript
+    delete_agenda,
+    find_page,
+    decode_cursor,
+    get_dashboard_summary,
+    get_transcript_by_id,
+    get_calendar_events,
+    get_calendar_events_version,
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    update_action_item,
     save_google_credentials,
     get_google_credentials,
     delete_google_credentials
@@ -32,21 +36,32 @@ from lib.notifications import (
     get_user_notifications,
     mark_all_notifications_read,
     mark_notification_read,
-    create_notification,
     update_notification_email_status,
     send_email_notification,
-    AutomationNotifier # Import the new notifier class
 )
+from lib.deadlines import get_deadline_cache_stats, parse_datetime
+from lib.notification_stream import get_notification_hub, stream_notifications
+from lib.jobs import enqueue_job, get_job
+from lib.pipeline_runs import pipeline_key
+from lib.indexes import ensure_indexes
+from lib.transcript_cache import get_transcript_cache_stats
+from lib.rate_limiter import get_rate_limiter_stats
+from lib.llm_cache import get_llm_cache_stats
+from agents.agenda_planner.topic_cache import get_topic_cache_stats
+from automation import AUTOMATION_JOB_TYPE
 from lib.quota import (
     get_monthly_meeting_count,
     get_monthly_automation_cycles,
-    increment_automation_cycle,
     check_free_tier_limits,
+    reserve_free_tier_usage,
+    release_usage,
+    reserve_automation_cycle,
+    release_automation_cycle,
+    FREE_TIER_LIMITS,
     get_monthly_transcription_count,
 )
 from google_auth_oauthlib.flow import Flow
 from google.auth.transport.requests import Request
-from clerk_backend_api import Clerk 
 # --- ADD THIS IMPORT FOR DETAILED ERROR LOGGING ---
 import traceback
 
@@ -60,70 +75,37 @@ app.add_middleware(
     # --- FIX: Explicitly list the allowed methods ---
     allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
-# +++ AUTOMATION FLOW +++
-def run_full_automation_flow(user_id: str, meeting_id: str, video_url: str = None, transcript_text: str = None):
+async def list_page(response: Response, collection: str, user_id: str, after: str = None, limit: int = None) -> list:
     """
-    This function runs in the background. It orchestrates the entire agent chain.
+    Fetches one keyset page of a user's documents. The list stays the response
+    body; the cursor for the next page (if any) goes in the X-Next-Cursor header.
     """
-    notifier = AutomationNotifier(user_id, meeting_id)
-    try:
-        print(f"🤖 [Auto-Flow] Starting for user {user_id}, meeting {meeting_id}")
-        notifier.start()
-
-        # --- Step 1: Transcription (if needed) ---
-        if video_url:
-            notifier.step_transcribe()
-            print(f"🤖 [Auto-Flow] Step 1: Transcribing video...")
-            transcript_text = transcribe_video(video_url=video_url, user_id=user_id)
-            if not transcript_text:
-                raise ValueError("Transcription failed to produce text.")
-            save_transcript(transcript_text, user_id, meeting_id, f"Meeting {meeting_id}", str(datetime.utcnow().date()), automated=True)
-            print(f"🤖 [Auto-Flow] Step 1 Complete: Transcription saved.")
-
-        # --- Step 2: Generate Minutes ---
-        notifier.step_minutes()
-        print(f"🤖 [Auto-Flow] Step 2: Generating minutes...")
-        minutes_data = generate_minutes(user_id=user_id, transcript_text=transcript_text)
-        if not minutes_data or not minutes_data.get("_id"):
-            raise ValueError("Minutes generation failed.")
-        minutes_id = minutes_data["_id"]
-        print(f"🤖 [Auto-Flow] Step 2 Complete: Minutes generated with ID {minutes_id}.")
-
-        # --- Step 3: Generate Action Items ---
-        notifier.step_actions()
-        print(f"🤖 [Auto-Flow] Step 3: Extracting action items...")
-        extract_and_schedule_tasks(user_id=user_id, minutes_id=minutes_id)
-        print(f"🤖 [Auto-Flow] Step 3 Complete: Action items extracted and scheduled.")
-
-        # --- Final Step: Increment Quota & Notify ---
-        increment_automation_cycle(meeting_id, user_id)
-        
-        # --- NEW: Prompt for Google Calendar Integration ---
-        db = get_db()
-        user_info = db.users.find_one({"user_id": user_id})
-        if user_info and user_info.get("tier") == "premium":
-            if not get_google_credentials(user_id):
-                create_notification(
-                    user_id=user_id,
-                    title="Enhance Your Workflow",
-                    message="Connect your Google Calendar to automatically schedule action items.",
-                    type="prompt_google_calendar_integration"
-                )
-                print(f"🤖 [Auto-Flow] Sent Google Calendar integration prompt to premium user {user_id}.")
-
-        notifier.success()
-        print(f"🤖 [Auto-Flow] Success for user {user_id}, meeting {meeting_id}")
+    if after:
+        try:
+            decode_cursor(after)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid 'after' cursor.")
+    docs, next_cursor = await run_io(find_page, collection, user_id, after, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return docs
 
+@app.on_event("startup")
+async def startup_event():
+    try:
+        await run_io(ensure_indexes)
     except Exception as e:
-        error_reason = str(e)
-        print(f"🤖❌ [Auto-Flow] FAILED for user {user_id}, meeting {meeting_id}. Reason: {error_reason}")
-        notifier.error(error_reason)
+        print(f"⚠️ Could not ensure MongoDB indexes at startup: {e}")
+
+@app.on_event("shutdown")
+def shutdown_event():
+    shutdown_executors(wait=False)
 
 @app.post("/process-automated")
 async def process_automated_endpoint(
-    background_tasks: BackgroundTasks,
     request_body: dict = Body(...),
     current_user: dict = Depends(get_current_user)
 ):
@@ -134,15 +116,6 @@ async def process_automated_endpoint(
     user_id = current_user.get("sub")
     tier = current_user.get("metadata", {}).get("tier", "free")
     
-    # --- Quota Check for Free Users ---
-    if tier == "free":
-        exceeded, quota_info = check_free_tier_limits(user_id, "automation")
-        if exceeded:
-            raise HTTPException(
-                status_code=403,
-                detail=f"You have used all {quota_info['limit']} of your automation cycles for this month. Upgrade to Premium for unlimited automations."
-            )
-
     video_url = request_body.get("video_url")
     transcript_text = request_body.get("transcript_text")
     meeting_id = request_body.get("meeting_id")
@@ -150,11 +123,50 @@ async def process_automated_endpoint(
     if not meeting_id or (not video_url and not transcript_text):
         raise HTTPException(status_code=400, detail="meeting_id and either video_url or transcript_text are required.")
 
-    # Add the long-running task to the background
-    background_tasks.add_task(run_full_automation_flow, user_id, meeting_id, video_url, transcript_text)
+    # --- Quota for Free Users ---
+    # The cycle is counted atomically when the job is enqueued (once per meeting),
+    # so parallel submissions and queued jobs cannot overshoot the monthly limit.
+    # The worker gives it back if the job that counted it finally fails.
+    limit = FREE_TIER_LIMITS["automation"] if tier == "free" else None
+    try:
+        allowed, counted = await run_io(reserve_automation_cycle, meeting_id, user_id, limit)
+    except LookupError:
+        raise HTTPException(status_code=404, detail="Meeting not found.")
+    if not allowed:
+        raise HTTPException(
+            status_code=403,
+            detail=f"You have used all {limit} of your automation cycles for this month. Upgrade to Premium for unlimited automations."
+        )
+
+    # Hand the long-running flow to the job queue; worker.py processes it.
+    # Re-submitting a meeting joins its active job, or resumes its pipeline run.
+    try:
+        job_id = await run_io(
+            enqueue_job,
+            AUTOMATION_JOB_TYPE,
+            user_id,
+            {"video_url": video_url, "transcript_text": transcript_text, "automation_cycle_counted": counted},
+            meeting_id=meeting_id,
+            idempotency_key=pipeline_key(user_id, meeting_id),
+        )
+    except Exception:
+        if counted:
+            await run_io(release_automation_cycle, meeting_id, user_id)
+        raise
 
     # Immediately return a response to the user
-    return {"message": "Automation process started. You will receive a notification upon completion."}
+    return {"message": "Automation process started. You will receive a notification upon completion.", "job_id": job_id}
+
+@app.get("/jobs/{job_id}")
+async def get_job_status_endpoint(job_id: str, current_user: dict = Depends(get_current_user)):
+    """
+    Returns the status of a queued automation job for the authenticated user.
+    """
+    user_id = current_user.get("sub")
+    job = await run_io(get_job, job_id, user_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job
 
 
 # --- ROUTES ---
@@ -177,61 +189,86 @@ async def create_agenda_endpoint(
             raise HTTPException(status_code=400, detail="User ID not found in token.")
         
         print(f"Authenticated request. Generating agenda for user: {user_id}")
-        agenda = generate_agenda(user_input, user_id=user_id)
+        agenda = await run_ai(generate_agenda, user_input, user_id=user_id)
         return agenda
     except Exception as e:
         print(f"Error creating agenda: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/agendas")
-async def get_agendas_endpoint(current_user: dict = Depends(get_current_user)):
+async def get_agendas_endpoint(
+    response: Response,
+    after: str = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: dict = Depends(get_current_user)
+):
     """
-    Retrieves all agendas for the authenticated user.
+    Retrieves agendas for the authenticated user, newest first, one page at a time.
     """
     try:
         user_id = current_user.get("sub")
         if not user_id:
             raise HTTPException(status_code=400, detail="User ID not found in token.")
         
-        agendas = get_all_agendas_for_user(user_id)
-        return agendas
+        return await list_page(response, "agendas", user_id, after, limit)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error getting agendas: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/action-items")
-async def get_action_items_endpoint(current_user: dict = Depends(get_current_user)):
+async def get_action_items_endpoint(
+    response: Response,
+    after: str = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: dict = Depends(get_current_user)
+):
     """
-    Retrieves all action items for the authenticated user.
+    Retrieves action items for the authenticated user, newest first, one page at a time.
     """
     try:
         user_id = current_user.get("sub")
         if not user_id:
             raise HTTPException(status_code=400, detail="User ID not found in token.")
         
-        action_items = get_all_action_items_for_user(user_id)
-        return action_items
+        return await list_page(response, "action_items", user_id, after, limit)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error getting action items: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/minutes")
-async def get_all_minutes_endpoint(current_user: dict = Depends(get_current_user)):
+async def get_all_minutes_endpoint(
+    response: Response,
+    after: str = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: dict = Depends(get_current_user)
+):
     """
-    Retrieves minutes documents for the authenticated user.
+    Retrieves minutes summaries for the authenticated user, newest first.
     For free users, only returns the last 3 minutes.
     """
     user_id = current_user.get("sub")
     tier = current_user.get("metadata", {}).get("tier", "free")
     
-    minutes = get_all_minutes_for_user(user_id)
-    
-    # TIER CHECK: Limit history for free users
-    if tier == "free" and len(minutes) > 3:
-        # Sort by date and return only the most recent 3
-        minutes = sorted(minutes, key=lambda x: x.get("created_at", ""), reverse=True)[:3]
+    # TIER CHECK: Limit history for free users to the most recent 3
+    if tier == "free":
+        if after:
+            return []
+        minutes, _ = await run_io(find_page, "minutes", user_id, None, min(limit, 3))
+        return minutes
         
-    return minutes
+    return await list_page(response, "minutes", user_id, after, limit)
+
+@app.get("/dashboard/summary")
+async def get_dashboard_summary_endpoint(current_user: dict = Depends(get_current_user)):
+    """
+    Returns the Dashboard's recent minutes, upcoming action items and counts.
+    """
+    user_id = current_user.get("sub")
+    return await run_io(get_dashboard_summary, user_id)
 
 @app.get("/minutes/{minutes_id}")
 async def get_minute_detail_endpoint(minutes_id: str, current_user: dict = Depends(get_current_user)):
@@ -239,52 +276,38 @@ async def get_minute_detail_endpoint(minutes_id: str, current_user: dict = Depen
     Retrieves a single minutes document by its ID.
     """
     user_id = current_user.get("sub")
-    minute = get_minutes_by_id(minutes_id, user_id)
+    minute = await run_io(get_minutes_by_id, minutes_id, user_id)
     if not minute:
         raise HTTPException(status_code=404, detail="Minutes not found.")
     return minute
 
 @app.get("/events")
-async def get_events_endpoint(current_user: dict = Depends(get_current_user)):
+async def get_events_endpoint(
+    request: Request,
+    response: Response,
+    start: str = Query(None, description="Only events starting at or after this date (ISO)."),
+    end: str = Query(None, description="Only events starting before this date (ISO)."),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Returns the user's calendar events from the precomputed projection. The
+    ETag changes whenever a meeting or action item changes, so an unchanged
+    calendar is answered with 304 without reading any events.
+    """
     user_id = current_user.get("sub")
-    meetings = get_all_meetings_for_user(user_id)
-    action_items = get_all_action_items_for_user(user_id)  # <-- Add this
-
-    events = []
-
-    # Meetings as events
-    for meeting in meetings:
-        event_date = dateparser.parse(meeting.get("meeting_date"))
-        if event_date:
-            events.append({
-                "title": meeting.get("meeting_name", "Untitled Meeting"),
-                "start": event_date,
-                "end": event_date,
-                "allDay": True,
-                "resource": {
-                    "type": "meeting",
-                    "agenda_id": meeting.get("agenda_id")
-                }
-            })
-
-    # Action items as events
-    for item in action_items:
-        deadline = item.get("deadline")
-        if deadline:
-            deadline_date = dateparser.parse(deadline)
-            if deadline_date:
-                events.append({
-                    "title": item.get("task", "Untitled Action Item"),
-                    "start": deadline_date,
-                    "end": deadline_date,
-                    "allDay": True,
-                    "resource": {
-                        "type": "action-item",
-                        "owner": item.get("owner"),
-                        "status": item.get("status", "pending")
-                    }
-                })
-
+    start_date, end_date = parse_datetime(start), parse_datetime(end)
+    if (start and not start_date) or (end and not end_date):
+        raise HTTPException(status_code=400, detail="'start' and 'end' must be dates.")
+
+    version = await run_io(get_calendar_events_version, user_id)
+    bounds = "-".join(value.isoformat() if value else "" for value in (start_date, end_date))
+    etag = f'W/"{version}-{bounds}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    events = await run_io(get_calendar_events, user_id, start_date, end_date)
+    response.headers.update(headers)
     return events
 
 @app.post("/schedule-agenda")
@@ -297,14 +320,15 @@ async def schedule_agenda_endpoint(
     if not agenda_id:
         raise HTTPException(status_code=400, detail="agenda_id is required.")
 
-    agenda = get_agenda(agenda_id, user_id)
+    agenda = await run_io(get_agenda, agenda_id, user_id)
     if not agenda:
         raise HTTPException(status_code=404, detail="Agenda not found.")
 
     try:
         description = "\n".join([item['topic'] for item in agenda.get("agenda", [])])
         # Schedule in Google Calendar
-        schedule_action_item(
+        await run_io(
+            schedule_action_item,
             user_id,
             task_name=agenda.get("meeting_name"),
             description=description,
@@ -319,8 +343,7 @@ async def schedule_agenda_endpoint(
             "agenda_id": agenda.get("meeting_id"),
             "status": "scheduled"
         }
-        from lib.database import save_meeting
-        save_meeting(meeting_data, user_id)
+        await run_io(save_meeting, meeting_data, user_id)
         return {"message": "Meeting scheduled successfully in Google Calendar and saved in DB."}
     except Exception as e:
         print(f"Error scheduling agenda: {e}")
@@ -349,26 +372,33 @@ async def transcribe_endpoint(
             if video_length_minutes > 15:
                 raise HTTPException(status_code=403, detail="Free tier users can only transcribe meetings up to 15 minutes.")
             
-            exceeded, quota_info = check_free_tier_limits(user_id, "transcription")
-            if exceeded:
-                raise HTTPException(status_code=403, detail=f"You've reached your monthly limit of {quota_info['limit']} video transcriptions.")
+            # Counted up front (and given back on failure) so parallel requests cannot overshoot
+            if not await run_io(reserve_free_tier_usage, user_id, "transcription"):
+                raise HTTPException(status_code=403, detail=f"You've reached your monthly limit of {FREE_TIER_LIMITS['transcription']} video transcriptions.")
 
-        transcript_text = transcribe_video(video_url=video_url, user_id=user_id)
-        
-        if not transcript_text:
-            raise HTTPException(status_code=500, detail="Transcription failed to produce text.")
+        try:
+            transcript_text, fingerprints = await run_ai(transcribe_video_with_fingerprints, video_url=video_url, user_id=user_id)
+
+            if not transcript_text:
+                raise HTTPException(status_code=500, detail="Transcription failed to produce text.")
+
+            # Save the transcript and mark it as automated
+            transcript_id = await run_io(
+                save_transcript,
+                transcript_text=transcript_text,
+                user_id=user_id,
+                meeting_id=meeting_id,
+                meeting_name=meeting_name,
+                meeting_date=meeting_date,
+                automated=True, # This will be used for quota counting
+                fingerprints=fingerprints,
+                usage_reserved=tier == "free",
+            )
+        except Exception:
+            if tier == "free":
+                await run_io(release_usage, user_id, "transcription")
+            raise
 
-        # Save the transcript and mark it as automated
-        from lib.database import save_transcript
-        transcript_id = save_transcript(
-            transcript_text=transcript_text,
-            user_id=user_id,
-            meeting_id=meeting_id,
-            meeting_name=meeting_name,
-            meeting_date=meeting_date,
-            automated=True # This will be used for quota counting
-        )
-        
         return {"message": "Transcription successful", "transcript_id": transcript_id}
     except Exception as e:
         print(f"Error in /transcribe: {e}")
@@ -383,7 +413,8 @@ async def save_manual_transcript_endpoint(
     """Saves a manually provided transcript."""
     try:
         user_id = current_user.get("sub")
-        transcript_id = save_transcript(
+        transcript_id = await run_io(
+            save_transcript,
             transcript_text=request_body.get("transcript"),
             user_id=user_id,
             meeting_id=request_body.get("meeting_id"),
@@ -398,17 +429,27 @@ async def save_manual_transcript_endpoint(
 
 
 @app.get("/transcripts")
-async def get_transcripts_endpoint(current_user: dict = Depends(get_current_user)):
+async def get_transcripts_endpoint(
+    response: Response,
+    after: str = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: dict = Depends(get_current_user)
+):
     """
-    Retrieves all transcripts for the authenticated user.
+    Retrieves transcripts for the authenticated user, newest first. Each item
+    carries a `transcript_preview`; fetch /transcripts/{id} for the full text.
     """
     user_id = current_user.get("sub")
-    db = get_db()
-    transcripts = list(db.transcripts.find({"user_id": user_id}, sort=[("created_at", -1)]))
-    for t in transcripts:
-        if "_id" in t:
-            t["_id"] = str(t["_id"])
-    return transcripts
+    return await list_page(response, "transcripts", user_id, after, limit)
+
+@app.get("/transcripts/{transcript_id}")
+async def get_transcript_endpoint(transcript_id: str, current_user: dict = Depends(get_current_user)):
+    """Retrieves a single transcript, including its full text."""
+    user_id = current_user.get("sub")
+    transcript = await run_io(get_transcript_by_id, transcript_id, user_id)
+    if not transcript:
+        raise HTTPException(status_code=404, detail="Transcript not found.")
+    return transcript
 
 @app.delete("/transcripts/{transcript_id}")
 async def delete_transcript_endpoint(
@@ -417,7 +458,7 @@ async def delete_transcript_endpoint(
 ):
     """Deletes a transcript for the authenticated user."""
     user_id = current_user.get("sub")
-    deleted_count = delete_transcript(transcript_id, user_id)
+    deleted_count = await run_io(delete_transcript, transcript_id, user_id)
     if deleted_count == 0:
         raise HTTPException(status_code=404, detail="Transcript not found or you do not have permission to delete it.")
     return {"message": "Transcript deleted successfully."}
@@ -427,15 +468,18 @@ async def generate_minutes_endpoint(request_body: dict = Body(None), current_use
     """
     Generates minutes from a transcript for the authenticated user.
     If no transcript_id is provided, it uses the latest one.
+    Pass "refresh": true to bypass cached LLM responses.
     """
     try:
         user_id = current_user.get("sub")
         transcript_id = None
+        refresh = False
         if request_body:
             transcript_id = request_body.get("transcript_id")
+            refresh = bool(request_body.get("refresh"))
         
         # This function returns the full minutes document, including the new _id
-        minutes_data = generate_minutes(user_id=user_id, transcript_id=transcript_id)
+        minutes_data = await run_ai(generate_minutes, user_id=user_id, transcript_id=transcript_id, use_cache=not refresh)
         
         if not minutes_data:
             raise HTTPException(status_code=500, detail="Failed to generate minutes from transcript.")
@@ -453,7 +497,7 @@ async def generate_action_items_endpoint(
 ):
     """
     Generates action items for a specific minutes document.
-    Expects: {"minutes_id": "..."}
+    Expects: {"minutes_id": "..."} and optionally "refresh": true to bypass cached LLM responses.
     """
     try:
         user_id = current_user.get("sub")
@@ -462,7 +506,7 @@ async def generate_action_items_endpoint(
             raise HTTPException(status_code=400, detail="minutes_id is required.")
         
         # --- MODIFIED: Capture the return value which contains the corrected items ---
-        action_items_result = extract_and_schedule_tasks(user_id=user_id, minutes_id=minutes_id)
+        action_items_result = await run_ai(extract_and_schedule_tasks, user_id=user_id, minutes_id=minutes_id, use_cache=not request_body.get("refresh"))
         
         if action_items_result is None:
             raise HTTPException(status_code=404, detail="Failed to process action items. Minutes document may not exist.")
@@ -484,7 +528,7 @@ async def update_agenda_endpoint(
     """
     user_id = current_user.get("sub")
     # Implement update logic in lib/database.py
-    updated_agenda = update_agenda(agenda_id, update_data, user_id)
+    updated_agenda = await run_io(update_agenda, agenda_id, update_data, user_id)
     if not updated_agenda:
         raise HTTPException(status_code=404, detail="Agenda not found or update failed.")
     return updated_agenda
@@ -499,16 +543,9 @@ async def update_action_item_status(
     Updates the status or details of an action item.
     """
     user_id = current_user.get("sub")
-    db = get_db()
-    result = db.action_items.update_one(
-        {"_id": ObjectId(item_id), "user_id": user_id},
-        {"$set": update_data}
-    )
-    if result.modified_count == 0:
+    item = await run_io(update_action_item, item_id, update_data, user_id)
+    if not item:
         raise HTTPException(status_code=404, detail="Action item not found or update failed.")
-    item = db.action_items.find_one({"_id": ObjectId(item_id), "user_id": user_id})
-    if item and "_id" in item:
-        item["_id"] = str(item["_id"])
     return item
 
 @app.post("/meetings")
@@ -523,25 +560,33 @@ async def create_meeting_endpoint(
     tier = current_user.get("tier", "free")
     # Enforce meeting count for free users
     if tier == "free":
-        from lib.database import get_document_count
-        count = get_document_count("meetings", user_id)
-        if count >= 5:
-            raise HTTPException(status_code=403, detail="Free tier: max 5 meetings per month.")
         # Enforce meeting length
         if meeting_data.get("duration", 0) > 15:
             raise HTTPException(status_code=403, detail="Free tier: max 15 min meetings.")
+        # Counted atomically, so parallel requests cannot overshoot the limit
+        if not await run_io(reserve_free_tier_usage, user_id, "meeting"):
+            raise HTTPException(status_code=403, detail=f"Free tier: max {FREE_TIER_LIMITS['meeting']} meetings per month.")
+        try:
+            return await run_io(save_meeting, meeting_data, user_id, usage_reserved=True)
+        except Exception:
+            await run_io(release_usage, user_id, "meeting")
+            raise
     # Proceed as normal for premium
-    meeting = save_meeting(meeting_data, user_id)
+    meeting = await run_io(save_meeting, meeting_data, user_id)
     return meeting
 
 @app.get("/meetings")
-async def get_meetings_endpoint(current_user: dict = Depends(get_current_user)):
+async def get_meetings_endpoint(
+    response: Response,
+    after: str = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: dict = Depends(get_current_user)
+):
     """
-    Retrieves all meetings for the authenticated user.
+    Retrieves meetings for the authenticated user, newest first, one page at a time.
     """
     user_id = current_user.get("sub")
-    meetings = get_all_meetings_for_user(user_id)
-    return meetings
+    return await list_page(response, "meetings", user_id, after, limit)
 
 @app.patch("/meetings/{meeting_id}")
 async def update_meeting_endpoint(
@@ -553,7 +598,7 @@ async def update_meeting_endpoint(
     Updates an existing meeting for the authenticated user.
     """
     user_id = current_user.get("sub")
-    updated_meeting = update_meeting(meeting_id, update_data, user_id)
+    updated_meeting = await run_io(update_meeting, meeting_id, update_data, user_id)
     if not updated_meeting:
         raise HTTPException(status_code=404, detail="Meeting not found or update failed.")
     return updated_meeting
@@ -567,7 +612,7 @@ async def delete_meeting_endpoint(
     Deletes a meeting for the authenticated user.
     """
     user_id = current_user.get("sub")
-    deleted = delete_meeting(meeting_id, user_id)
+    deleted = await run_io(delete_meeting, meeting_id, user_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Meeting not found or delete failed.")
     return {"message": "Meeting deleted."}
@@ -581,9 +626,8 @@ async def delete_agenda_endpoint(
     Deletes an agenda for the authenticated user.
     """
     user_id = current_user.get("sub")
-    db = get_db()
-    result = db.agendas.delete_one({"meeting_id": agenda_id, "user_id": user_id})
-    if result.deleted_count == 0:
+    deleted_count = await run_io(delete_agenda, agenda_id, user_id)
+    if deleted_count == 0:
         raise HTTPException(status_code=404, detail="Agenda not found or already deleted.")
     return {"message": "Agenda deleted successfully."}
 
@@ -594,9 +638,8 @@ async def list_users(current_user: dict = Depends(get_current_user)):
         print("[/admin/users] Forbidden: Not admin")
         raise HTTPException(status_code=403, detail="Forbidden: Admins only.")
     # Example: Fetch users from Clerk (replace with your actual logic)
-    from clerk_backend_api import Clerk
-    clerk = Clerk(bearer_auth=os.getenv("CLERK_SECRET_KEY"))
-    users = clerk.users.list()
+    clerk = get_clerk_client()
+    users = await run_io(clerk.users.list)
     # Format users for frontend
     user_list = []
     for u in users:
@@ -621,10 +664,10 @@ async def update_user_tier(user_id: str, tier: str, current_user: dict = Depends
         raise HTTPException(status_code=403, detail="Admin access required")
     
     try:
-        clerk = Clerk(bearer_auth=os.getenv("CLERK_SECRET_KEY"))
+        clerk = get_clerk_client()
         print("1. Clerk client initialized.")
         
-        user_to_update = clerk.users.get(user_id=user_id)
+        user_to_update = await run_io(clerk.users.get, user_id=user_id)
         print(f"2. Fetched user to update. Current metadata: {user_to_update.public_metadata}")
         
         current_metadata = user_to_update.public_metadata or {}
@@ -632,7 +675,7 @@ async def update_user_tier(user_id: str, tier: str, current_user: dict = Depends
         print(f"3. Prepared new metadata for update: {current_metadata}")
         
         # Fix: Change update_user to update
-        updated_user = clerk.users.update(user_id=user_id, public_metadata=current_metadata)
+        updated_user = await run_io(clerk.users.update, user_id=user_id, public_metadata=current_metadata)
         print(f"4. ✅ Successfully updated user in Clerk. New metadata: {updated_user.public_metadata}")
         
         return {"success": True, "user_id": updated_user.id, "new_tier": updated_user.public_metadata.get("tier")}
@@ -651,17 +694,17 @@ async def update_user_role(user_id: str, role: str, current_user: dict = Depends
         raise HTTPException(status_code=403, detail="Admin access required")
 
     try:
-        clerk = Clerk(bearer_auth=os.getenv("CLERK_SECRET_KEY"))
+        clerk = get_clerk_client()
         print("1. Clerk client initialized.")
 
-        user_to_update = clerk.users.get(user_id=user_id)
+        user_to_update = await run_io(clerk.users.get, user_id=user_id)
         print(f"2. Fetched user to update. Current metadata: {user_to_update.public_metadata}")
 
         current_metadata = user_to_update.public_metadata or {}
         current_metadata['role'] = role
         print(f"3. Prepared new metadata for update: {current_metadata}")
 
-        updated_user = clerk.users.update(user_id=user_id, public_metadata=current_metadata)
+        updated_user = await run_io(clerk.users.update, user_id=user_id, public_metadata=current_metadata)
         print(f"4. ✅ Successfully updated user in Clerk. New metadata: {updated_user.public_metadata}")
         
         return {"success": True, "user_id": updated_user.id, "new_role": updated_user.public_metadata.get("role")}
@@ -679,8 +722,8 @@ async def delete_user(user_id: str, current_user: dict = Depends(get_current_use
         raise HTTPException(status_code=403, detail="Admin access required")
     
     try:
-        clerk = Clerk(bearer_auth=os.getenv("CLERK_SECRET_KEY"))
-        deleted_user_response = clerk.users.delete(user_id=user_id)
+        clerk = get_clerk_client()
+        deleted_user_response = await run_io(clerk.users.delete, user_id=user_id)
         
         # Optionally, you might want to clean up user-related data from your own database here.
         # For example: db.meetings.delete_many({"user_id": user_id})
@@ -690,6 +733,23 @@ async def delete_user(user_id: str, current_user: dict = Depends(get_current_use
         raise HTTPException(status_code=500, detail=f"Failed to delete user from Clerk: {str(e)}")
 
 
+@app.get("/admin/metrics")
+async def get_metrics(current_user: dict = Depends(get_current_user)):
+    """Returns cache hit rates and pipeline timing metrics for tuning."""
+    if current_user.get("metadata", {}).get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return {
+        "caches": {
+            "transcription": await run_io(get_transcript_cache_stats),
+            "llm": await run_io(get_llm_cache_stats),
+            "agenda": await run_io(get_topic_cache_stats),
+            "deadlines": get_deadline_cache_stats(),
+        },
+        "gemini_file_wait": await run_io(get_file_wait_stats),
+        "gemini_rate_limiter": get_rate_limiter_stats(),
+        "notification_stream": get_notification_hub().get_stats(),
+    }
+
 # Replace these notification endpoints
 
 @app.get("/notifications")
@@ -700,16 +760,33 @@ async def get_notifications_endpoint(current_user: dict = Depends(get_current_us
     user_id = current_user.get("sub")
     tier = current_user.get("metadata", {}).get("tier", "free")
     
-    notifications = get_user_notifications(user_id)
+    notifications = await run_io(get_user_notifications, user_id)
     return notifications
 
+@app.get("/notifications/stream")
+async def stream_notifications_endpoint(
+    request: Request,
+    related_id: str = Query(None),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Pushes the user's new notifications as Server-Sent Events. Pass a meeting
+    ID as `related_id` to follow the progress of one automation job.
+    """
+    user_id = current_user.get("sub")
+    return StreamingResponse(
+        stream_notifications(user_id, related_id, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @app.post("/notifications/read-all")
 async def read_all_notifications_endpoint(current_user: dict = Depends(get_current_user)):
     """
     Marks all notifications as read for the authenticated user.
     """
     user_id = current_user.get("sub")
-    result = mark_all_notifications_read(user_id)
+    result = await run_io(mark_all_notifications_read, user_id)
     return {"success": True, "updated": result}
 
 @app.patch("/notifications/{notification_id}/read")
@@ -721,7 +798,7 @@ async def read_notification_endpoint(
     Marks a specific notification as read.
     """
     user_id = current_user.get("sub")
-    result = mark_notification_read(notification_id, user_id)
+    result = await run_io(mark_notification_read, notification_id, user_id)
     return {"success": result}
 
 @app.get("/user/automation-quota")
@@ -736,7 +813,7 @@ async def get_automation_quota_endpoint(current_user: dict = Depends(get_current
     if tier == "premium":
         return {"limit": -1, "used": 0, "remaining": -1}
     
-    _, quota_info = check_free_tier_limits(user_id, "automation")
+    _, quota_info = await run_io(check_free_tier_limits, user_id, "automation", cached=True)
     return quota_info
 
 @app.get("/user/transcription-quota")
@@ -751,7 +828,7 @@ async def get_transcription_quota_endpoint(current_user: dict = Depends(get_curr
     if tier == "premium":
         return {"limit": -1, "used": 0, "remaining": -1}
     
-    _, quota_info = check_free_tier_limits(user_id, "transcription")
+    _, quota_info = await run_io(check_free_tier_limits, user_id, "transcription", cached=True)
     return quota_info
 
 # --- Google Calendar Auth Routes ---
@@ -796,7 +873,7 @@ async def exchange_google_auth_code(
             scopes=SCOPES,
             redirect_uri="http://localhost:5173/settings"
         )
-        flow.fetch_token(code=code)
+        await run_io(flow.fetch_token, code=code)
         credentials = flow.credentials
         
         # --- FIX: Ensure refresh_token is saved on initial exchange ---
@@ -806,10 +883,12 @@ async def exchange_google_auth_code(
             'token_uri': credentials.token_uri,
             'client_id': credentials.client_id,
             'client_secret': credentials.client_secret,
-            'scopes': credentials.scopes
+            'scopes': credentials.scopes,
+            'expiry': credentials.expiry.isoformat() + 'Z' if credentials.expiry else None,
         }
         
-        save_google_credentials(user_id, creds_dict)
+        await run_io(save_google_credentials, user_id, creds_dict)
+        forget_calendar_service(user_id)
         return {"message": "Google Calendar connected successfully."}
     except Exception as e:
         print(f"Error exchanging Google auth code: {e}")
@@ -819,12 +898,13 @@ async def exchange_google_auth_code(
 async def get_google_auth_status(current_user: dict = Depends(get_current_user)):
     """Checks if the user has connected their Google Calendar."""
     user_id = current_user.get("sub")
-    credentials = get_google_credentials(user_id)
+    credentials = await run_io(get_google_credentials, user_id)
     return {"is_connected": credentials is not None}
 
 @app.post("/auth/google/disconnect")
 async def disconnect_google_calendar(current_user: dict = Depends(get_current_user)):
     """Disconnects the user's Google Calendar."""
     user_id = current_user.get("sub")
-    delete_google_credentials(user_id)
+    await run_io(delete_google_credentials, user_id)
+    forget_calendar_service(user_id)
     return {"message": "Google Calendar disconnected successfully."}
@@ -0,0 +1,160 @@
+import time
+from datetime import datetime
+from agents.minutes_generator.minutes_generator import generate_minutes
+from agents.action_item_tracker.tracker import action_item_stages
+from agents.transcription_agent.transcription_agent import transcribe_video_with_fingerprints
+from lib.database import get_db, save_transcript, get_google_credentials, get_transcript_by_id, get_minutes_by_id, get_action_items_for_minutes
+from lib.notifications import create_notification, AutomationNotifier
+from lib.dag import Stage, run_dag
+from lib.jobs import LeaseLostError
+from lib.pipeline_runs import pipeline_key, input_fingerprint, start_pipeline_run, finish_pipeline_run, checkpointed_stages
+
+AUTOMATION_JOB_TYPE = "automation"
+
+def automation_checkpoints(user_id: str) -> dict:
+    """
+    How each stage's output is checkpointed on a pipeline run: stage name ->
+    (save(result) -> checkpoint, restore(checkpoint, results) -> result).
+    A restore raises LookupError if the referenced output is gone or no
+    longer matches the checkpoint.
+    """
+    def restore_transcript(checkpoint, results):
+        transcript = get_transcript_by_id(checkpoint["transcript_id"], user_id)
+        if not transcript:
+            raise LookupError(f"Transcript {checkpoint['transcript_id']} no longer exists.")
+        return {"transcript_id": checkpoint["transcript_id"], "transcript_text": transcript["transcript"]}
+
+    def restore_minutes(checkpoint, results):
+        minutes_doc = get_minutes_by_id(checkpoint["minutes_id"], user_id)
+        if not minutes_doc:
+            raise LookupError(f"Minutes {checkpoint['minutes_id']} no longer exist.")
+        return minutes_doc
+
+    def restore_action_items(checkpoint, results):
+        items = get_action_items_for_minutes(user_id, results["minutes"]["_id"])
+        if sorted(item["_id"] for item in items) != sorted(checkpoint["action_item_ids"]):
+            raise LookupError(f"Action items of minutes {results['minutes']['_id']} changed since the checkpoint.")
+        return items
+
+    return {
+        "transcribe": (lambda out: {"transcript_id": out["transcript_id"]}, restore_transcript),
+        "minutes": (lambda out: {"minutes_id": out["_id"]}, restore_minutes),
+        # Small, and it pins the items (and their calendar event IDs) for the rest of the run
+        "extract_action_items": (lambda out: out, lambda checkpoint, results: checkpoint),
+        "save_action_items": (lambda items: {"action_item_ids": [item["_id"] for item in items]}, restore_action_items),
+        "schedule_calendar": (
+            lambda events: {"event_ids": [event["id"] for event in events if event] if events is not None else None},
+            lambda checkpoint, results: checkpoint["event_ids"],
+        ),
+        "next_agenda": (lambda agenda_id: {"agenda_meeting_id": agenda_id}, lambda checkpoint, results: checkpoint["agenda_meeting_id"]),
+    }
+
+def automation_stages(user_id: str, meeting_id: str, notifier: AutomationNotifier, video_url: str = None, transcript_text: str = None, run: dict = None) -> list:
+    """
+    The automation flow as a stage DAG: transcribe -> minutes -> action items,
+    then calendar scheduling, saving and the next agenda side by side. With a
+    pipeline run, every stage is checkpointed on it and restored on a re-run.
+    """
+    stages = []
+
+    # --- Step 1: Transcription (if needed) ---
+    def transcribe(results):
+        notifier.step_transcribe()
+        print(f"🤖 [Auto-Flow] Step 1: Transcribing video...")
+        text, fingerprints = transcribe_video_with_fingerprints(video_url=video_url, user_id=user_id)
+        if not text:
+            raise ValueError("Transcription failed to produce text.")
+        transcript_id = save_transcript(text, user_id, meeting_id, f"Meeting {meeting_id}", str(datetime.utcnow().date()), automated=True, fingerprints=fingerprints)
+        print(f"🤖 [Auto-Flow] Step 1 Complete: Transcription saved.")
+        return {"transcript_id": transcript_id, "transcript_text": text}
+
+    if video_url:
+        stages.append(Stage("transcribe", transcribe))
+
+    # --- Step 2: Generate Minutes ---
+    def minutes(results):
+        notifier.step_minutes()
+        print(f"🤖 [Auto-Flow] Step 2: Generating minutes...")
+        minutes_data = generate_minutes(user_id=user_id, transcript_text=results["transcribe"]["transcript_text"] if video_url else transcript_text)
+        if not minutes_data or not minutes_data.get("_id"):
+            raise ValueError("Minutes generation failed.")
+        print(f"🤖 [Auto-Flow] Step 2 Complete: Minutes generated with ID {minutes_data['_id']}.")
+        notifier.step_actions()
+        return minutes_data
+
+    stages.append(Stage("minutes", minutes, deps=("transcribe",) if video_url else ()))
+
+    # --- Step 3: Action items, calendar scheduling and next agenda ---
+    stages += action_item_stages(user_id, idempotency_key=run["_id"] if run else None)
+    if run:
+        checkpoints = automation_checkpoints(user_id)
+        stages = checkpointed_stages(run, stages, checkpoints)
+    return stages
+
+def guarded_stages(stages: list, ensure_active) -> list:
+    """Wraps each stage so `ensure_active()` runs (and may raise) before the stage starts."""
+    def guard(func):
+        def run(results):
+            ensure_active()
+            return func(results)
+        return run
+    return [Stage(stage.name, guard(stage.func), stage.deps) for stage in stages]
+
+def execute_automation_flow(user_id: str, meeting_id: str, video_url: str = None, transcript_text: str = None, notifier: AutomationNotifier = None, on_stage=None, ensure_active=None):
+    """
+    Orchestrates the entire agent chain: transcribe -> minutes -> action items.
+    Independent stages run concurrently; `on_stage(name, timing)` is called as
+    each one finishes. Stage outputs are checkpointed on the meeting's pipeline
+    run, so running the same meeting again resumes after the last finished
+    stage. `ensure_active()` is called before each stage and before the final
+    notifications; the worker uses it to raise LeaseLostError once another
+    worker has taken the job over. Raises on failure so the caller (worker or
+    background task) can decide whether to retry or report the error.
+    """
+    notifier = notifier or AutomationNotifier(user_id, meeting_id)
+    print(f"🤖 [Auto-Flow] Starting for user {user_id}, meeting {meeting_id}")
+    notifier.start()
+
+    def record(name, timing):
+        print(f"🤖 [Auto-Flow] Stage '{name}' {timing['status']} in {timing['seconds']}s")
+        if on_stage:
+            on_stage(name, timing)
+
+    started_at = time.perf_counter()
+    run_key = pipeline_key(user_id, meeting_id)
+    run = start_pipeline_run(run_key, user_id, meeting_id, input_fingerprint(video_url, transcript_text))
+    stages = automation_stages(user_id, meeting_id, notifier, video_url, transcript_text, run=run)
+    if ensure_active:
+        stages = guarded_stages(stages, ensure_active)
+    try:
+        results = run_dag(stages, on_stage=record)
+    except LeaseLostError:
+        # The run now belongs to the worker that took the job over
+        raise
+    except Exception as e:
+        finish_pipeline_run(run_key, error=str(e))
+        raise
+    minutes_id = results["minutes"]["_id"]
+    print(f"🤖 [Auto-Flow] Step 3 Complete: Action items extracted and scheduled.")
+    if ensure_active:
+        ensure_active()
+
+    # --- Final Step: Notify (the automation cycle was counted when the job was enqueued) ---
+    # --- NEW: Prompt for Google Calendar Integration ---
+    db = get_db()
+    user_info = db.users.find_one({"user_id": user_id})
+    if user_info and user_info.get("tier") == "premium":
+        if not get_google_credentials(user_id):
+            create_notification(
+                user_id=user_id,
+                message="Enhance Your Workflow: Connect your Google Calendar to automatically schedule action items.",
+                type="prompt_google_calendar_integration"
+            )
+            print(f"🤖 [Auto-Flow] Sent Google Calendar integration prompt to premium user {user_id}.")
+
+    notifier.success()
+    seconds = round(time.perf_counter() - started_at, 3)
+    print(f"🤖 [Auto-Flow] Success for user {user_id}, meeting {meeting_id} in {seconds}s")
+    result = {"minutes_id": minutes_id, "seconds": seconds}
+    finish_pipeline_run(run_key, result)
+    return result
@@ -1,49 +1,58 @@
 import os
 from fastapi import Depends, HTTPException, status, Request
 # Correct imports for the 'clerk-backend-api' package
-from clerk_backend_api import Clerk, models # Import 'models' for error handling
-from clerk_backend_api.security import AuthenticateRequestOptions
+from clerk_backend_api import Clerk
+from .executors import run_io
+from .token_verifier import get_token_verifier, TokenVerificationError
+
+_clerk_client = None
 
 def get_clerk_client():
-    """Initializes and returns the Clerk client using the secret key."""
-    clerk_secret_key = os.getenv("CLERK_SECRET_KEY")
-    if not clerk_secret_key:
-        raise ValueError("CLERK_SECRET_KEY not found in environment variables.")
-    # Per documentation, the client is initialized with the secret key as the bearer_auth token
-    return Clerk(bearer_auth=clerk_secret_key)
+    """Returns the shared Clerk client, initialized with the secret key."""
+    global _clerk_client
+    if _clerk_client is None:
+        clerk_secret_key = os.getenv("CLERK_SECRET_KEY")
+        if not clerk_secret_key:
+            raise ValueError("CLERK_SECRET_KEY not found in environment variables.")
+        # Per documentation, the client is initialized with the secret key as the bearer_auth token
+        _clerk_client = Clerk(bearer_auth=clerk_secret_key)
+    return _clerk_client
+
+def _get_session_token(request: Request):
+    """Reads the session token from the Authorization header or the __session cookie."""
+    auth_header = request.headers.get("Authorization", "")
+    if auth_header.lower().startswith("bearer "):
+        return auth_header[7:].strip()
+    return request.cookies.get("__session")
 
 async def get_current_user(request: Request) -> dict:
     """
-    A FastAPI dependency that verifies the bearer token from the request
-    using the official authenticate_request method.
+    A FastAPI dependency that verifies the session token locally against the
+    cached Clerk JWKS keys and returns its claims.
     """
-    clerk = get_clerk_client()
-    try:
-        print("🔐 Verifying user token...")
-        # Use the official authenticate_request method from the SDK
-        request_state = clerk.authenticate_request(
-            request,
-            AuthenticateRequestOptions() # Add options like authorized_parties if needed
+    token = _get_session_token(request)
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User is not signed in.",
+            headers={"WWW-Authenticate": "Bearer"},
         )
 
-        if not request_state.is_signed_in:
-             raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User is not signed in.",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-
-        # The token payload is available in request_state.payload
-        session_claims = request_state.payload
-        print(f"✅ Token verified for user_id: {session_claims['sub']}")
+    verifier = get_token_verifier()
+    try:
+        # Recently verified tokens are answered from memory
+        session_claims = verifier.get_cached(token)
+        if session_claims is None:
+            # Run off the event loop: the first verification may fetch JWKS over the network
+            session_claims = await run_io(verifier.verify, token)
+            print(f"✅ Token verified for user_id: {session_claims['sub']}")
         return session_claims
 
-    # Catch the correct base error class from the 'models' submodule
-    except models.ClerkBaseError as e:
-        print(f"❌ Token verification failed: {e.message}")
+    except TokenVerificationError as e:
+        print(f"❌ Token verification failed: {e}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=f"Invalid authentication credentials: {e.message}",
+            detail=f"Invalid authentication credentials: {e}",
             headers={"WWW-Authenticate": "Bearer"},
         )
     except Exception as e:
@@ -52,4 +61,4 @@ async def get_current_user(request: Request) -> dict:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An internal error occurred during authentication."
-        )
\ No newline at end of file
+        )
@@ -0,0 +1,77 @@
+import os
+import atexit
+import threading
+from .database import get_db
+
+# Counters are summed in process and written to MongoDB at most once per
+# CACHE_STATS_FLUSH_SECONDS (one $inc for everything recorded meanwhile), so
+# a cache hit never waits on a database round trip.
+CACHE_STATS_FLUSH_SECONDS = float(os.getenv("CACHE_STATS_FLUSH_SECONDS", "10"))
+
+class Counters:
+    """
+    Named counters kept per process and summed across processes in one
+    document (_id = name) of `collection`.
+    """
+    def __init__(self, name: str, events: tuple, collection: str = "stats", flush_seconds: float = CACHE_STATS_FLUSH_SECONDS):
+        self.name = name
+        self.collection = collection
+        self.flush_seconds = flush_seconds
+        self._lock = threading.Lock()
+        self._counts = {event: 0 for event in events}
+        self._pending = {}
+        self._timer = None
+        atexit.register(self.flush)
+
+    def record(self, event: str, count: int = 1):
+        """Updates the in-process counter; the first event in a window schedules the persistent write."""
+        with self._lock:
+            self._counts[event] += count
+            self._pending[event] = self._pending.get(event, 0) + count
+            if self.flush_seconds > 0 and self._timer is None:
+                self._timer = threading.Timer(self.flush_seconds, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if self.flush_seconds <= 0:
+            self.flush()
+
+    def flush(self):
+        """Adds the counts recorded since the last flush to the persistent (cross-process) counters."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not pending:
+            return
+        try:
+            get_db()[self.collection].update_one({"_id": self.name}, {"$inc": pending}, upsert=True)
+        except Exception as e:
+            print(f"⚠️ Failed to record {self.name} stats: {e}")
+
+    def totals(self) -> tuple:
+        """Returns (this process's counts, counts summed across all processes)."""
+        self.flush()
+        with self._lock:
+            local = dict(self._counts)
+        persisted = get_db()[self.collection].find_one({"_id": self.name}) or {}
+        return local, {event: persisted.get(event, 0) for event in local}
+
+class CacheStats(Counters):
+    """
+    Hit/miss/eviction counters for one cache, summed across processes in the
+    cache_stats collection (one document per cache).
+    """
+    def __init__(self, name: str, events=("hits", "misses", "evictions"), flush_seconds: float = CACHE_STATS_FLUSH_SECONDS):
+        super().__init__(name, events, collection="cache_stats", flush_seconds=flush_seconds)
+
+    def snapshot(self) -> dict:
+        """Returns hit/miss counters for this process and across all processes."""
+        local, persisted = self.totals()
+        hits = sum(persisted.get(event, 0) for event in local if event.startswith("hits"))
+        total = hits + persisted.get("misses", 0)
+        return {
+            "process": local,
+            "global": persisted,
+            "hit_rate": round(hits / total, 3) if total else None,
+        }
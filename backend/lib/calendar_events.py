@@ -0,0 +1,74 @@
+import time
+from .deadlines import parse_datetime
+
+def meeting_event(meeting: dict):
+    """Returns the calendar event for a meeting, or None if its date cannot be parsed."""
+    event_date = parse_datetime(meeting.get("meeting_date"))
+    if not event_date:
+        return None
+    return {
+        "title": meeting.get("meeting_name", "Untitled Meeting"),
+        "start": event_date,
+        "end": event_date,
+        "allDay": True,
+        "resource": {
+            "type": "meeting",
+            "agenda_id": meeting.get("agenda_id")
+        }
+    }
+
+def action_item_event(item: dict):
+    """Returns the calendar event for an action item, or None if its deadline cannot be parsed."""
+    deadline_date = parse_datetime(item.get("deadline"))
+    if not deadline_date:
+        return None
+    return {
+        "title": item.get("task", "Untitled Action Item"),
+        "start": deadline_date,
+        "end": deadline_date,
+        "allDay": True,
+        "resource": {
+            "type": "action-item",
+            "owner": item.get("owner"),
+            "status": item.get("status", "pending")
+        }
+    }
+
+def calendar_events(meetings: list, action_items: list) -> list:
+    """Turns meetings and action items into calendar events, skipping unparseable dates."""
+    events = [meeting_event(meeting) for meeting in meetings] + [action_item_event(item) for item in action_items]
+    return [event for event in events if event]
+
+# Benchmark of building events from source documents (the projection's write side):
+#   python -m lib.calendar_events
+if __name__ == "__main__":
+    import dateparser
+
+    def legacy_events(meetings, action_items):
+        """The previous implementation: dateparser on every date, every request."""
+        return [dateparser.parse(doc.get("meeting_date") or doc.get("deadline")) for doc in meetings + action_items]
+
+    def make_docs(count):
+        # Mostly normalized ISO deadlines, plus some legacy free-text ones
+        legacy = ["Friday", "next week", "end of month", "September 30"]
+        meetings = [{"meeting_name": f"Meeting {i}", "meeting_date": f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}"} for i in range(count // 10)]
+        items = [
+            {"task": f"Task {i}", "owner": "Alex", "deadline": legacy[i % len(legacy)] if i % 20 == 0 else f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}"}
+            for i in range(count - len(meetings))
+        ]
+        return meetings, items
+
+    print(f"{'items':>7} {'dateparser (ms)':>16} {'normalized (ms)':>16}")
+    for count in (1_000, 10_000, 100_000):
+        meetings, items = make_docs(count)
+        started_at = time.perf_counter()
+        calendar_events(meetings, items)
+        new_ms = (time.perf_counter() - started_at) * 1000
+
+        if count <= 10_000:
+            started_at = time.perf_counter()
+            legacy_events(meetings, items)
+            legacy = f"{(time.perf_counter() - started_at) * 1000:16.1f}"
+        else:
+            legacy = f"{'(skipped)':>16}"
+        print(f"{count:>7} {legacy} {new_ms:16.1f}")
@@ -1,9 +1,12 @@
 import os
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure # Import the exception class
+import re
+from pymongo import MongoClient, ReturnDocument, ReplaceOne, DeleteOne
+from pymongo.errors import ConnectionFailure, DuplicateKeyError, OperationFailure # Import the exception classes
 from bson.objectid import ObjectId # Import the ObjectId class
+from bson.errors import InvalidId
 from dotenv import load_dotenv
 from datetime import datetime
+from .calendar_events import meeting_event, action_item_event
 
 load_dotenv()  # Load environment variables from .env file
 
@@ -108,8 +111,12 @@ def get_agenda(meeting_id: str, user_id: str):
         agenda["_id"] = str(agenda["_id"])
     return agenda
 
-def save_transcript(transcript_text: str, user_id: str, meeting_id: str, meeting_name: str, meeting_date: str, automated: bool = False):
-    """Saves a raw transcript for a specific user."""
+def save_transcript(transcript_text: str, user_id: str, meeting_id: str, meeting_name: str, meeting_date: str, automated: bool = False, fingerprints: dict = None, usage_reserved: bool = False):
+    """
+    Saves a raw transcript for a specific user.
+    `fingerprints` (source_key / audio_prefix_hash / audio_hash) make it reusable by the transcription cache.
+    With usage_reserved, the transcription was already counted by reserve_usage.
+    """
     db = get_db()
     transcript_data = {
         "user_id": user_id,
@@ -120,7 +127,11 @@ def save_transcript(transcript_text: str, user_id: str, meeting_id: str, meeting
         "meeting_date": meeting_date,
         "automated": automated
     }
+    if fingerprints:
+        transcript_data.update({k: v for k, v in fingerprints.items() if v})
     result = db.transcripts.insert_one(transcript_data)
+    if automated and not usage_reserved:
+        increment_usage(user_id, "transcriptions", transcript_data["created_at"])
     return str(result.inserted_id)
 
 def get_latest_transcript(user_id: str):
@@ -134,6 +145,15 @@ def get_latest_transcript(user_id: str):
         latest_transcript["_id"] = str(latest_transcript["_id"])
     return latest_transcript
 
+def get_all_transcripts_for_user(user_id: str):
+    """Retrieves all transcripts for a given user, sorted by most recent."""
+    db = get_db()
+    transcripts = list(db.transcripts.find({"user_id": user_id}, sort=[("created_at", -1)]))
+    for t in transcripts:
+        if "_id" in t:
+            t["_id"] = str(t["_id"])
+    return transcripts
+
 def get_all_agendas_for_user(user_id: str):
     """Retrieves all agendas for a given user, sorted by most recent."""
     db = get_db()
@@ -143,6 +163,12 @@ def get_all_agendas_for_user(user_id: str):
             agenda["_id"] = str(agenda["_id"])
     return agendas
 
+def delete_agenda(meeting_id: str, user_id: str):
+    """Deletes an agenda document for a specific user."""
+    db = get_db()
+    result = db.agendas.delete_one({"meeting_id": meeting_id, "user_id": user_id})
+    return result.deleted_count
+
 def save_action_item(action_item: dict, user_id: str, minutes_id: str):
     db = get_db()
     action_item["user_id"] = user_id
@@ -150,8 +176,61 @@ def save_action_item(action_item: dict, user_id: str, minutes_id: str):
     action_item["created_at"] = datetime.utcnow()
     result = db.action_items.insert_one(action_item)
     action_item["_id"] = str(result.inserted_id)
+    sync_calendar_events(user_id, action_items=[action_item])
     return action_item
 
+# --- Bulk action item persistence ---
+# Set once a write finds the deployment is a standalone server (no transactions)
+_transactions_supported = None
+_ILLEGAL_OPERATION = 20
+
+def save_action_items_bulk(action_items: list, user_id: str, minutes_id: str) -> list:
+    """
+    Stores a minutes document's action items with one unordered insert_many and
+    mirrors them onto the minutes document. Both writes share a transaction when
+    the deployment supports one (replica set / Atlas); on a standalone server
+    they run back to back. Returns the items with string IDs.
+    """
+    global _transactions_supported
+    db = get_db()
+    now = datetime.utcnow()
+    for item in action_items:
+        item.update({"_id": ObjectId(), "user_id": user_id, "minutes_id": minutes_id, "created_at": now})
+    embedded = [{**item, "_id": str(item["_id"])} for item in action_items]
+
+    def write(session=None):
+        if action_items:
+            db.action_items.insert_many(action_items, ordered=False, session=session)
+        db.minutes.update_one(
+            {"_id": ObjectId(minutes_id), "user_id": user_id},
+            {"$set": {"action_items": embedded, "updated_at": now}},
+            session=session,
+        )
+
+    written = False
+    if _transactions_supported is not False:
+        try:
+            with db.client.start_session() as session:
+                session.with_transaction(write)
+            _transactions_supported = written = True
+        except OperationFailure as e:
+            if e.code != _ILLEGAL_OPERATION:
+                raise
+            print("ℹ️ MongoDB transactions are unavailable; saving action items without one.")
+            _transactions_supported = False
+    if not written:
+        write()
+    sync_calendar_events(user_id, action_items=embedded)
+    return embedded
+
+def get_action_items_for_minutes(user_id: str, minutes_id: str) -> list:
+    """Retrieves the action items saved for one minutes document."""
+    db = get_db()
+    items = list(db.action_items.find({"user_id": user_id, "minutes_id": minutes_id}))
+    for item in items:
+        item["_id"] = str(item["_id"])
+    return items
+
 def get_all_action_items_for_user(user_id: str):
     db = get_db()
     action_items = list(db.action_items.find({"user_id": user_id}))
@@ -160,6 +239,21 @@ def get_all_action_items_for_user(user_id: str):
             item["_id"] = str(item["_id"])
     return action_items
 
+def update_action_item(item_id: str, update_data: dict, user_id: str):
+    """Updates an action item and returns the updated document, or None if nothing changed."""
+    db = get_db()
+    result = db.action_items.update_one(
+        {"_id": ObjectId(item_id), "user_id": user_id},
+        {"$set": update_data}
+    )
+    if result.modified_count == 0:
+        return None
+    item = db.action_items.find_one({"_id": ObjectId(item_id), "user_id": user_id})
+    if item and "_id" in item:
+        item["_id"] = str(item["_id"])
+        sync_calendar_events(user_id, action_items=[item])
+    return item
+
 def get_all_minutes_for_user(user_id: str):
     """Retrieves all minutes documents for a given user."""
     db = get_db()
@@ -169,11 +263,173 @@ def get_all_minutes_for_user(user_id: str):
             doc["_id"] = str(doc["_id"])
     return minutes_docs
 
+# --- Monthly usage counters ---
+# One document per user and calendar month (UTC) in the usage collection,
+# incremented as meetings, automated transcriptions and automation cycles
+# are recorded, so quota checks are a single point read (see lib/quota.py).
+USAGE_FIELDS = ("meetings", "transcriptions", "automation_cycles")
+
+def usage_month(when: datetime = None) -> str:
+    return (when or datetime.utcnow()).strftime("%Y-%m")
+
+def increment_usage(user_id: str, field: str, when: datetime = None, amount: int = 1):
+    """Atomically adds `amount` to one of the user's monthly usage counters."""
+    month = usage_month(when)
+    get_db().usage.update_one(
+        {"_id": f"{user_id}:{month}"},
+        {"$inc": {field: amount}, "$setOnInsert": {"user_id": user_id, "month": month}},
+        upsert=True,
+    )
+
+def reserve_usage(user_id: str, field: str, limit: int, when: datetime = None) -> bool:
+    """
+    Atomically adds one to a monthly usage counter if it is below `limit`.
+    Returns False (and changes nothing) if the limit is already reached, so
+    concurrent requests cannot overshoot it.
+    """
+    month = usage_month(when)
+    try:
+        get_db().usage.update_one(
+            {"_id": f"{user_id}:{month}", field: {"$not": {"$gte": limit}}},
+            {"$inc": {field: 1}, "$setOnInsert": {"user_id": user_id, "month": month}},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        # The document exists but the filter did not match: the limit is reached
+        return False
+    return True
+
+def get_usage(user_id: str, month: str = None) -> dict:
+    """Returns the user's usage counters for a month (zeros if nothing was recorded)."""
+    doc = get_db().usage.find_one({"_id": f"{user_id}:{month or usage_month()}"}) or {}
+    return {field: doc.get(field, 0) for field in USAGE_FIELDS}
+
+# --- Keyset pagination for list endpoints ---
+# Pages are ordered newest first by (created_at, _id). The cursor is
+# "<created_at ISO>,<_id>" of the last document on the previous page, so each
+# page is one index range scan however much history a user has.
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "200"))
+
+# List views only need these fields; detail endpoints return full documents
+LIST_PROJECTIONS = {
+    "transcripts": {
+        "meeting_id": 1, "meeting_name": 1, "meeting_date": 1, "automated": 1, "created_at": 1, "user_id": 1,
+        "transcript_preview": {"$substrCP": ["$transcript", 0, 300]},
+    },
+    "minutes": {
+        "meeting_id": 1, "meeting_name": 1, "date": 1, "next_meeting_date": 1, "summary": 1, "created_at": 1, "user_id": 1,
+    },
+    "agendas": None,
+    "action_items": None,
+    "meetings": None,
+}
+
+def encode_cursor(doc: dict):
+    if not doc.get("created_at"):
+        return None
+    return f"{doc['created_at'].isoformat()},{doc['_id']}"
+
+def decode_cursor(cursor: str) -> dict:
+    """Returns the query clause selecting documents after the cursor. Raises ValueError if malformed."""
+    created_at, _, doc_id = cursor.rpartition(",")
+    created_at = datetime.fromisoformat(created_at)
+    try:
+        doc_id = ObjectId(doc_id)
+    except InvalidId as e:  # a BSONError, not a ValueError
+        raise ValueError(f"Invalid cursor id: {e}")
+    return {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "_id": {"$lt": doc_id}},
+    ]}
+
+def find_page(collection_name: str, user_id: str, after: str = None, limit: int = DEFAULT_PAGE_SIZE):
+    """
+    Returns (documents, next_cursor) for one page of a user's documents,
+    newest first. next_cursor is None on the last page.
+    """
+    limit = max(1, min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+    query = {"user_id": user_id}
+    if after:
+        query.update(decode_cursor(after))
+    db = get_db()
+    docs = list(db[collection_name].find(
+        query,
+        LIST_PROJECTIONS.get(collection_name),
+        sort=[("created_at", -1), ("_id", -1)],
+        limit=limit + 1,
+    ))
+    next_cursor = encode_cursor(docs[limit - 1]) if len(docs) > limit else None
+    docs = docs[:limit]
+    for doc in docs:
+        doc["_id"] = str(doc["_id"])
+    return docs, next_cursor
+
+def get_transcript_by_id(transcript_id: str, user_id: str):
+    """Retrieves a single transcript document, including its full text."""
+    db = get_db()
+    transcript = db.transcripts.find_one({"_id": ObjectId(transcript_id), "user_id": user_id})
+    if transcript and "_id" in transcript:
+        transcript["_id"] = str(transcript["_id"])
+    return transcript
+
 def get_document_count(collection_name: str, user_id: str):
     """Counts documents in a collection for a specific user."""
     db = get_db()
     return db[collection_name].count_documents({"user_id": user_id})
 
+def get_dashboard_summary(user_id: str, upcoming_limit: int = 5) -> dict:
+    """
+    The Dashboard's numbers and short lists, computed server side instead of
+    from the first page of each list: the latest minutes, the open action
+    items with the nearest (ISO) deadlines, and the pending/agenda counts.
+    """
+    db = get_db()
+    pending = {"user_id": user_id, "status": {"$ne": "completed"}}
+    recent_minutes, _ = find_page("minutes", user_id, limit=3)
+    upcoming = list(db.action_items.find(
+        {**pending, "deadline": {"$regex": r"^\d{4}-\d{2}-\d{2}"}},
+        sort=[("deadline", 1)],
+        limit=upcoming_limit,
+    ))
+    for item in upcoming:
+        item["_id"] = str(item["_id"])
+    return {
+        "recent_minutes": recent_minutes,
+        "upcoming_actions": upcoming,
+        "pending_action_count": db.action_items.count_documents(pending),
+        "agenda_count": db.agendas.count_documents({"user_id": user_id}),
+    }
+
+def next_sequence(name: str, seed=None) -> int:
+    """
+    Atomically increments and returns the counter `name` (counters collection).
+    `seed()` is called once, when the counter does not exist yet, to return
+    the value to start from.
+    """
+    db = get_db()
+    counter = db.counters.find_one_and_update({"_id": name}, {"$inc": {"seq": 1}}, return_document=ReturnDocument.AFTER)
+    if counter:
+        return counter["seq"]
+    try:
+        db.counters.insert_one({"_id": name, "seq": seed() if seed else 0})
+    except DuplicateKeyError:
+        pass  # another request created it first
+    counter = db.counters.find_one_and_update({"_id": name}, {"$inc": {"seq": 1}}, return_document=ReturnDocument.AFTER)
+    return counter["seq"]
+
+def get_next_meeting_number(user_id: str) -> int:
+    """Returns the next meeting number for a user. Never hands out the same number twice."""
+    def highest_existing():
+        # Continue after agendas created before the counter existed
+        numbers = [0]
+        for doc in get_db().agendas.find({"user_id": user_id}, {"meeting_id": 1}):
+            match = re.search(r"_(\d+)$", doc.get("meeting_id") or "")
+            if match:
+                numbers.append(int(match.group(1)))
+        return max(numbers)
+    return next_sequence(f"meeting_id:{user_id}", seed=highest_existing)
+
 def update_agenda(agenda_id: str, update_data: dict, user_id: str):
     db = get_db()
     print(f"🔎 update_agenda called with agenda_id={agenda_id}, user_id={user_id}")
@@ -190,12 +446,16 @@ def update_agenda(agenda_id: str, update_data: dict, user_id: str):
         agenda["_id"] = str(agenda["_id"])
     return agenda
 
-def save_meeting(meeting_data: dict, user_id: str):
+def save_meeting(meeting_data: dict, user_id: str, usage_reserved: bool = False):
+    """Saves a meeting. With usage_reserved, it was already counted by reserve_usage."""
     db = get_db()
     meeting_data["user_id"] = user_id
     meeting_data["created_at"] = datetime.utcnow()
     result = db.meetings.insert_one(meeting_data)
     meeting_data["_id"] = str(result.inserted_id)
+    if not usage_reserved:
+        increment_usage(user_id, "meetings", meeting_data["created_at"])
+    sync_calendar_events(user_id, meetings=[meeting_data])
     return meeting_data
 
 def get_all_meetings_for_user(user_id: str):
@@ -217,11 +477,14 @@ def update_meeting(meeting_id: str, update_data: dict, user_id: str):
     meeting = db.meetings.find_one({"_id": ObjectId(meeting_id), "user_id": user_id})
     if meeting and "_id" in meeting:
         meeting["_id"] = str(meeting["_id"])
+        sync_calendar_events(user_id, meetings=[meeting])
     return meeting
 
 def delete_meeting(meeting_id: str, user_id: str):
     db = get_db()
     result = db.meetings.delete_one({"_id": ObjectId(meeting_id), "user_id": user_id})
+    if result.deleted_count:
+        sync_calendar_events(user_id, deleted=[f"meeting:{meeting_id}"])
     return result.deleted_count
 
 def delete_transcript(transcript_id: str, user_id: str):
@@ -230,6 +493,68 @@ def delete_transcript(transcript_id: str, user_id: str):
     result = db.transcripts.delete_one({"_id": ObjectId(transcript_id), "user_id": user_id})
     return result.deleted_count
 
+# --- Calendar events projection ---
+# /events reads precomputed events (one document per meeting or action item,
+# with its date already parsed) instead of loading and re-parsing everything.
+# Every meeting/action item write keeps the projection in step and bumps the
+# user's events version, which /events serves as its ETag. A user's projection
+# is backfilled from their meetings and action items when the version counter
+# is first created, by whichever read or write gets there first.
+def _events_version_name(user_id: str) -> str:
+    return f"events:{user_id}"
+
+def rebuild_calendar_events(user_id: str) -> int:
+    """Recomputes a user's whole projection from their meetings and action items."""
+    db = get_db()
+    sources = [("meeting", meeting_event, db.meetings), ("action-item", action_item_event, db.action_items)]
+    ops, event_ids = [], []
+    for source_type, shape, collection in sources:
+        for doc in collection.find({"user_id": user_id}):
+            event = shape(doc)
+            if event:
+                event_ids.append(f"{source_type}:{doc['_id']}")
+                ops.append(ReplaceOne({"_id": event_ids[-1]}, {"user_id": user_id, **event}, upsert=True))
+    if ops:
+        db.calendar_events.bulk_write(ops, ordered=False)
+    db.calendar_events.delete_many({"user_id": user_id, "_id": {"$nin": event_ids}})
+    print(f"🗓️ Rebuilt {len(event_ids)} calendar events for user {user_id}.")
+    return len(event_ids)
+
+def _seed_events_version(user_id: str) -> int:
+    rebuild_calendar_events(user_id)
+    return 0
+
+def sync_calendar_events(user_id: str, meetings: list = (), action_items: list = (), deleted: list = ()) -> int:
+    """
+    Upserts the projected events of the given meetings/action items, removes
+    the `deleted` event IDs ("meeting:<id>"), and returns the new events version.
+    """
+    ops = []
+    for source_type, shape, docs in (("meeting", meeting_event, meetings), ("action-item", action_item_event, action_items)):
+        for doc in docs:
+            event_id = f"{source_type}:{doc['_id']}"
+            event = shape(doc)
+            # A date that no longer parses removes the event
+            ops.append(ReplaceOne({"_id": event_id}, {"user_id": user_id, **event}, upsert=True) if event else DeleteOne({"_id": event_id}))
+    ops.extend(DeleteOne({"_id": event_id}) for event_id in deleted)
+    if ops:
+        get_db().calendar_events.bulk_write(ops, ordered=False)
+    return next_sequence(_events_version_name(user_id), seed=lambda: _seed_events_version(user_id))
+
+def get_calendar_events_version(user_id: str) -> int:
+    """Returns the user's events version, backfilling the projection on first use."""
+    counter = get_db().counters.find_one({"_id": _events_version_name(user_id)})
+    if counter:
+        return counter["seq"]
+    return next_sequence(_events_version_name(user_id), seed=lambda: _seed_events_version(user_id))
+
+def get_calendar_events(user_id: str, start: datetime = None, end: datetime = None) -> list:
+    """Returns a user's projected events starting in [start, end), oldest first."""
+    query = {"user_id": user_id}
+    if start or end:
+        query["start"] = {op: value for op, value in (("$gte", start), ("$lt", end)) if value}
+    return list(get_db().calendar_events.find(query, {"_id": 0, "user_id": 0}).sort("start", 1))
+
 # --- Google OAuth Credential Storage ---
 
 def save_google_credentials(user_id: str, credentials_info: dict):
@@ -0,0 +1,65 @@
+import os
+import re
+from datetime import datetime, date
+from functools import lru_cache
+
+# --- Deadline normalization ---
+# dateparser is slow (language detection, per-call regex work), and /events and
+# Calendar scheduling used to run it on every date of every request. Deadlines
+# are now resolved once, at extraction time and relative to the meeting date,
+# and stored as ISO strings. Reads then take the ISO fast path; anything else
+# (legacy free-text dates) goes through a memoized dateparser fallback.
+DEADLINE_PARSE_CACHE_ENTRIES = int(os.getenv("DEADLINE_PARSE_CACHE_ENTRIES", "4096"))
+# Restricting languages skips dateparser's language detection; empty = detect
+DEADLINE_LANGUAGES = [lang for lang in os.getenv("DEADLINE_LANGUAGES", "en").split(",") if lang]
+
+_ISO_PREFIX = re.compile(r"^\d{4}-\d{2}-\d{2}")
+
+@lru_cache(maxsize=DEADLINE_PARSE_CACHE_ENTRIES)
+def _dateparser_parse(text: str, relative_base: datetime, prefer_future: bool):
+    import dateparser
+
+    settings = {"RELATIVE_BASE": relative_base}
+    if prefer_future:
+        settings["PREFER_DATES_FROM"] = "future"
+    return dateparser.parse(text, languages=DEADLINE_LANGUAGES or None, settings=settings)
+
+def parse_datetime(value, relative_base: datetime = None, prefer_future: bool = False):
+    """
+    Parses an ISO string (fast path) or free text such as "Friday" or "next
+    week" into a datetime. Relative text resolves against relative_base, or
+    today if none is given. Returns None if the value cannot be parsed.
+    """
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    if not value or not isinstance(value, str):
+        return None
+    text = value.strip()
+    if _ISO_PREFIX.match(text):
+        try:
+            return datetime.fromisoformat(text[:-1] + "+00:00" if text.endswith("Z") else text)
+        except ValueError:
+            pass
+    # Memoized per day so the cache key stays stable without a meeting date
+    base = relative_base or datetime.combine(date.today(), datetime.min.time())
+    return _dateparser_parse(text, base, prefer_future)
+
+def to_iso(value: datetime) -> str:
+    """Formats a datetime as an ISO date, or an ISO datetime if it has a time of day."""
+    if value.hour == value.minute == value.second == value.microsecond == 0 and value.tzinfo is None:
+        return value.date().isoformat()
+    return value.isoformat()
+
+def normalize_deadline(deadline, meeting_date=None):
+    """
+    Resolves an extracted deadline ("Friday", "next week", "2025-09-12") to an
+    ISO string relative to the meeting date. Returns None if it cannot be parsed.
+    """
+    parsed = parse_datetime(deadline, relative_base=parse_datetime(meeting_date), prefer_future=True)
+    return to_iso(parsed) if parsed else None
+
+def get_deadline_cache_stats() -> dict:
+    info = _dateparser_parse.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "entries": info.currsize}
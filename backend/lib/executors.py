@@ -0,0 +1,68 @@
+import os
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# --- Bounded Thread Pools for Blocking Work ---
+# pymongo, the Clerk SDK, Google APIs and the AI agents are all synchronous.
+# Calling them directly from an `async def` route blocks the event loop for
+# every other request, so routes hand them off to one of these pools instead.
+# Cheap I/O (DB reads/writes, auth) and long-running AI work get separate pools
+# so a burst of /transcribe or /generate-minutes calls can never starve reads
+# like /notifications or /agendas.
+IO_POOL_SIZE = int(os.getenv("IO_THREADPOOL_SIZE", "32"))
+AI_POOL_SIZE = int(os.getenv("AI_THREADPOOL_SIZE", "4"))
+# Pipeline stages (lib.dag) started from an AI-pool request share one pool, so
+# concurrent requests cannot each add their own stage threads on top of the AI
+# pool: agent work in the API process is capped at AI + STAGE pool sizes.
+STAGE_POOL_SIZE = int(os.getenv("STAGE_THREADPOOL_SIZE", "4"))
+
+_io_executor = None
+_ai_executor = None
+_stage_executor = None
+_executors_lock = threading.Lock()
+
+def get_io_executor() -> ThreadPoolExecutor:
+    """Returns the shared pool used for short blocking I/O (MongoDB, Clerk, Google APIs)."""
+    global _io_executor
+    with _executors_lock:
+        if _io_executor is None:
+            _io_executor = ThreadPoolExecutor(max_workers=IO_POOL_SIZE, thread_name_prefix="io")
+        return _io_executor
+
+def get_ai_executor() -> ThreadPoolExecutor:
+    """Returns the shared pool used for long-running agent calls (transcription, LLMs, BART)."""
+    global _ai_executor
+    with _executors_lock:
+        if _ai_executor is None:
+            _ai_executor = ThreadPoolExecutor(max_workers=AI_POOL_SIZE, thread_name_prefix="ai")
+        return _ai_executor
+
+def get_stage_executor() -> ThreadPoolExecutor:
+    """Returns the shared pool that runs pipeline stages for requests already on the AI pool."""
+    global _stage_executor
+    with _executors_lock:
+        if _stage_executor is None:
+            _stage_executor = ThreadPoolExecutor(max_workers=STAGE_POOL_SIZE, thread_name_prefix="stage")
+        return _stage_executor
+
+async def run_io(func, *args, **kwargs):
+    """Runs a blocking I/O function on the I/O pool without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_io_executor(), functools.partial(func, *args, **kwargs))
+
+async def run_ai(func, *args, **kwargs):
+    """Runs a long-running agent function on the AI pool without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_ai_executor(), functools.partial(func, *args, **kwargs))
+
+def shutdown_executors(wait: bool = True):
+    """Shuts down the pools. Called when the API process stops."""
+    global _io_executor, _ai_executor, _stage_executor
+    with _executors_lock:
+        executors = [_io_executor, _ai_executor, _stage_executor]
+        _io_executor = _ai_executor = _stage_executor = None
+    for executor in executors:
+        if executor is not None:
+            executor.shutdown(wait=wait)
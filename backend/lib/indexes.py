@@ -0,0 +1,101 @@
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+from .database import get_db
+
+# --- Versioned index bootstrap ---
+# Nearly every query filters on user_id and sorts on created_at. These indexes
+# are created at API/worker startup. The applied version is stored in the
+# schema_migrations collection, so startup only touches the indexes when
+# INDEX_VERSION is bumped. Bump it whenever INDEXES changes.
+#   python -m lib.indexes [--force]
+INDEX_VERSION = 7
+
+# Matches the keyset pagination sort (created_at, _id) in lib/database.find_page
+_USER_CREATED = [("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]
+
+INDEXES = {
+    "agendas": [
+        IndexModel(_USER_CREATED, name="user_created_id"),
+        IndexModel([("user_id", ASCENDING), ("meeting_id", ASCENDING)], name="user_meeting_id", unique=True),
+    ],
+    "minutes": [IndexModel(_USER_CREATED, name="user_created_id")],
+    "transcripts": [
+        IndexModel(_USER_CREATED, name="user_created_id"),
+        # Transcription cache lookups (lib/transcript_cache), scoped to the user
+        IndexModel(
+            [("user_id", ASCENDING), ("source_key", ASCENDING), ("created_at", DESCENDING)],
+            name="user_source_key_created", partialFilterExpression={"source_key": {"$exists": True}},
+        ),
+        IndexModel(
+            [("user_id", ASCENDING), ("audio_prefix_hash", ASCENDING), ("created_at", DESCENDING)],
+            name="user_audio_prefix_created", partialFilterExpression={"audio_prefix_hash": {"$exists": True}},
+        ),
+    ],
+    "meetings": [IndexModel(_USER_CREATED, name="user_created_id")],
+    "action_items": [
+        IndexModel(_USER_CREATED, name="user_created_id"),
+        IndexModel([("user_id", ASCENDING), ("minutes_id", ASCENDING)], name="user_minutes"),
+        # Dashboard "upcoming actions" (lib/database.get_dashboard_summary)
+        IndexModel([("user_id", ASCENDING), ("deadline", ASCENDING)], name="user_deadline"),
+    ],
+    "notifications": [
+        IndexModel(_USER_CREATED, name="user_created_id"),
+        IndexModel([("user_id", ASCENDING), ("read", ASCENDING)], name="user_read"),
+    ],
+    "jobs": [
+        IndexModel([("status", ASCENDING), ("run_after", ASCENDING)], name="status_run_after"),
+        IndexModel([("status", ASCENDING), ("lease_expires_at", ASCENDING)], name="status_lease"),
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)], name="user_created"),
+        # One queued/running job per idempotency key (lib/jobs.enqueue_job)
+        IndexModel([("active_key", ASCENDING)], name="active_key", unique=True, sparse=True),
+    ],
+    # /events range queries (lib/database.get_calendar_events)
+    "calendar_events": [IndexModel([("user_id", ASCENDING), ("start", ASCENDING)], name="user_start")],
+    "usage": [IndexModel([("user_id", ASCENDING), ("month", DESCENDING)], name="user_month")],
+    "users": [IndexModel([("user_id", ASCENDING)], name="user_id")],
+    "google_credentials": [IndexModel([("user_id", ASCENDING)], name="user_id", unique=True)],
+    # Cache and rate-limit entries are removed by MongoDB once expires_at passes
+    "llm_cache": [IndexModel([("expires_at", ASCENDING)], name="ttl", expireAfterSeconds=0)],
+    "agenda_cache": [IndexModel([("expires_at", ASCENDING)], name="ttl", expireAfterSeconds=0)],
+    "rate_limits": [IndexModel([("expires_at", ASCENDING)], name="ttl", expireAfterSeconds=0)],
+}
+
+# Indexes superseded by a later version, dropped during the upgrade
+DROPPED_INDEXES = {
+    collection: ["user_created"]
+    for collection in ("agendas", "minutes", "transcripts", "meetings", "action_items", "notifications")
+}
+DROPPED_INDEXES["transcripts"] += ["source_key_created", "audio_hash_created"]
+
+def ensure_indexes(force: bool = False) -> bool:
+    """
+    Creates any missing indexes if the stored index version is out of date.
+    Returns True if the indexes are at INDEX_VERSION afterwards. A collection
+    that fails (e.g. duplicate meeting IDs blocking a unique index) is
+    reported and retried on the next startup.
+    """
+    db = get_db()
+    applied = db.schema_migrations.find_one({"_id": "indexes"}) or {}
+    if not force and applied.get("version", 0) >= INDEX_VERSION:
+        return True
+
+    print(f"🗂️ Ensuring MongoDB indexes (version {applied.get('version', 0)} -> {INDEX_VERSION})...")
+    ok = True
+    for collection, indexes in INDEXES.items():
+        try:
+            db[collection].create_indexes(indexes)
+            existing = db[collection].index_information()
+            for name in DROPPED_INDEXES.get(collection, []):
+                if name in existing:
+                    db[collection].drop_index(name)
+        except OperationFailure as e:
+            ok = False
+            print(f"❌ Failed to create indexes on '{collection}': {e}")
+    if ok:
+        db.schema_migrations.update_one({"_id": "indexes"}, {"$set": {"version": INDEX_VERSION}}, upsert=True)
+        print("✅ MongoDB indexes are up to date.")
+    return ok
+
+if __name__ == "__main__":
+    import sys
+    ensure_indexes(force="--force" in sys.argv)
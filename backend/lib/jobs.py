@@ -0,0 +1,188 @@
+import os
+import uuid
+import random
+from datetime import datetime, timedelta
+from bson.objectid import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from .database import get_db
+
+# --- Durable Job Queue (Mongo-backed) ---
+# Jobs are documents in the `jobs` collection. API processes enqueue them and
+# worker processes (see worker.py) claim them with an atomic find_one_and_update,
+# holding a lease that they keep alive with heartbeats. A job whose lease expires
+# (worker crashed or was restarted) becomes claimable again. Every claim gets a
+# fresh lease_owner token; heartbeats, stage timings and the final status are
+# only written while the job still carries the caller's token.
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "120"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_BASE_DELAY = int(os.getenv("JOB_RETRY_BASE_DELAY", "30"))  # seconds
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_SUCCEEDED = "succeeded"
+STATUS_FAILED = "failed"
+
+class LeaseLostError(RuntimeError):
+    """Raised when a worker no longer owns the job it is running."""
+
+def enqueue_job(job_type: str, user_id: str, payload: dict, meeting_id: str = None, max_attempts: int = None, idempotency_key: str = None) -> str:
+    """
+    Adds a job to the queue and returns its ID. While a job with the same
+    idempotency_key is queued or running, that job's ID is returned instead.
+    """
+    db = get_db()
+    now = datetime.utcnow()
+    job = {
+        "type": job_type,
+        "user_id": user_id,
+        "meeting_id": meeting_id,
+        "payload": payload,
+        "status": STATUS_QUEUED,
+        "attempts": 0,
+        "max_attempts": max_attempts or JOB_MAX_ATTEMPTS,
+        "run_after": now,
+        "lease_expires_at": None,
+        "worker_id": None,
+        "lease_owner": None,
+        "last_error": None,
+        "result": None,
+        "created_at": now,
+        "updated_at": now,
+    }
+    if idempotency_key:
+        # Unique while set; removed once the job succeeds or finally fails
+        job["active_key"] = idempotency_key
+    try:
+        result = db.jobs.insert_one(job)
+    except DuplicateKeyError:
+        existing = db.jobs.find_one({"active_key": idempotency_key}, {"_id": 1})
+        if not existing:
+            # The active job finished in the meantime
+            return enqueue_job(job_type, user_id, payload, meeting_id, max_attempts, idempotency_key)
+        print(f"♻️ Job for '{idempotency_key}' is already queued or running; not enqueuing it again.")
+        return str(existing["_id"])
+    return str(result.inserted_id)
+
+def claim_next_job(worker_id: str, lease_seconds: int = JOB_LEASE_SECONDS):
+    """
+    Atomically claims the next runnable job for a worker.
+    A job is runnable if it is queued and due, or running with an expired lease.
+    Returns the claimed job document, or None if the queue is empty.
+    """
+    db = get_db()
+    now = datetime.utcnow()
+    job = db.jobs.find_one_and_update(
+        {
+            "$or": [
+                {"status": STATUS_QUEUED, "run_after": {"$lte": now}},
+                {"status": STATUS_RUNNING, "lease_expires_at": {"$lt": now}},
+            ]
+        },
+        {
+            "$set": {
+                "status": STATUS_RUNNING,
+                "worker_id": worker_id,
+                "lease_owner": f"{worker_id}:{uuid.uuid4().hex}",
+                "lease_expires_at": now + timedelta(seconds=lease_seconds),
+                "heartbeat_at": now,
+                "started_at": now,
+                "updated_at": now,
+                "stages": {},  # per-stage timings of this attempt
+            },
+            "$inc": {"attempts": 1},
+        },
+        sort=[("run_after", 1)],
+        return_document=ReturnDocument.AFTER,
+    )
+    if job:
+        job["_id"] = str(job["_id"])
+    return job
+
+def _owned(job_id: str, lease_owner: str) -> dict:
+    """Query matching the job only while the claim identified by lease_owner still holds it."""
+    return {"_id": ObjectId(job_id), "lease_owner": lease_owner, "status": STATUS_RUNNING}
+
+def heartbeat_job(job_id: str, lease_owner: str, lease_seconds: int = JOB_LEASE_SECONDS) -> bool:
+    """
+    Extends the lease on a running job. Returns False if the worker no longer
+    owns the job (its lease expired and another worker took it over).
+    """
+    db = get_db()
+    now = datetime.utcnow()
+    result = db.jobs.update_one(
+        _owned(job_id, lease_owner),
+        {"$set": {
+            "lease_expires_at": now + timedelta(seconds=lease_seconds),
+            "heartbeat_at": now,
+            "updated_at": now,
+        }}
+    )
+    return result.matched_count > 0
+
+def record_job_stage(job_id: str, lease_owner: str, stage: str, timing: dict) -> bool:
+    """Stores the timing of a finished pipeline stage on the job (job.stages.<stage>)."""
+    db = get_db()
+    result = db.jobs.update_one(
+        _owned(job_id, lease_owner),
+        {"$set": {f"stages.{stage}": timing, "updated_at": datetime.utcnow()}}
+    )
+    return result.matched_count > 0
+
+def complete_job(job_id: str, lease_owner: str, result: dict = None) -> bool:
+    """Marks a job as succeeded and stores its result. Returns False if the caller no longer owns it."""
+    db = get_db()
+    now = datetime.utcnow()
+    update = db.jobs.update_one(
+        _owned(job_id, lease_owner),
+        {"$set": {
+            "status": STATUS_SUCCEEDED,
+            "result": result,
+            "lease_expires_at": None,
+            "finished_at": now,
+            "updated_at": now,
+        }, "$unset": {"active_key": ""}}
+    )
+    return update.modified_count > 0
+
+def fail_job(job_id: str, lease_owner: str, error: str) -> str:
+    """
+    Records a failed attempt. The job is re-queued with exponential backoff
+    until it runs out of attempts, then marked as failed.
+    Returns the job's new status, or None if the caller no longer owns it.
+    """
+    db = get_db()
+    job = db.jobs.find_one(_owned(job_id, lease_owner), {"attempts": 1, "max_attempts": 1})
+    if not job:
+        return None
+
+    now = datetime.utcnow()
+    attempts = job.get("attempts", 1)
+    if attempts < job.get("max_attempts", JOB_MAX_ATTEMPTS):
+        delay = JOB_RETRY_BASE_DELAY * (2 ** (attempts - 1)) + random.uniform(0, 1)
+        update = {
+            "status": STATUS_QUEUED,
+            "run_after": now + timedelta(seconds=delay),
+        }
+    else:
+        update = {"status": STATUS_FAILED, "finished_at": now}
+
+    update.update({"last_error": error, "lease_expires_at": None, "updated_at": now})
+    changes = {"$set": update}
+    if update["status"] == STATUS_FAILED:
+        changes["$unset"] = {"active_key": ""}
+    if db.jobs.update_one(_owned(job_id, lease_owner), changes).matched_count == 0:
+        return None
+    return update["status"]
+
+def get_job(job_id: str, user_id: str):
+    """Retrieves a job for a given user, without its (potentially large) payload."""
+    db = get_db()
+    try:
+        job = db.jobs.find_one({"_id": ObjectId(job_id), "user_id": user_id}, {"payload": 0})
+    except Exception as e:
+        print(f"Error fetching job '{job_id}': {e}")
+        return None
+    if job and "_id" in job:
+        job["_id"] = str(job["_id"])
+    return job
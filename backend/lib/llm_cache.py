@@ -0,0 +1,52 @@
+import os
+import re
+import json
+import hashlib
+from .two_tier_cache import TwoTierCache
+
+# --- LLM response cache ---
+# Gemini prompts are deterministic functions of (model, prompt template,
+# input text), so regenerating minutes or action items for an unchanged
+# transcript can reuse the previous response instead of paying for it again.
+# Lookups hit an in-process LRU first, then the llm_cache collection, which
+# is shared by every API and worker process. Bump a template's version in the
+# caller whenever its prompt wording changes.
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_TTL_HOURS = float(os.getenv("LLM_CACHE_TTL_HOURS", "168"))
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "512"))
+
+_cache = TwoTierCache("llm", "llm_cache", LLM_CACHE_TTL_HOURS, LLM_CACHE_MEMORY_ENTRIES)
+
+def normalize_input(text: str) -> str:
+    """Collapses whitespace so formatting-only differences share a cache entry."""
+    return re.sub(r"\s+", " ", text or "").strip()
+
+def llm_cache_key(model_name: str, template: str, text: str, generation_config: dict = None) -> str:
+    """Builds the cache key from the model, the versioned prompt template and the input."""
+    config = json.dumps(generation_config, sort_keys=True, default=str) if generation_config else ""
+    payload = "\n".join([model_name, template, config, normalize_input(text)])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def cached_llm_call(key: str, generate, use_cache: bool = True, validate=None) -> str:
+    """
+    Returns the cached response for `key`, or calls `generate()` (which must
+    return the response text) and caches the result. `use_cache=False` skips
+    the lookup but still refreshes the entry. If `validate(response)` is given,
+    only responses it accepts are cached or served from the cache, so one
+    malformed reply is not reused for the whole TTL.
+    """
+    if use_cache and LLM_CACHE_ENABLED:
+        cached = _cache.get(key)
+        if cached is not None and (validate is None or validate(cached)):
+            print("♻️ LLM cache HIT.")
+            return cached
+    response = generate()
+    if LLM_CACHE_ENABLED:
+        if validate is None or validate(response):
+            _cache.set(key, response)
+        else:
+            print("⚠️ LLM response failed validation; not caching it.")
+    return response
+
+def get_llm_cache_stats() -> dict:
+    return _cache.get_stats()
@@ -0,0 +1,175 @@
+import os
+import json
+import time
+import asyncio
+import threading
+from datetime import datetime, timedelta
+from pymongo.errors import OperationFailure, PyMongoError
+from .database import get_db
+
+# --- Notification Push Channel ---
+# Clients subscribe to GET /notifications/stream (Server-Sent Events) instead of
+# polling /notifications. Notifications are written by the API and by worker
+# processes, so the hub follows the notifications collection itself: a MongoDB
+# change stream where the deployment supports it (replica set / Atlas), otherwise
+# one shared poll for all subscribed users. Either way each API process runs a
+# single watcher thread, however many clients are connected.
+NOTIFICATION_STREAM_BACKEND = os.getenv("NOTIFICATION_STREAM_BACKEND", "auto")  # auto | change_stream | poll
+NOTIFICATION_POLL_SECONDS = float(os.getenv("NOTIFICATION_POLL_SECONDS", "2"))
+NOTIFICATION_KEEPALIVE_SECONDS = float(os.getenv("NOTIFICATION_KEEPALIVE_SECONDS", "15"))
+SUBSCRIBER_QUEUE_SIZE = 100
+# Writers on other hosts stamp created_at with their own clock, so each poll
+# looks back a little and skips notifications it has already published.
+_POLL_OVERLAP = timedelta(seconds=5)
+
+def serialize_notification(doc: dict) -> dict:
+    """Converts a notification document into the shape /notifications returns."""
+    notification = {k: v for k, v in doc.items() if k != "_id"}
+    notification["id"] = str(doc["_id"])
+    if isinstance(notification.get("created_at"), datetime):
+        notification["created_at"] = notification["created_at"].isoformat()
+    return notification
+
+def _offer(queue: asyncio.Queue, notification: dict):
+    # A client that stopped reading loses its oldest events, not the newest
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(notification)
+
+class NotificationHub:
+    """Fans new notifications out to the SSE subscribers of this process."""
+    def __init__(self, backend: str = NOTIFICATION_STREAM_BACKEND, poll_seconds: float = NOTIFICATION_POLL_SECONDS):
+        self.backend = backend
+        self.poll_seconds = poll_seconds
+        self.mode = None  # "change_stream" or "poll" once the watcher is running
+        self.published = 0
+        self._subscribers = {}  # user_id -> {queue: event loop}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def subscribe(self, user_id: str) -> asyncio.Queue:
+        """Registers a subscriber queue on the running event loop."""
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._subscribers.setdefault(user_id, {})[queue] = loop
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="notification-hub", daemon=True)
+                self._thread.start()
+        return queue
+
+    def unsubscribe(self, user_id: str, queue: asyncio.Queue):
+        with self._lock:
+            queues = self._subscribers.get(user_id, {})
+            queues.pop(queue, None)
+            if not queues:
+                self._subscribers.pop(user_id, None)
+
+    def publish(self, doc: dict):
+        """Delivers a notification document to every subscriber of its user."""
+        with self._lock:
+            targets = list(self._subscribers.get(doc.get("user_id"), {}).items())
+        if not targets:
+            return
+        notification = serialize_notification(doc)
+        for queue, loop in targets:
+            loop.call_soon_threadsafe(_offer, queue, notification)
+        self.published += 1
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            subscribers = sum(len(queues) for queues in self._subscribers.values())
+        return {"mode": self.mode, "users": len(self._subscribers), "subscribers": subscribers, "published": self.published}
+
+    def _run(self):
+        if self.backend in ("auto", "change_stream") and self._watch_change_stream():
+            return
+        self._poll()
+
+    def _watch_change_stream(self) -> bool:
+        """
+        Follows inserts into the notifications collection. Returns False if the
+        deployment does not support change streams, so the hub falls back to polling.
+        """
+        resume_token = None
+        while True:
+            try:
+                pipeline = [{"$match": {"operationType": "insert"}}]
+                with get_db().notifications.watch(pipeline, resume_after=resume_token) as stream:
+                    if self.mode is None:
+                        print("📡 Notification hub following a MongoDB change stream.")
+                    self.mode = "change_stream"
+                    for change in stream:
+                        resume_token = change["_id"]
+                        self.publish(change["fullDocument"])
+            except OperationFailure as e:
+                if self.mode is None:
+                    print(f"ℹ️ Change streams unavailable ({e}); polling notifications every {self.poll_seconds}s.")
+                    return False
+                print(f"⚠️ Notification change stream failed, resuming: {e}")
+            except PyMongoError as e:
+                print(f"⚠️ Notification change stream interrupted, resuming: {e}")
+            time.sleep(self.poll_seconds)
+
+    def _poll(self):
+        """One query per interval covering every subscribed user (user_created_id index)."""
+        self.mode = "poll"
+        since = datetime.utcnow()
+        seen = {}  # notification _id -> created_at, for the overlap window
+        while True:
+            time.sleep(self.poll_seconds)
+            with self._lock:
+                user_ids = list(self._subscribers)
+            polled_at = datetime.utcnow()
+            if not user_ids:
+                since, seen = polled_at, {}
+                continue
+            try:
+                docs = get_db().notifications.find(
+                    {"user_id": {"$in": user_ids}, "created_at": {"$gte": since - _POLL_OVERLAP}},
+                    sort=[("created_at", 1)],
+                )
+                for doc in docs:
+                    if doc["_id"] not in seen:
+                        seen[doc["_id"]] = doc["created_at"]
+                        self.publish(doc)
+            except PyMongoError as e:
+                print(f"⚠️ Notification poll failed: {e}")
+                continue
+            since = polled_at
+            seen = {_id: created_at for _id, created_at in seen.items() if created_at >= since - _POLL_OVERLAP}
+
+_hub = None
+_hub_lock = threading.Lock()
+
+def get_notification_hub() -> NotificationHub:
+    """Returns the process-wide notification hub."""
+    global _hub
+    with _hub_lock:
+        if _hub is None:
+            _hub = NotificationHub()
+        return _hub
+
+async def stream_notifications(user_id: str, related_id: str = None, is_disconnected=None):
+    """
+    Yields Server-Sent Events for a user's new notifications, optionally only
+    those for one meeting (`related_id`). A comment line is sent every
+    NOTIFICATION_KEEPALIVE_SECONDS so proxies keep the connection open.
+    """
+    hub = get_notification_hub()
+    queue = hub.subscribe(user_id)
+    try:
+        yield ": connected\n\n"
+        while True:
+            try:
+                notification = await asyncio.wait_for(queue.get(), NOTIFICATION_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                if is_disconnected and await is_disconnected():
+                    return
+                yield ": keepalive\n\n"
+                continue
+            if related_id and notification.get("related_id") != related_id:
+                continue
+            yield f"id: {notification['id']}\nevent: notification\ndata: {json.dumps(notification, default=str)}\n\n"
+    finally:
+        hub.unsubscribe(user_id, queue)
@@ -1,12 +1,15 @@
+import os
+import threading
 from datetime import datetime
 from bson.objectid import ObjectId
 from .database import get_db
-import os
 
-def create_notification(user_id: str, message: str, type: str = "info", related_id: str = None) -> str:
-    """Creates a notification for a user and returns its ID."""
-    db = get_db()
-    notification = {
+# AutomationNotifier buffers progress notifications and writes them with one
+# insert_many per NOTIFICATION_FLUSH_SECONDS window; success/error flush at once.
+NOTIFICATION_FLUSH_SECONDS = float(os.getenv("NOTIFICATION_FLUSH_SECONDS", "1"))
+
+def _notification_doc(user_id: str, message: str, type: str = "info", related_id: str = None) -> dict:
+    return {
         "user_id": user_id,
         "message": message,
         "type": type,
@@ -15,68 +18,73 @@ def create_notification(user_id: str, message: str, type: str = "info", related_
         "created_at": datetime.utcnow(),
         "email_delivered": False
     }
-    result = db.notifications.insert_one(notification)
+
+def create_notification(user_id: str, message: str, type: str = "info", related_id: str = None) -> str:
+    """Creates a notification for a user and returns its ID."""
+    db = get_db()
+    result = db.notifications.insert_one(_notification_doc(user_id, message, type, related_id))
     return str(result.inserted_id)
 
 class AutomationNotifier:
     """A helper class to send standardized notifications for the automation flow."""
-    def __init__(self, user_id: str, meeting_id: str):
+    def __init__(self, user_id: str, meeting_id: str, flush_seconds: float = NOTIFICATION_FLUSH_SECONDS):
         self.user_id = user_id
         self.meeting_id = meeting_id
+        self.flush_seconds = flush_seconds
+        self._pending = []
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def _notify(self, message: str, type: str = "info", flush: bool = False):
+        """Buffers a notification; the first one in a window schedules the flush."""
+        with self._lock:
+            self._pending.append(_notification_doc(self.user_id, message, type, self.meeting_id))
+            if not flush and self.flush_seconds > 0 and self._timer is None:
+                self._timer = threading.Timer(self.flush_seconds, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if flush or self.flush_seconds <= 0:
+            self.flush()
+
+    def flush(self) -> int:
+        """Writes all buffered notifications in one batch. Returns how many were written."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not pending:
+            return 0
+        try:
+            get_db().notifications.insert_many(pending)
+        except Exception as e:
+            print(f"⚠️ Failed to write {len(pending)} notification(s): {e}")
+            return 0
+        return len(pending)
 
     def start(self):
         """Notify that the automation process has started."""
-        create_notification(
-            self.user_id,
-            "🚀 Automation process has started...",
-            "info",
-            self.meeting_id
-        )
+        self._notify("🚀 Automation process has started...")
 
     def step_transcribe(self):
         """Notify that transcription is starting."""
-        create_notification(
-            self.user_id,
-            "Step 1: Transcribing video...",
-            "info",
-            self.meeting_id
-        )
+        self._notify("Step 1: Transcribing video...")
 
     def step_minutes(self):
         """Notify that minute generation is starting."""
-        create_notification(
-            self.user_id,
-            "Step 2: Generating minutes...",
-            "info",
-            self.meeting_id
-        )
+        self._notify("Step 2: Generating minutes...")
 
     def step_actions(self):
         """Notify that action item extraction is starting."""
-        create_notification(
-            self.user_id,
-            "Step 3: Extracting action items...",
-            "info",
-            self.meeting_id
-        )
+        self._notify("Step 3: Extracting action items...")
 
     def success(self):
         """Notify that the entire process was successful."""
-        create_notification(
-            self.user_id,
-            "✅ Automation complete! Your meeting has been processed.",
-            "success",
-            self.meeting_id
-        )
+        self._notify("✅ Automation complete! Your meeting has been processed.", "success", flush=True)
 
     def error(self, reason: str):
         """Notify that the process failed."""
-        create_notification(
-            self.user_id,
-            f"❌ Automation failed. Reason: {reason}",
-            "error",
-            self.meeting_id
-        )
+        self._notify(f"❌ Automation failed. Reason: {reason}", "error", flush=True)
 
 
 def get_user_notifications(user_id: str, limit: int = 20) -> list:
@@ -128,10 +136,10 @@ def send_email_notification(user_id: str, subject: str, message: str) -> bool:
     For now, this is a placeholder - implement with your chosen email service.
     """
     try:
-        from clerk_backend_api import Clerk
+        from .auth import get_clerk_client
         
         # Get user email from Clerk
-        clerk = Clerk(bearer_auth=os.getenv("CLERK_SECRET_KEY"))
+        clerk = get_clerk_client()
         user = clerk.users.get(user_id)
         
         if user and user.email_addresses:
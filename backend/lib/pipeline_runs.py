@@ -0,0 +1,123 @@
+import hashlib
+from datetime import datetime
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from .database import get_db
+from .dag import Stage
+
+# --- Checkpointed Pipeline Runs ---
+# Each automation of a (user, meeting) has one pipeline_runs document, keyed by
+# its idempotency key. A finished stage stores a small reference to its output
+# (transcript_id, minutes_id, action item ids, ...) under checkpoints.<stage>.
+# Running the same meeting again - a job retry or a re-submission - restores
+# those stages instead of recomputing them and continues from the first stage
+# without a checkpoint. A run whose input changed starts from scratch.
+RUN_RUNNING = "running"
+RUN_SUCCEEDED = "succeeded"
+RUN_FAILED = "failed"
+
+def pipeline_key(user_id: str, meeting_id: str) -> str:
+    """Idempotency key of the automation run for a meeting."""
+    return f"automation:{user_id}:{meeting_id}"
+
+def input_fingerprint(*inputs) -> str:
+    """Hash of a run's inputs (video URL / transcript text), to spot a changed re-submission."""
+    return hashlib.sha256("\x00".join(value or "" for value in inputs).encode("utf-8")).hexdigest()
+
+def start_pipeline_run(key: str, user_id: str, meeting_id: str, fingerprint: str) -> dict:
+    """Creates the run, or resumes it with its checkpoints. Returns the run document."""
+    db = get_db()
+    now = datetime.utcnow()
+    update = {
+        "$setOnInsert": {"user_id": user_id, "meeting_id": meeting_id, "input": fingerprint, "checkpoints": {}, "created_at": now},
+        "$set": {"status": RUN_RUNNING, "updated_at": now},
+        "$inc": {"attempts": 1},
+    }
+    try:
+        run = db.pipeline_runs.find_one_and_update({"_id": key}, update, upsert=True, return_document=ReturnDocument.AFTER)
+    except DuplicateKeyError:
+        # Another worker created it at the same moment
+        run = db.pipeline_runs.find_one_and_update({"_id": key}, update, return_document=ReturnDocument.AFTER)
+
+    if run["input"] != fingerprint:
+        print(f"🔁 Input changed for pipeline run {key}; starting over.")
+        run = db.pipeline_runs.find_one_and_update(
+            {"_id": key},
+            {"$set": {"input": fingerprint, "checkpoints": {}}},
+            return_document=ReturnDocument.AFTER,
+        )
+    elif run["checkpoints"]:
+        print(f"♻️ Resuming pipeline run {key} after: {', '.join(run['checkpoints'])}")
+    return run
+
+def save_checkpoint(key: str, stage: str, checkpoint: dict):
+    get_db().pipeline_runs.update_one(
+        {"_id": key},
+        {"$set": {f"checkpoints.{stage}": checkpoint, "updated_at": datetime.utcnow()}}
+    )
+
+def finish_pipeline_run(key: str, result: dict = None, error: str = None):
+    """Marks the run as succeeded (with its result) or failed (with the error)."""
+    update = {"status": RUN_FAILED if error else RUN_SUCCEEDED, "last_error": error, "updated_at": datetime.utcnow()}
+    if not error:
+        update["result"] = result
+    get_db().pipeline_runs.update_one({"_id": key}, {"$set": update})
+
+def get_pipeline_run(key: str):
+    return get_db().pipeline_runs.find_one({"_id": key})
+
+def clear_checkpoints(key: str, stages: list):
+    get_db().pipeline_runs.update_one(
+        {"_id": key},
+        {"$unset": {f"checkpoints.{stage}": "" for stage in stages}, "$set": {"updated_at": datetime.utcnow()}}
+    )
+
+def _downstream(stages: list) -> dict:
+    """Stage name -> names of all stages that depend on it, directly or indirectly."""
+    dependents = {stage.name: set() for stage in stages}
+    for stage in stages:
+        for dep in stage.deps:
+            dependents.setdefault(dep, set()).add(stage.name)
+
+    def collect(name, seen):
+        for child in dependents.get(name, ()):
+            if child not in seen:
+                seen.add(child)
+                collect(child, seen)
+        return seen
+    return {stage.name: collect(stage.name, set()) for stage in stages}
+
+def checkpointed(run: dict, stage: Stage, save, restore, downstream: set = ()) -> Stage:
+    """
+    Wraps a stage so its output is checkpointed on the run. `save(result)`
+    returns the checkpoint to store; `restore(checkpoint, results)` rebuilds
+    the stage result from it when the run is resumed, or raises LookupError
+    if the output it points to is gone, in which case the stage runs again.
+    A stage that runs again drops the checkpoints of the `downstream` stages,
+    since they were built from its previous output.
+    """
+    def run_or_restore(results):
+        checkpoint = run["checkpoints"].get(stage.name)
+        if checkpoint is not None:
+            try:
+                result = restore(checkpoint, results)
+                print(f"♻️ Restored stage '{stage.name}' from checkpoint.")
+                return result
+            except LookupError as e:
+                print(f"⚠️ Checkpoint of stage '{stage.name}' is stale ({e}); running it again.")
+        # Downstream stages cannot start before this one finishes, so this cannot race them
+        stale = [name for name in downstream if name in run["checkpoints"]]
+        if stale:
+            print(f"🔁 Stage '{stage.name}' runs again; dropping checkpoints of: {', '.join(sorted(stale))}")
+            clear_checkpoints(run["_id"], stale)
+            for name in stale:
+                run["checkpoints"].pop(name, None)
+        result = stage.func(results)
+        save_checkpoint(run["_id"], stage.name, save(result))
+        return result
+    return Stage(stage.name, run_or_restore, stage.deps)
+
+def checkpointed_stages(run: dict, stages: list, checkpoints: dict) -> list:
+    """Wraps every stage with checkpointed(); `checkpoints` maps stage name -> (save, restore)."""
+    downstream = _downstream(stages)
+    return [checkpointed(run, stage, *checkpoints[stage.name], downstream=downstream[stage.name]) for stage in stages]
@@ -1,89 +1,179 @@
+import os
+import time
+import threading
 from datetime import datetime
 from bson.objectid import ObjectId
-from .database import get_db
+from .database import get_db, get_usage, increment_usage, reserve_usage, usage_month, USAGE_FIELDS
 
-def get_monthly_meeting_count(user_id: str) -> int:
+# Quota checks read the materialized monthly usage document (one point read)
+# instead of counting meetings/transcripts. Only the quota display endpoints
+# read through the in-process cache (QUOTA_CACHE_SECONDS); limit checks read
+# the document directly, and creating meetings and transcriptions reserves
+# usage with a conditional $inc, so a burst of requests cannot overshoot.
+QUOTA_CACHE_SECONDS = float(os.getenv("QUOTA_CACHE_SECONDS", "10"))
+
+FREE_TIER_LIMITS = {"meeting": 5, "automation": 5, "transcription": 5}
+_USAGE_FIELD = {"meeting": "meetings", "automation": "automation_cycles", "transcription": "transcriptions"}
+
+_usage_cache = {}  # (user_id, month) -> (usage dict, fetched_at)
+_usage_cache_lock = threading.Lock()
+
+def _cached_usage(user_id: str, cached: bool = True) -> dict:
+    key = (user_id, usage_month())
+    if not cached:
+        usage = get_usage(user_id, key[1])
+        with _usage_cache_lock:
+            _usage_cache[key] = (usage, time.monotonic())
+        return dict(usage)
+    with _usage_cache_lock:
+        entry = _usage_cache.get(key)
+        if entry and time.monotonic() - entry[1] < QUOTA_CACHE_SECONDS:
+            return dict(entry[0])
+    usage = get_usage(user_id, key[1])
+    with _usage_cache_lock:
+        _usage_cache[key] = (usage, time.monotonic())
+    return dict(usage)
+
+def _invalidate_usage(user_id: str):
+    with _usage_cache_lock:
+        _usage_cache.pop((user_id, usage_month()), None)
+
+def get_monthly_meeting_count(user_id: str, cached: bool = True) -> int:
     """Counts meetings created by a user in the current month."""
-    db = get_db()
-    
-    # Get the first day of the current month
-    now = datetime.now()
-    first_day = datetime(now.year, now.month, 1)
-    
-    # Find all meetings created by the user this month
-    count = db.meetings.count_documents({
-        "user_id": user_id,
-        "created_at": {"$gte": first_day}
-    })
-    return count
-
-def get_monthly_automation_cycles(user_id: str) -> int:
+    return _cached_usage(user_id, cached)["meetings"]
+
+def get_monthly_automation_cycles(user_id: str, cached: bool = True) -> int:
     """Counts automated processing cycles used by a user in the current month."""
+    return _cached_usage(user_id, cached)["automation_cycles"]
+
+def reserve_automation_cycle(meeting_id: str, user_id: str, limit: int = None) -> tuple:
+    """
+    Counts one automation cycle for a meeting when its job is enqueued, in the
+    current month. With a `limit` (free tier) the count is reserved atomically
+    and refused once the month's cycles are used up. A meeting is only counted
+    once, so re-submitting it or retrying its job is not billed twice.
+    Returns (allowed, counted_now). Raises LookupError if the meeting does
+    not exist.
+    """
     db = get_db()
-    
-    # Get the first day of the current month
-    now = datetime.now()
-    first_day = datetime(now.year, now.month, 1)
-    
-    # Count documents where automation was used
-    count = db.meetings.count_documents({
-        "user_id": user_id,
-        "created_at": {"$gte": first_day},
-        "automation_used": True
-    })
-    return count
-
-def increment_automation_cycle(meeting_id: str, user_id: str) -> bool:
-    """Marks a meeting as having used an automation cycle."""
-    db = get_db()
-    result = db.meetings.update_one(
-        {"_id": ObjectId(meeting_id), "user_id": user_id},
-        {"$set": {"automation_used": True}}
+    meeting = ObjectId.is_valid(meeting_id) and db.meetings.find_one({"_id": ObjectId(meeting_id), "user_id": user_id}, {"automation_used": 1})
+    if not meeting:
+        raise LookupError(f"Meeting {meeting_id} not found.")
+    if meeting.get("automation_used"):
+        return (True, False)
+    now = datetime.utcnow()
+    if limit is not None:
+        if not reserve_usage(user_id, "automation_cycles", limit, when=now):
+            _invalidate_usage(user_id)
+            return (False, False)
+    else:
+        increment_usage(user_id, "automation_cycles", when=now)
+    marked = db.meetings.update_one(
+        {"_id": ObjectId(meeting_id), "user_id": user_id, "automation_used": {"$ne": True}},
+        {"$set": {"automation_used": True, "automation_used_at": now}}
     )
-    return result.modified_count > 0
+    if marked.modified_count == 0:
+        # A parallel submission counted this meeting first: give the new count back
+        increment_usage(user_id, "automation_cycles", when=now, amount=-1)
+    _invalidate_usage(user_id)
+    return (True, marked.modified_count > 0)
 
-def check_free_tier_limits(user_id: str, action_type: str = "meeting"):
+def release_automation_cycle(meeting_id: str, user_id: str) -> bool:
+    """Gives back the cycle counted for a meeting whose automation job finally failed."""
+    meeting = get_db().meetings.find_one_and_update(
+        {"_id": ObjectId(meeting_id), "user_id": user_id, "automation_used": True},
+        {"$set": {"automation_used": False}, "$unset": {"automation_used_at": ""}},
+    )
+    if not meeting:
+        return False
+    # Credited to the month the cycle was counted in
+    increment_usage(user_id, "automation_cycles", when=meeting.get("automation_used_at") or meeting.get("created_at"), amount=-1)
+    _invalidate_usage(user_id)
+    return True
+
+def check_free_tier_limits(user_id: str, action_type: str = "meeting", cached: bool = False):
     """
     Checks if a free tier user has exceeded their limits.
-    
+
     Args:
         user_id: The user ID to check
         action_type: The type of action being performed ("meeting", "transcription", "automation")
-        
+        cached: Allow a cached usage read (display only, never before a write)
+
     Returns:
         tuple: (exceeded_limit, limit_info)
     """
-    if action_type == "meeting":
-        limit = 5
-        current = get_monthly_meeting_count(user_id)
-        return (current >= limit, {"limit": limit, "used": current, "remaining": max(0, limit - current)})
-    
-    elif action_type == "automation":
-        limit = 5
-        current = get_monthly_automation_cycles(user_id)
-        return (current >= limit, {"limit": limit, "used": current, "remaining": max(0, limit - current)})
-    
-    elif action_type == "transcription":
-        limit = 5
-        current = get_monthly_transcription_count(user_id)
-        return (current >= limit, {"limit": limit, "used": current, "remaining": max(0, limit - current)})
-    
-    return (False, {})
-
-def get_monthly_transcription_count(user_id: str) -> int:
+    if action_type not in FREE_TIER_LIMITS:
+        return (False, {})
+    limit = FREE_TIER_LIMITS[action_type]
+    current = _cached_usage(user_id, cached)[_USAGE_FIELD[action_type]]
+    return (current >= limit, {"limit": limit, "used": current, "remaining": max(0, limit - current)})
+
+def reserve_free_tier_usage(user_id: str, action_type: str) -> bool:
+    """
+    Atomically counts one meeting or transcription against a free tier user's
+    limit. Returns False if the limit is reached. Pass usage_reserved=True to
+    the save function afterwards, or release_usage() if the action fails.
+    """
+    reserved = reserve_usage(user_id, _USAGE_FIELD[action_type], FREE_TIER_LIMITS[action_type])
+    _invalidate_usage(user_id)
+    return reserved
+
+def release_usage(user_id: str, action_type: str):
+    """Gives back a reservation whose action failed."""
+    increment_usage(user_id, _USAGE_FIELD[action_type], amount=-1)
+    _invalidate_usage(user_id)
+
+def get_monthly_transcription_count(user_id: str, cached: bool = True) -> int:
     """
     Counts automated transcription operations performed by a user in the current month.
     """
+    return _cached_usage(user_id, cached)["transcriptions"]
+
+def reconcile_usage(month: str = None, user_id: str = None) -> int:
+    """
+    Rebuilds the usage counters for a month ("YYYY-MM", default: current)
+    from the meetings and transcripts collections, for one user or everyone.
+    Returns the number of usage documents written.
+    """
     db = get_db()
-    
-    # Get the first day of the current month
-    now = datetime.now()
-    first_day = datetime(now.year, now.month, 1)
-    
-    # Count documents where automated transcription was used
-    count = db.transcripts.count_documents({
-        "user_id": user_id,
-        "created_at": {"$gte": first_day},
-        "automated": True  # Only count automated transcriptions
-    })
-    return count
\ No newline at end of file
+    month = month or usage_month()
+    start = datetime.strptime(month, "%Y-%m")
+    end = datetime(start.year + (start.month == 12), start.month % 12 + 1, 1)
+    match = {"created_at": {"$gte": start, "$lt": end}}
+    if user_id:
+        match["user_id"] = user_id
+
+    counts = {}
+    def tally(collection, group):
+        for row in db[collection].aggregate([{"$match": match}, {"$group": {"_id": "$user_id", **group}}]):
+            counts.setdefault(row["_id"], {field: 0 for field in USAGE_FIELDS}).update({k: v for k, v in row.items() if k != "_id"})
+
+    tally("meetings", {"meetings": {"$sum": 1}})
+    tally("transcripts", {"transcriptions": {"$sum": {"$cond": [{"$eq": ["$automated", True]}, 1, 0]}}})
+    # Automation cycles count in the month they were used, like reserve_automation_cycle
+    # (meetings automated before automation_used_at was recorded fall back to created_at)
+    used_at = {"$ifNull": ["$automation_used_at", "$created_at"]}
+    automation_match = {"automation_used": True, "$expr": {"$and": [{"$gte": [used_at, start]}, {"$lt": [used_at, end]}]}}
+    if user_id:
+        automation_match["user_id"] = user_id
+    for row in db.meetings.aggregate([{"$match": automation_match}, {"$group": {"_id": "$user_id", "automation_cycles": {"$sum": 1}}}]):
+        counts.setdefault(row["_id"], {field: 0 for field in USAGE_FIELDS})["automation_cycles"] = row["automation_cycles"]
+    if user_id:
+        counts.setdefault(user_id, {field: 0 for field in USAGE_FIELDS})
+
+    for uid, usage in counts.items():
+        db.usage.update_one(
+            {"_id": f"{uid}:{month}"},
+            {"$set": {**usage, "user_id": uid, "month": month, "reconciled_at": datetime.utcnow()}},
+            upsert=True,
+        )
+        _invalidate_usage(uid)
+    print(f"✅ Reconciled usage counters for {len(counts)} user(s) in {month}.")
+    return len(counts)
+
+# Reconciliation job, e.g. nightly from cron:
+#   python -m lib.quota [YYYY-MM] [user_id]
+if __name__ == "__main__":
+    import sys
+    reconcile_usage(*(sys.argv[1:3]))
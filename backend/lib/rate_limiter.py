@@ -0,0 +1,245 @@
+import os
+import time
+import heapq
+import itertools
+import threading
+from datetime import datetime, timedelta
+from pymongo.errors import DuplicateKeyError
+from google.api_core.exceptions import ResourceExhausted
+
+# --- Shared Gemini rate limiter ---
+# Every Gemini call (minutes, action items, transcription) goes through one
+# process-wide limiter instead of its own blind retry loop. Callers queue for
+# request (RPM) and token (TPM) budget from two token buckets; the head of the
+# queue is served first, and interactive requests always go before automation
+# jobs. When Gemini still answers 429, the whole limiter pauses with
+# exponential backoff and the retry re-joins the queue, so concurrent callers
+# back off together instead of stampeding the quota.
+# Set GEMINI_RATE_LIMIT_BACKEND=mongo to also share a per-minute budget
+# across processes (API replicas and workers) through the rate_limits collection.
+# API processes only make interactive calls and workers only automation calls,
+# so across processes priority is a reserved share of every shared window:
+# automation calls may only fill the window up to 1 - GEMINI_INTERACTIVE_RESERVE.
+GEMINI_RPM = int(os.getenv("GEMINI_RPM", "60"))
+GEMINI_TPM = int(os.getenv("GEMINI_TPM", "1000000"))
+GEMINI_RATE_LIMIT_BACKEND = os.getenv("GEMINI_RATE_LIMIT_BACKEND", "local")  # "local" or "mongo"
+GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "3"))
+GEMINI_BACKOFF_BASE = float(os.getenv("GEMINI_BACKOFF_BASE", "5"))  # seconds
+GEMINI_INTERACTIVE_RESERVE = float(os.getenv("GEMINI_INTERACTIVE_RESERVE", "0.25"))  # share of the shared window
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_AUTOMATION = "automation"
+_PRIORITY_RANK = {PRIORITY_INTERACTIVE: 0, PRIORITY_AUTOMATION: 1}
+
+_default_priority = os.getenv("GEMINI_DEFAULT_PRIORITY", PRIORITY_INTERACTIVE)
+
+def set_default_priority(priority: str):
+    """Sets the priority for calls made by this process (workers use 'automation')."""
+    global _default_priority
+    if priority not in _PRIORITY_RANK:
+        raise ValueError(f"Unknown priority: {priority}")
+    _default_priority = priority
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for budgeting (~4 characters per token)."""
+    return max(1, len(text or "") // 4)
+
+class TokenBucket:
+    """Refills `rate_per_minute` units per minute, up to one minute's worth."""
+    def __init__(self, rate_per_minute: int):
+        self.capacity = float(rate_per_minute)
+        self.tokens = float(rate_per_minute)
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.capacity / 60)
+        self.updated_at = now
+
+    def seconds_until(self, amount: float, now: float) -> float:
+        self._refill(now)
+        missing = min(amount, self.capacity) - self.tokens
+        return max(0.0, missing * 60 / self.capacity)
+
+    def take(self, amount: float):
+        self.tokens -= min(amount, self.capacity)
+
+    def give_back(self, amount: float):
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+class MongoRateLimitStore:
+    """
+    Fixed one-minute windows in MongoDB, shared by every process. Automation
+    calls leave `interactive_reserve` of each window to interactive calls.
+    """
+    def __init__(self, name: str, rpm: int, tpm: int, interactive_reserve: float = GEMINI_INTERACTIVE_RESERVE):
+        self.name = name
+        self.rpm = rpm
+        self.tpm = tpm
+        self.interactive_reserve = interactive_reserve
+
+    def _limits(self, priority: str) -> tuple:
+        if priority == PRIORITY_INTERACTIVE:
+            return self.rpm, self.tpm
+        share = 1 - self.interactive_reserve
+        return max(1, int(self.rpm * share)), max(1, int(self.tpm * share))
+
+    def try_take(self, tokens: int, priority: str = PRIORITY_INTERACTIVE) -> float:
+        """Reserves one request and `tokens` in the current window. Returns 0 on success, else seconds to wait."""
+        from .database import get_db
+        now = datetime.utcnow()
+        window = now.replace(second=0, microsecond=0)
+        rpm, tpm = self._limits(priority)
+        tokens = min(tokens, tpm)
+        query = {"_id": f"{self.name}:{window.isoformat()}", "requests": {"$lte": rpm - 1}, "tokens": {"$lte": tpm - tokens}}
+        update = {"$inc": {"requests": 1, "tokens": tokens}, "$setOnInsert": {"expires_at": window + timedelta(minutes=2)}}
+        # The upsert only conflicts when the window already exists; then a plain
+        # update tells whether it still has room.
+        for upsert in (True, False):
+            try:
+                result = get_db().rate_limits.update_one(query, update, upsert=upsert)
+            except DuplicateKeyError:
+                continue
+            if result.upserted_id is not None or result.modified_count:
+                return 0.0
+            break
+        return (window + timedelta(minutes=1) - now).total_seconds()
+
+class RateLimiter:
+    """Priority queue in front of RPM/TPM token buckets."""
+    def __init__(self, name: str, rpm: int, tpm: int, store: MongoRateLimitStore = None):
+        self.name = name
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.store = store
+        self._cond = threading.Condition()
+        self._queue = []
+        self._seq = itertools.count()
+        self._paused_until = 0.0
+        self._stats = {
+            "queued": {p: 0 for p in _PRIORITY_RANK},
+            "max_queued": 0,
+            "acquired": 0,
+            "wait_seconds": 0.0,
+            "rate_limited": 0,
+        }
+
+    def _seconds_until_ready(self, tokens: int, now: float) -> float:
+        return max(
+            self._paused_until - now,
+            self.requests.seconds_until(1, now),
+            self.tokens.seconds_until(tokens, now),
+        )
+
+    def acquire(self, tokens: int, priority: str = None, timeout: float = None):
+        """Blocks in the queue until one request and `tokens` tokens are available."""
+        priority = priority or _default_priority
+        ticket = (_PRIORITY_RANK[priority], next(self._seq))
+        started_at = time.monotonic()
+        with self._cond:
+            heapq.heappush(self._queue, ticket)
+            self._stats["queued"][priority] += 1
+            self._stats["max_queued"] = max(self._stats["max_queued"], len(self._queue))
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = None  # not at the head: sleep until the queue moves
+                    if self._queue[0] == ticket:
+                        wait = self._seconds_until_ready(tokens, now)
+                        if wait <= 0 and self.store:
+                            # The DB round trip runs without the lock; the ticket
+                            # keeps its place, so nobody else is admitted meanwhile
+                            self._cond.release()
+                            try:
+                                wait = self.store.try_take(tokens, priority)
+                            finally:
+                                self._cond.acquire()
+                        if wait <= 0:
+                            self.requests.take(1)
+                            self.tokens.take(tokens)
+                            self._remove(ticket)
+                            self._stats["acquired"] += 1
+                            self._stats["wait_seconds"] += now - started_at
+                            return
+                    if timeout is not None:
+                        remaining = started_at + timeout - now
+                        if remaining <= 0:
+                            raise TimeoutError(f"Timed out waiting for {self.name} rate limit.")
+                        wait = remaining if wait is None else min(wait, remaining)
+                    self._cond.wait(wait)
+            except BaseException:
+                # Timeout or a store error (e.g. MongoDB unreachable): a ticket
+                # left at the head would block every later caller forever
+                self._remove(ticket)
+                raise
+            finally:
+                self._stats["queued"][priority] -= 1
+
+    def _remove(self, ticket):
+        """Takes a ticket out of the queue and wakes the callers behind it. Call with the lock held."""
+        if ticket in self._queue:
+            self._queue.remove(ticket)
+            heapq.heapify(self._queue)
+        self._cond.notify_all()
+
+    def settle(self, estimated_tokens: int, actual_tokens: int):
+        """Corrects the token bucket once the real usage of a call is known."""
+        with self._cond:
+            if actual_tokens > estimated_tokens:
+                self.tokens.take(actual_tokens - estimated_tokens)
+            else:
+                self.tokens.give_back(estimated_tokens - actual_tokens)
+            self._cond.notify_all()
+
+    def backoff(self, seconds: float):
+        """Pauses every caller after a 429 instead of letting each one retry on its own."""
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._stats["rate_limited"] += 1
+            self._cond.notify_all()
+
+    def get_stats(self) -> dict:
+        with self._cond:
+            stats = {key: (dict(value) if isinstance(value, dict) else value) for key, value in self._stats.items()}
+            stats["queue_depth"] = len(self._queue)
+            stats["paused_seconds"] = round(max(0.0, self._paused_until - time.monotonic()), 2)
+        wait_seconds = stats.pop("wait_seconds")
+        stats["avg_wait_seconds"] = round(wait_seconds / stats["acquired"], 3) if stats["acquired"] else None
+        return stats
+
+_gemini_limiter = None
+_gemini_limiter_lock = threading.Lock()
+
+def get_gemini_limiter() -> RateLimiter:
+    """Returns the process-wide limiter shared by all Gemini callers."""
+    global _gemini_limiter
+    with _gemini_limiter_lock:
+        if _gemini_limiter is None:
+            store = MongoRateLimitStore("gemini", GEMINI_RPM, GEMINI_TPM) if GEMINI_RATE_LIMIT_BACKEND == "mongo" else None
+            _gemini_limiter = RateLimiter("gemini", GEMINI_RPM, GEMINI_TPM, store=store)
+        return _gemini_limiter
+
+def call_gemini(func, estimated_tokens: int, priority: str = None, max_retries: int = GEMINI_MAX_RETRIES):
+    """
+    Runs `func()` (a Gemini request) once the shared limiter admits it.
+    ResourceExhausted pauses the limiter with exponential backoff and the
+    retry queues again; other errors are raised immediately.
+    """
+    limiter = get_gemini_limiter()
+    for attempt in range(max_retries):
+        limiter.acquire(estimated_tokens, priority)
+        try:
+            response = func()
+        except ResourceExhausted as e:
+            print(f"Attempt {attempt + 1}/{max_retries} failed with ResourceExhausted: {e}")
+            if attempt == max_retries - 1:
+                print("Max retries reached. AI call failed.")
+                raise
+            limiter.backoff(GEMINI_BACKOFF_BASE * (2 ** attempt))
+            continue
+        usage = getattr(response, "usage_metadata", None)
+        if usage and getattr(usage, "total_token_count", None):
+            limiter.settle(estimated_tokens, usage.total_token_count)
+        return response
+
+def get_rate_limiter_stats() -> dict:
+    return get_gemini_limiter().get_stats()
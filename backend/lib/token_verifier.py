@@ -0,0 +1,161 @@
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+import jwt
+import requests
+
+# --- Local session token verification ---
+# Clerk session tokens are RS256 JWTs signed with the instance's JWKS keys.
+# Instead of calling authenticate_request (and possibly fetching JWKS) on
+# every request, keys are cached by `kid` and tokens are verified locally.
+# A token whose `kid` is unknown triggers one JWKS refresh (key rotation), at
+# most every JWKS_MIN_REFRESH_SECONDS. Verified tokens are memoized until
+# they expire, so repeat requests with the same token skip the signature check.
+# Set CLERK_JWKS_PATH to a JWKS JSON file to verify against local keys offline.
+CLERK_JWKS_URL = os.getenv("CLERK_JWKS_URL", "https://api.clerk.com/v1/jwks")
+CLERK_JWKS_PATH = os.getenv("CLERK_JWKS_PATH")
+CLERK_AUTHORIZED_PARTIES = [p for p in os.getenv("CLERK_AUTHORIZED_PARTIES", "").split(",") if p]
+JWKS_CACHE_SECONDS = float(os.getenv("JWKS_CACHE_SECONDS", "3600"))
+JWKS_MIN_REFRESH_SECONDS = float(os.getenv("JWKS_MIN_REFRESH_SECONDS", "30"))
+TOKEN_CACHE_ENTRIES = int(os.getenv("TOKEN_CACHE_ENTRIES", "10000"))
+TOKEN_LEEWAY_SECONDS = 5  # clock skew tolerance
+
+class TokenVerificationError(Exception):
+    pass
+
+def fetch_clerk_jwks() -> dict:
+    """Fetches the instance JWKS from the Clerk Backend API."""
+    secret_key = os.getenv("CLERK_SECRET_KEY")
+    if not secret_key:
+        raise ValueError("CLERK_SECRET_KEY not found in environment variables.")
+    response = requests.get(CLERK_JWKS_URL, headers={"Authorization": f"Bearer {secret_key}"}, timeout=10)
+    response.raise_for_status()
+    return response.json()
+
+def load_jwks_file(path: str):
+    """Returns a fetcher that reads a JWKS document from a local file."""
+    def fetch():
+        with open(path) as f:
+            return json.load(f)
+    return fetch
+
+class JWKSCache:
+    """Public keys by `kid`, refreshed on expiry or when an unknown `kid` shows up."""
+    def __init__(self, fetch_jwks, ttl: float = JWKS_CACHE_SECONDS, min_refresh: float = JWKS_MIN_REFRESH_SECONDS):
+        self.fetch_jwks = fetch_jwks
+        self.ttl = ttl
+        self.min_refresh = min_refresh
+        self._keys = {}
+        self._fetched_at = None
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        jwks = self.fetch_jwks()
+        self._keys = {key["kid"]: jwt.algorithms.RSAAlgorithm.from_jwk(json.dumps(key)) for key in jwks.get("keys", []) if key.get("kid")}
+        self._fetched_at = time.monotonic()
+        print(f"🔑 Loaded {len(self._keys)} JWKS key(s).")
+
+    def get_key(self, kid: str):
+        with self._lock:
+            age = time.monotonic() - self._fetched_at if self._fetched_at is not None else None
+            if age is None or age > self.ttl or (kid not in self._keys and age > self.min_refresh):
+                self._refresh()
+            key = self._keys.get(kid)
+        if key is None:
+            raise TokenVerificationError(f"No signing key found for kid '{kid}'.")
+        return key
+
+class TokenVerifier:
+    def __init__(self, jwks: JWKSCache, authorized_parties: list = None, cache_entries: int = TOKEN_CACHE_ENTRIES):
+        self.jwks = jwks
+        self.authorized_parties = authorized_parties or []
+        self.cache_entries = cache_entries
+        self._verified = OrderedDict()  # token -> claims
+        self._lock = threading.Lock()
+
+    def get_cached(self, token: str):
+        """Returns the claims of a previously verified, unexpired token, or None."""
+        with self._lock:
+            claims = self._verified.get(token)
+            if claims is None:
+                return None
+            if claims["exp"] <= time.time():
+                del self._verified[token]
+                return None
+            self._verified.move_to_end(token)
+            return claims
+
+    def verify(self, token: str) -> dict:
+        """Verifies the token signature and claims. Raises TokenVerificationError."""
+        claims = self.get_cached(token)
+        if claims is not None:
+            return claims
+        try:
+            kid = jwt.get_unverified_header(token).get("kid")
+            claims = jwt.decode(
+                token,
+                self.jwks.get_key(kid),
+                algorithms=["RS256"],
+                leeway=TOKEN_LEEWAY_SECONDS,
+                options={"require": ["exp", "sub"], "verify_aud": False},
+            )
+        except jwt.PyJWTError as e:
+            raise TokenVerificationError(str(e))
+        if self.authorized_parties and claims.get("azp") and claims["azp"] not in self.authorized_parties:
+            raise TokenVerificationError(f"Unauthorized party: {claims['azp']}")
+
+        with self._lock:
+            self._verified[token] = claims
+            while len(self._verified) > self.cache_entries:
+                self._verified.popitem(last=False)
+        return claims
+
+_verifier = None
+_verifier_lock = threading.Lock()
+
+def get_token_verifier() -> TokenVerifier:
+    """Returns the process-wide verifier for Clerk session tokens."""
+    global _verifier
+    with _verifier_lock:
+        if _verifier is None:
+            fetch = load_jwks_file(CLERK_JWKS_PATH) if CLERK_JWKS_PATH else fetch_clerk_jwks
+            _verifier = TokenVerifier(JWKSCache(fetch), CLERK_AUTHORIZED_PARTIES)
+        return _verifier
+
+def make_stub_jwks(kid: str = "stub-key"):
+    """
+    Generates an RSA key pair for offline testing. Returns (jwks, sign) where
+    `sign(claims)` produces a token the JWKS verifies.
+    """
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    public_jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+    public_jwk.update({"kid": kid, "alg": "RS256", "use": "sig"})
+
+    def sign(claims: dict) -> str:
+        return jwt.encode(claims, private_key, algorithm="RS256", headers={"kid": kid})
+    return {"keys": [public_jwk]}, sign
+
+# Benchmark: python -m lib.token_verifier
+if __name__ == "__main__":
+    jwks, sign = make_stub_jwks()
+    verifier = TokenVerifier(JWKSCache(lambda: jwks))
+    tokens = [sign({"sub": f"user_{i}", "exp": int(time.time()) + 600}) for i in range(200)]
+    verifier.verify(tokens[0])  # load keys
+
+    started_at = time.perf_counter()
+    for token in tokens[1:]:
+        verifier.verify(token)
+    cold_us = (time.perf_counter() - started_at) / (len(tokens) - 1) * 1e6
+
+    rounds = 10000
+    started_at = time.perf_counter()
+    for i in range(rounds):
+        verifier.verify(tokens[i % len(tokens)])
+    warm_us = (time.perf_counter() - started_at) / rounds * 1e6
+
+    print(f"First verification (signature check): {cold_us:.1f} µs/request")
+    print(f"Repeat verification (memoized):        {warm_us:.1f} µs/request")
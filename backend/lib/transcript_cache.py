@@ -0,0 +1,100 @@
+import os
+import time
+import threading
+from datetime import datetime, timedelta
+from .database import get_db
+from .cache_stats import CacheStats
+
+# --- Content-addressed transcription cache ---
+# Transcripts produced from a video are saved with fingerprints:
+#   source_key        - hash of the source URL plus its ETag/size (or path/size/mtime)
+#   audio_prefix_hash - hash of the first audio window, known before any window
+#                       is sent to Gemini
+#   audio_hash        - hash of the whole extracted audio track
+# Before transcribing, we look for an existing transcript of the same user with
+# the same fingerprint and reuse its text. A prefix match is only a candidate:
+# it is confirmed by the full audio_hash once the audio is extracted. The
+# transcripts collection is the store; evicting an entry only removes its
+# fingerprints, never the transcript.
+TRANSCRIPT_CACHE_TTL_DAYS = int(os.getenv("TRANSCRIPT_CACHE_TTL_DAYS", "30"))
+TRANSCRIPT_CACHE_MAX_ENTRIES = int(os.getenv("TRANSCRIPT_CACHE_MAX_ENTRIES", "5000"))
+TRANSCRIPT_CACHE_EVICT_SECONDS = int(os.getenv("TRANSCRIPT_CACHE_EVICT_SECONDS", "3600"))
+
+_CACHE_KEYS = ("source_key", "audio_prefix_hash", "audio_hash")
+_stats = CacheStats("transcription")
+_last_eviction = 0.0
+_eviction_lock = threading.Lock()
+
+def find_cached_transcript(user_id: str, source_key: str = None, audio_prefix_hash: str = None, count_miss: bool = True):
+    """
+    Returns the newest unexpired transcript of the user matching a fingerprint
+    ({"transcript", "audio_hash"}), or None on a miss. Prefers source_key
+    since it avoids any download. Transcripts are never shared across users.
+    Pass count_miss=False for a lookup that will be followed by another one.
+    """
+    db = get_db()
+    cutoff = datetime.utcnow() - timedelta(days=TRANSCRIPT_CACHE_TTL_DAYS)
+    for field, value in (("source_key", source_key), ("audio_prefix_hash", audio_prefix_hash)):
+        if not value:
+            continue
+        doc = db.transcripts.find_one(
+            {"user_id": user_id, field: value, "created_at": {"$gte": cutoff}},
+            {"transcript": 1, "audio_hash": 1},
+            sort=[("created_at", -1)],
+        )
+        if doc and doc.get("transcript"):
+            print(f"♻️ Transcript cache HIT on {field}.")
+            return doc
+
+    if count_miss:
+        record_transcript_cache_miss()
+    return None
+
+def record_transcript_cache_hit():
+    _stats.record("hits")
+
+def record_transcript_cache_miss():
+    _stats.record("misses")
+    _maybe_evict()
+
+def _maybe_evict():
+    """Runs the eviction at most once per TRANSCRIPT_CACHE_EVICT_SECONDS in this process."""
+    global _last_eviction
+    with _eviction_lock:
+        if time.monotonic() - _last_eviction < TRANSCRIPT_CACHE_EVICT_SECONDS:
+            return
+        _last_eviction = time.monotonic()
+    try:
+        evict_transcript_cache()
+    except Exception as e:
+        print(f"⚠️ Transcript cache eviction failed: {e}")
+
+def evict_transcript_cache() -> int:
+    """
+    Drops fingerprints from expired transcripts and from the oldest ones beyond
+    TRANSCRIPT_CACHE_MAX_ENTRIES. Returns the number of entries evicted.
+    """
+    db = get_db()
+    has_key = {"$or": [{key: {"$exists": True}} for key in _CACHE_KEYS]}
+    unset = {"$unset": {key: "" for key in _CACHE_KEYS}}
+    cutoff = datetime.utcnow() - timedelta(days=TRANSCRIPT_CACHE_TTL_DAYS)
+
+    evicted = db.transcripts.update_many({**has_key, "created_at": {"$lt": cutoff}}, unset).modified_count
+
+    overflow = db.transcripts.count_documents(has_key) - TRANSCRIPT_CACHE_MAX_ENTRIES
+    if overflow > 0:
+        oldest = [doc["_id"] for doc in db.transcripts.find(has_key, {"_id": 1}, sort=[("created_at", 1)], limit=overflow)]
+        evicted += db.transcripts.update_many({"_id": {"$in": oldest}}, unset).modified_count
+
+    if evicted:
+        _stats.record("evictions", evicted)
+    return evicted
+
+def get_transcript_cache_stats() -> dict:
+    """Returns hit/miss counters for this process and across all processes."""
+    return _stats.snapshot()
+
+# Eviction can also run from cron instead of (or besides) on cache misses:
+#   python -m lib.transcript_cache
+if __name__ == "__main__":
+    print(f"Evicted {evict_transcript_cache()} transcript cache entries.")
@@ -0,0 +1,76 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from .database import get_db
+from .cache_stats import CacheStats
+
+class TwoTierCache:
+    """
+    Key-value cache with an in-process LRU in front of a MongoDB collection
+    shared by every process. Entries expire after `ttl_hours`. Values must be
+    BSON-serializable (strings, lists, dicts).
+    """
+    def __init__(self, name: str, collection: str, ttl_hours: float, memory_entries: int):
+        self.name = name
+        self.collection = collection
+        self.ttl = timedelta(hours=ttl_hours)
+        self.memory_entries = memory_entries
+        self._memory = OrderedDict()  # key -> (value, expires_at)
+        self._lock = threading.Lock()
+        self._stats = CacheStats(name, events=("hits_memory", "hits_db", "misses"))
+
+    def _remember(self, key: str, value, expires_at: datetime):
+        with self._lock:
+            self._memory[key] = (value, expires_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, key: str):
+        """Returns the cached value for a key, or None on a miss."""
+        now = datetime.utcnow()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and entry[1] > now:
+                self._memory.move_to_end(key)
+            else:
+                self._memory.pop(key, None)
+                entry = None
+        # Stats are recorded outside the lock
+        if entry:
+            self._stats.record("hits_memory")
+            return entry[0]
+
+        try:
+            doc = get_db()[self.collection].find_one({"_id": key, "expires_at": {"$gt": now}}) or {}
+        except Exception as e:
+            # Like set(): a store outage degrades to a miss instead of failing the request
+            print(f"⚠️ Failed to read {self.name} cache entry: {e}")
+            doc = {}
+        value = doc.get("value")
+        if value is not None:
+            self._remember(key, value, doc["expires_at"])
+            self._stats.record("hits_db")
+            return value
+        self._stats.record("misses")
+        return None
+
+    def set(self, key: str, value):
+        """Stores a value in both tiers."""
+        now = datetime.utcnow()
+        expires_at = now + self.ttl
+        self._remember(key, value, expires_at)
+        try:
+            get_db()[self.collection].update_one(
+                {"_id": key},
+                {"$set": {"value": value, "created_at": now, "expires_at": expires_at}},
+                upsert=True,
+            )
+        except Exception as e:
+            print(f"⚠️ Failed to persist {self.name} cache entry: {e}")
+
+    def get_stats(self) -> dict:
+        stats = self._stats.snapshot()
+        with self._lock:
+            stats["memory_entries"] = len(self._memory)
+        return stats
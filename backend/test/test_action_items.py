@@ -0,0 +1,37 @@
+import sys
+import os
+import uuid
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import ConnectionFailure
+from lib.database import get_db
+from agents.action_item_tracker.action_item_service import save_action_items
+
+@pytest.fixture
+def db():
+    try:
+        return get_db()
+    except (ValueError, ConnectionFailure) as e:
+        pytest.skip(f"MongoDB is not available: {e}")
+
+@pytest.fixture
+def minutes_id(db):
+    user_id = f"test_action_items_{uuid.uuid4().hex}"
+    minutes_id = str(db.minutes.insert_one({"user_id": user_id, "action_items": []}).inserted_id)
+    yield user_id, minutes_id
+    db.action_items.delete_many({"user_id": user_id})
+    db.minutes.delete_many({"user_id": user_id})
+
+def test_items_and_minutes_are_saved_together(db, minutes_id):
+    user_id, minutes_id = minutes_id
+    items = [{"task": f"Task {i}", "owner": "Alex", "deadline": "2025-09-10", "duration": 60} for i in range(25)]
+
+    saved = save_action_items(user_id, minutes_id, items)
+
+    stored_ids = {str(doc["_id"]) for doc in db.action_items.find({"user_id": user_id, "minutes_id": minutes_id})}
+    minutes = db.minutes.find_one({"_id": ObjectId(minutes_id)})
+    assert len(stored_ids) == 25
+    assert {item["_id"] for item in saved} == stored_ids
+    assert [item["_id"] for item in minutes["action_items"]] == [item["_id"] for item in saved]
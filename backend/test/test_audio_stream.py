@@ -0,0 +1,40 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from agents.transcription_agent.audio_stream import parse_silences, plan_window_end, resolve_stream_url
+
+SILENCEDETECT_LOG = """
+[silencedetect @ 0x1] silence_start: -0.0123
+[silencedetect @ 0x1] silence_end: 1.5 | silence_duration: 1.51
+size=     512kB time=00:04:50.00 bitrate=  24.0kbits/s speed=40x
+[silencedetect @ 0x1] silence_start: 290.25
+[silencedetect @ 0x1] silence_end: 291.75 | silence_duration: 1.5
+[silencedetect @ 0x1] silence_start: 312
+"""
+
+def test_parse_silences_pairs_starts_and_ends():
+    # The negative start is clamped; the trailing start has no end yet and is dropped
+    assert parse_silences(SILENCEDETECT_LOG) == [(0.0, 1.5), (290.25, 291.75)]
+
+def test_parse_silences_without_silences():
+    assert parse_silences("size=  1kB time=00:00:01.00") == []
+
+def test_window_ends_in_the_middle_of_the_closest_silence():
+    silences = [(270.0, 271.0), (296.0, 298.0), (340.0, 341.0)]
+    assert plan_window_end(0.0, silences, target=300, search=30) == 297.0
+
+def test_window_end_is_relative_to_its_start():
+    silences = [(296.0, 298.0), (605.0, 606.0)]
+    assert plan_window_end(297.0, silences, target=300, search=30) == 605.5
+
+def test_window_end_falls_back_to_a_hard_cut():
+    # Nobody paused within the search range
+    assert plan_window_end(0.0, [(100.0, 101.0), (400.0, 401.0)], target=300, search=30) == 300.0
+    assert plan_window_end(0.0, [], target=300, search=30) == 300.0
+
+def test_drive_links_are_resolved_to_direct_downloads():
+    direct = "https://drive.usercontent.google.com/download?id=abc-123&export=download&confirm=t"
+    assert resolve_stream_url("https://drive.google.com/file/d/abc-123/view?usp=sharing") == direct
+    assert resolve_stream_url("https://drive.google.com/open?id=abc-123") == direct
+    assert resolve_stream_url("https://example.com/meeting.mp4") == "https://example.com/meeting.mp4"
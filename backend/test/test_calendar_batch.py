@@ -0,0 +1,77 @@
+import sys
+import os
+import json
+import threading
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from agents.action_item_tracker import calendar_service
+
+ITEMS = 30
+
+class StubCalendarHandler(BaseHTTPRequestHandler):
+    """Answers Calendar batch requests by echoing each inserted event back with an id."""
+    requests_seen = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        StubCalendarHandler.requests_seen.append(self.path)
+        message = BytesParser(policy=HTTP).parsebytes(
+            f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + body
+        )
+        boundary = "stub_batch_boundary"
+        parts = []
+        for index, part in enumerate(message.iter_parts()):
+            inner = part.get_payload(decode=True).decode()
+            event = json.loads(inner.split("\r\n\r\n", 1)[1] if "\r\n\r\n" in inner else inner.split("\n\n", 1)[1])
+            event.update({"id": f"event_{index}", "htmlLink": f"https://calendar.example.com/event_{index}"})
+            content_id = part["Content-ID"].strip("<>")
+            parts.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\nContent-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n\r\n{json.dumps(event)}\r\n"
+            )
+        payload = ("".join(parts) + f"--{boundary}--\r\n").encode()
+        self.send_response(200)
+        self.send_header("Content-Type", f"multipart/mixed; boundary={boundary}")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def stub_calendar(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubCalendarHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    StubCalendarHandler.requests_seen = []
+    monkeypatch.setattr(calendar_service, "CALENDAR_API_ENDPOINT", f"http://127.0.0.1:{server.server_port}/")
+    monkeypatch.setattr(calendar_service, "get_google_credentials", lambda user_id: {"credentials": {
+        "token": "stub-token", "refresh_token": "stub-refresh", "client_id": "stub", "client_secret": "stub",
+        "expiry": "2099-01-01T00:00:00Z",
+    }})
+
+    builds = []
+    real_build = calendar_service.build
+    monkeypatch.setattr(calendar_service, "build", lambda *args, **kwargs: builds.append(1) or real_build(*args, **kwargs))
+    yield builds
+    server.shutdown()
+    calendar_service.forget_calendar_service("stub_user")
+
+def test_schedule_many_items_in_one_round_trip(stub_calendar):
+    items = [
+        {"task_name": f"Task {i}", "description": "Action item", "deadline_str": "2030-01-15", "owner": "Alex", "duration_minutes": 60}
+        for i in range(ITEMS)
+    ]
+    events = calendar_service.schedule_action_items("stub_user", items)
+
+    assert [event["summary"] for event in events] == [f"Task {i} (Alex)" for i in range(ITEMS)]
+    assert StubCalendarHandler.requests_seen == ["/batch/calendar/v3"]
+
+    # The service is cached per user, so a second run does not rebuild it
+    calendar_service.schedule_action_items("stub_user", items[:5])
+    assert len(stub_calendar) == 1
+    assert len(StubCalendarHandler.requests_seen) == 2
@@ -0,0 +1,62 @@
+import sys
+import os
+import uuid
+from datetime import datetime
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from pymongo.errors import ConnectionFailure
+from lib.database import (
+    get_db,
+    save_meeting,
+    update_meeting,
+    delete_meeting,
+    update_action_item,
+    save_action_items_bulk,
+    get_calendar_events,
+    get_calendar_events_version,
+)
+
+SEPTEMBER = (datetime(2025, 9, 1), datetime(2025, 10, 1))
+
+@pytest.fixture
+def db():
+    try:
+        return get_db()
+    except (ValueError, ConnectionFailure) as e:
+        pytest.skip(f"MongoDB is not available: {e}")
+
+@pytest.fixture
+def user_id(db):
+    user_id = f"test_calendar_events_{uuid.uuid4().hex}"
+    yield user_id
+    for collection in ("meetings", "action_items", "minutes", "calendar_events"):
+        db[collection].delete_many({"user_id": user_id})
+    db.counters.delete_one({"_id": f"events:{user_id}"})
+
+def titles(user_id, start=None, end=None):
+    return [event["title"] for event in get_calendar_events(user_id, start, end)]
+
+def test_existing_history_is_backfilled_on_first_read(db, user_id):
+    db.meetings.insert_one({"user_id": user_id, "meeting_name": "Legacy", "meeting_date": "2025-09-03"})
+    db.action_items.insert_one({"user_id": user_id, "task": "Legacy task", "deadline": "2025-08-20"})
+
+    assert get_calendar_events_version(user_id) == 1
+    assert titles(user_id) == ["Legacy task", "Legacy"]
+    assert titles(user_id, *SEPTEMBER) == ["Legacy"]
+
+def test_writes_keep_the_projection_and_version_in_step(db, user_id):
+    meeting = save_meeting({"meeting_name": "Kickoff", "meeting_date": "2025-09-10"}, user_id)
+    minutes_id = str(db.minutes.insert_one({"user_id": user_id}).inserted_id)
+    items = save_action_items_bulk([{"task": "Draft plan", "deadline": "2025-09-12"}], user_id, minutes_id)
+    version = get_calendar_events_version(user_id)
+    assert titles(user_id, *SEPTEMBER) == ["Kickoff", "Draft plan"]
+
+    update_meeting(meeting["_id"], {"meeting_date": "2025-10-02"}, user_id)
+    update_action_item(items[0]["_id"], {"status": "completed"}, user_id)
+    assert titles(user_id, *SEPTEMBER) == ["Draft plan"]
+    assert get_calendar_events(user_id, *SEPTEMBER)[0]["resource"]["status"] == "completed"
+
+    delete_meeting(meeting["_id"], user_id)
+    assert titles(user_id) == ["Draft plan"]
+    assert get_calendar_events_version(user_id) == version + 3
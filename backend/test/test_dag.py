@@ -0,0 +1,71 @@
+import sys
+import os
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from lib.dag import Stage, run_dag
+
+def sleeper(seconds, value):
+    def run(results):
+        time.sleep(seconds)
+        return value
+    return run
+
+def overlap(first, second):
+    """Whether two recorded stage timings ran at the same time (timings are rounded to 1ms)."""
+    first_end = first["started_after"] + first["seconds"] - 0.01
+    second_end = second["started_after"] + second["seconds"] - 0.01
+    return first["started_after"] < second_end and second["started_after"] < first_end
+
+def test_independent_stages_run_concurrently():
+    timings = {}
+    stages = [
+        Stage("minutes", sleeper(0.1, {"_id": "m1"})),
+        Stage("extract", lambda r: [r["minutes"]["_id"], "item"], deps=("minutes",)),
+        Stage("schedule", sleeper(0.3, "scheduled"), deps=("extract",)),
+        Stage("save", sleeper(0.3, "saved"), deps=("extract",)),
+        Stage("next_agenda", sleeper(0.3, "agenda"), deps=("minutes",)),
+    ]
+    results = run_dag(stages, on_stage=timings.__setitem__)
+
+    assert results["extract"] == ["m1", "item"]
+    assert results["save"] == "saved" and results["next_agenda"] == "agenda"
+    assert set(timings) == {stage.name for stage in stages}
+    assert all(timing["status"] == "succeeded" for timing in timings.values())
+    assert timings["schedule"]["started_after"] >= timings["minutes"]["seconds"]
+    # Independent stages started before the others finished, instead of one after another
+    assert overlap(timings["schedule"], timings["save"])
+    assert overlap(timings["next_agenda"], timings["schedule"])
+
+def test_runs_stages_on_a_given_executor():
+    timings = {}
+    stages = [Stage("a", sleeper(0.1, 1)), Stage("b", sleeper(0.1, 2)), Stage("c", lambda r: r["a"] + r["b"], deps=("a", "b"))]
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="shared") as shared:
+        results = run_dag(stages, on_stage=timings.__setitem__, executor=shared)
+        # The shared pool is left running for its owner
+        assert shared.submit(lambda: 1).result() == 1
+
+    assert results["c"] == 3
+    # One shared worker: "a" and "b" had to take turns
+    assert not overlap(timings["a"], timings["b"])
+
+def test_failure_stops_dependents_and_raises():
+    timings = {}
+    ran = []
+    stages = [
+        Stage("minutes", lambda r: 1 / 0),
+        Stage("extract", lambda r: ran.append("extract"), deps=("minutes",)),
+        Stage("independent", lambda r: ran.append("independent")),
+    ]
+    with pytest.raises(ZeroDivisionError):
+        run_dag(stages, on_stage=timings.__setitem__)
+    assert "extract" not in ran
+    assert timings["minutes"]["status"] == "failed"
+
+def test_rejects_unknown_dependencies_and_cycles():
+    with pytest.raises(ValueError):
+        run_dag([Stage("a", lambda r: 1, deps=("missing",))])
+    with pytest.raises(ValueError):
+        run_dag([Stage("a", lambda r: 1, deps=("b",)), Stage("b", lambda r: 2, deps=("a",))])
@@ -0,0 +1,19 @@
+import sys
+import os
+from datetime import datetime
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from lib.deadlines import normalize_deadline, parse_datetime, get_deadline_cache_stats
+
+def test_relative_deadlines_resolve_against_meeting_date():
+    # 2025-09-10 is a Wednesday
+    assert normalize_deadline("Friday", "2025-09-10") == "2025-09-12"
+    assert normalize_deadline("September 30 at 3pm", "2025-09-10") == "2025-09-30T15:00:00"
+
+def test_iso_fast_path_and_unparseable_values():
+    misses = get_deadline_cache_stats()["misses"]
+    assert normalize_deadline("2025-09-12") == "2025-09-12"
+    assert parse_datetime("2025-09-12T15:00:00") == datetime(2025, 9, 12, 15)
+    assert get_deadline_cache_stats()["misses"] == misses  # dateparser never ran
+    assert normalize_deadline("TBD") is None
+    assert parse_datetime(None) is None
@@ -0,0 +1,67 @@
+import sys
+import os
+import uuid
+from datetime import datetime
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import ConnectionFailure
+from lib.database import get_db
+from lib.indexes import ensure_indexes
+
+USER_ID = f"test_indexes_{uuid.uuid4().hex}"
+NOW = datetime.utcnow()
+
+# (collection, explain command body) for the queries on hot request paths
+HOT_QUERIES = [
+    ("minutes", {"find": "minutes", "filter": {"user_id": USER_ID}, "sort": {"created_at": -1}, "limit": 1}),
+    # Keyset pagination (lib/database.find_page)
+    ("transcripts", {"find": "transcripts", "filter": {"user_id": USER_ID, "$or": [{"created_at": {"$lt": NOW}}, {"created_at": NOW, "_id": {"$lt": ObjectId()}}]}, "sort": {"created_at": -1, "_id": -1}, "limit": 51}),
+    ("transcripts", {"find": "transcripts", "filter": {"user_id": USER_ID}, "sort": {"created_at": -1}}),
+    ("transcripts", {"find": "transcripts", "filter": {"user_id": USER_ID, "source_key": "x", "created_at": {"$gte": NOW}}, "sort": {"created_at": -1}}),
+    ("transcripts", {"find": "transcripts", "filter": {"user_id": USER_ID, "audio_prefix_hash": "x", "created_at": {"$gte": NOW}}, "sort": {"created_at": -1}}),
+    ("transcripts", {"count": "transcripts", "query": {"user_id": USER_ID, "created_at": {"$gte": NOW}, "automated": True}}),
+    ("agendas", {"find": "agendas", "filter": {"user_id": USER_ID}, "sort": {"created_at": -1}}),
+    ("agendas", {"find": "agendas", "filter": {"meeting_id": "meetingId_x_01", "user_id": USER_ID}}),
+    ("meetings", {"find": "meetings", "filter": {"user_id": USER_ID}}),
+    ("meetings", {"count": "meetings", "query": {"user_id": USER_ID, "created_at": {"$gte": NOW}}}),
+    ("action_items", {"find": "action_items", "filter": {"user_id": USER_ID}}),
+    ("notifications", {"find": "notifications", "filter": {"user_id": USER_ID}, "sort": {"created_at": -1}, "limit": 20}),
+    # Shared poll in lib/notification_stream
+    ("notifications", {"find": "notifications", "filter": {"user_id": {"$in": [USER_ID, "other"]}, "created_at": {"$gte": NOW}}, "sort": {"created_at": 1}}),
+    ("notifications", {"update": "notifications", "updates": [{"q": {"user_id": USER_ID, "read": False}, "u": {"$set": {"read": True}}, "multi": True}]}),
+    ("jobs", {"find": "jobs", "filter": {"$or": [{"status": "queued", "run_after": {"$lte": NOW}}, {"status": "running", "lease_expires_at": {"$lt": NOW}}]}, "sort": {"run_after": 1}}),
+    ("calendar_events", {"find": "calendar_events", "filter": {"user_id": USER_ID, "start": {"$gte": NOW, "$lt": NOW}}, "sort": {"start": 1}}),
+    ("google_credentials", {"find": "google_credentials", "filter": {"user_id": USER_ID}}),
+]
+
+def plan_stages(plan: dict) -> set:
+    """Collects every stage name in an explain plan tree."""
+    stages = {plan["stage"]} if "stage" in plan else set()
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            stages |= plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        stages |= plan_stages(child)
+    return stages
+
+@pytest.fixture(scope="module")
+def db():
+    try:
+        db = get_db()
+    except (ValueError, ConnectionFailure) as e:
+        pytest.skip(f"MongoDB is not available: {e}")
+    assert ensure_indexes(force=True)
+    # Make sure every collection exists, otherwise explain just reports EOF
+    for collection in {collection for collection, _ in HOT_QUERIES}:
+        db[collection].insert_one({"user_id": USER_ID, "created_at": NOW, "meeting_id": f"meetingId_{uuid.uuid4().hex}"})
+    yield db
+    for collection in {collection for collection, _ in HOT_QUERIES}:
+        db[collection].delete_many({"user_id": USER_ID})
+
+@pytest.mark.parametrize("collection,command", HOT_QUERIES)
+def test_hot_query_uses_an_index(db, collection, command):
+    explain = db.command("explain", command, verbosity="queryPlanner")
+    stages = plan_stages(explain["queryPlanner"]["winningPlan"])
+    assert "COLLSCAN" not in stages, f"{collection} query does a collection scan: {command}"
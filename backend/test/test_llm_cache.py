@@ -0,0 +1,43 @@
+import sys
+import os
+import json
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from lib import llm_cache
+
+class DictCache:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value):
+        self.values[key] = value
+
+def is_json(raw):
+    try:
+        json.loads(raw)
+        return True
+    except ValueError:
+        return False
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = DictCache()
+    monkeypatch.setattr(llm_cache, "_cache", cache)
+    monkeypatch.setattr(llm_cache, "LLM_CACHE_ENABLED", True)
+    return cache
+
+def test_malformed_response_is_returned_but_not_cached(cache):
+    assert llm_cache.cached_llm_call("k", lambda: "not json", validate=is_json) == "not json"
+    assert cache.values == {}
+
+    assert llm_cache.cached_llm_call("k", lambda: '["ok"]', validate=is_json) == '["ok"]'
+    assert llm_cache.cached_llm_call("k", lambda: pytest.fail("cache was not used"), validate=is_json) == '["ok"]'
+
+def test_cached_entry_failing_validation_is_regenerated(cache):
+    cache.values["k"] = "not json"
+    assert llm_cache.cached_llm_call("k", lambda: "[1]", validate=is_json) == "[1]"
+    assert cache.values["k"] == "[1]"
@@ -0,0 +1,49 @@
+import sys
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from pymongo.errors import ConnectionFailure
+from lib.database import get_db
+from agents.agenda_planner import agenda_planner
+from agents.agenda_planner.utils import get_next_meeting_id
+
+PARALLEL_CALLS = 200
+
+@pytest.fixture
+def db():
+    try:
+        return get_db()
+    except (ValueError, ConnectionFailure) as e:
+        pytest.skip(f"MongoDB is not available: {e}")
+
+@pytest.fixture
+def user_id(db):
+    user_id = f"test_meeting_ids_{uuid.uuid4().hex}"
+    yield user_id
+    db.agendas.delete_many({"user_id": user_id})
+    db.counters.delete_one({"_id": f"meeting_id:{user_id}"})
+
+def test_parallel_generate_agenda_gets_unique_ids(user_id, monkeypatch):
+    # This test is about ID allocation, so keep the models out of the way
+    monkeypatch.setattr(agenda_planner, "analyze_topics", lambda topics: [(topic, "info") for topic in topics])
+    monkeypatch.setattr(agenda_planner, "generate_meeting_name", lambda topics: "Test Meeting")
+    user_input = {"topics": ["Q4 Advertising Budget"], "discussion_points": [], "date": "2025-09-10"}
+
+    with ThreadPoolExecutor(max_workers=50) as executor:
+        agendas = list(executor.map(lambda _: agenda_planner.generate_agenda(dict(user_input), user_id=user_id), range(PARALLEL_CALLS)))
+
+    meeting_ids = [agenda["meeting_id"] for agenda in agendas]
+    assert len(set(meeting_ids)) == PARALLEL_CALLS
+    assert sorted(meeting_ids) == sorted(f"meetingId_{user_id}_{n:02d}" for n in range(1, PARALLEL_CALLS + 1))
+
+def test_ids_continue_after_existing_agendas_and_deletes(db, user_id):
+    # Agendas created before the counter existed
+    db.agendas.insert_many([{"user_id": user_id, "meeting_id": f"meetingId_{user_id}_{n:02d}"} for n in (1, 2, 5)])
+    assert get_next_meeting_id(user_id) == f"meetingId_{user_id}_06"
+
+    # Deleting the newest agenda must not hand its number out again
+    db.agendas.delete_many({"user_id": user_id})
+    assert get_next_meeting_id(user_id) == f"meetingId_{user_id}_07"
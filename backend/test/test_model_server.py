@@ -0,0 +1,45 @@
+import sys
+import os
+import time
+import socket
+import threading
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from multiprocessing.connection import Client, AuthenticationError
+from agents.agenda_planner import models, model_server
+
+@pytest.fixture
+def address(tmp_path, monkeypatch):
+    monkeypatch.setattr(models, "MODEL_SERVER_AUTHKEY", "secret")
+    monkeypatch.setitem(models.LOADERS, "double", lambda: (lambda x: x * 2))
+    address = str(tmp_path / "models.sock")
+    server = model_server.ModelServer(address, preload=False)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    for _ in range(50):
+        if os.path.exists(address):
+            break
+        time.sleep(0.05)
+    return address
+
+def call(address, authkey=b"secret"):
+    with Client(address, authkey=authkey) as conn:
+        conn.send(("double", (21,), {}))
+        return conn.recv()
+
+def test_stalled_client_does_not_block_others(address):
+    stalled = socket.socket(socket.AF_UNIX)
+    stalled.connect(address)  # never answers the authkey challenge
+    try:
+        result = []
+        caller = threading.Thread(target=lambda: result.append(call(address)), daemon=True)
+        caller.start()
+        caller.join(timeout=5)
+        assert result == [(True, 42)]
+    finally:
+        stalled.close()
+
+def test_wrong_authkey_is_rejected(address):
+    with pytest.raises(AuthenticationError):
+        call(address, authkey=b"wrong")
+    assert call(address) == (True, 42)
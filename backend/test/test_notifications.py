@@ -0,0 +1,49 @@
+import sys
+import os
+import uuid
+import asyncio
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from pymongo.errors import ConnectionFailure
+from lib.database import get_db
+from lib.notifications import AutomationNotifier, create_notification
+from lib.notification_stream import NotificationHub
+
+@pytest.fixture
+def db():
+    try:
+        return get_db()
+    except (ValueError, ConnectionFailure) as e:
+        pytest.skip(f"MongoDB is not available: {e}")
+
+@pytest.fixture
+def user_id(db):
+    user_id = f"test_notifications_{uuid.uuid4().hex}"
+    yield user_id
+    db.notifications.delete_many({"user_id": user_id})
+
+def test_progress_notifications_are_batched(db, user_id):
+    notifier = AutomationNotifier(user_id, "meeting_1", flush_seconds=60)
+    notifier.start()
+    notifier.step_transcribe()
+    assert db.notifications.count_documents({"user_id": user_id}) == 0
+
+    # A terminal notification flushes everything buffered so far, in order
+    notifier.success()
+    messages = [n["message"] for n in db.notifications.find({"user_id": user_id}, sort=[("created_at", 1)])]
+    assert messages[0].startswith("🚀") and messages[1].startswith("Step 1") and messages[2].startswith("✅")
+
+def test_hub_pushes_new_notifications(db, user_id):
+    async def receive():
+        hub = NotificationHub(backend="poll", poll_seconds=0.2)
+        queue = hub.subscribe(user_id)
+        await asyncio.sleep(0.1)
+        create_notification(user_id, "hello", related_id="meeting_1")
+        notification = await asyncio.wait_for(queue.get(), timeout=5)
+        hub.unsubscribe(user_id, queue)
+        return notification
+
+    notification = asyncio.run(receive())
+    assert notification["message"] == "hello"
+    assert notification["related_id"] == "meeting_1"
@@ -0,0 +1,26 @@
+import sys
+import os
+from datetime import datetime
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from bson import ObjectId
+from lib.database import encode_cursor, decode_cursor, find_page
+
+def test_cursor_round_trip():
+    doc = {"_id": ObjectId(), "created_at": datetime(2026, 3, 1, 12, 30)}
+    clause = decode_cursor(encode_cursor(doc))
+    assert clause["$or"][1] == {"created_at": doc["created_at"], "_id": {"$lt": doc["_id"]}}
+
+@pytest.mark.parametrize("cursor", [
+    "2026-03-01T12:30:00,not-an-object-id",  # bson InvalidId, not a ValueError subclass
+    "2026-03-01T12:30:00,",
+    "yesterday,64b7f0c2a1b2c3d4e5f60718",
+    "64b7f0c2a1b2c3d4e5f60718",
+])
+def test_malformed_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+    # Rejected before touching the database
+    with pytest.raises(ValueError):
+        find_page("minutes", "user", after=cursor)
@@ -0,0 +1,88 @@
+import sys
+import os
+import uuid
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from pymongo.errors import ConnectionFailure
+from lib.database import get_db
+from lib.dag import Stage, run_dag
+from lib.pipeline_runs import pipeline_key, input_fingerprint, start_pipeline_run, finish_pipeline_run, get_pipeline_run, checkpointed_stages
+
+@pytest.fixture
+def db():
+    try:
+        return get_db()
+    except (ValueError, ConnectionFailure) as e:
+        pytest.skip(f"MongoDB is not available: {e}")
+
+@pytest.fixture
+def run_key(db):
+    key = pipeline_key(f"test_pipeline_runs_{uuid.uuid4().hex}", "meeting")
+    yield key
+    db.pipeline_runs.delete_one({"_id": key})
+
+def pipeline(run, calls, fail_at=None, stale=(), outputs=None):
+    """transcribe -> minutes -> save_action_items; checkpoints of `stale` stages fail to restore."""
+    outputs = outputs or {"transcribe": "t1", "minutes": "m1", "save_action_items": ["a1", "a2"]}
+
+    def func(name):
+        def run_stage(results):
+            calls.append(name)
+            if name == fail_at:
+                raise RuntimeError(f"{name} failed")
+            return outputs[name]
+        return run_stage
+
+    def restore(name):
+        def restore_stage(checkpoint, results):
+            if name in stale:
+                raise LookupError(f"{name} output is gone")
+            return checkpoint["value"]
+        return restore_stage
+
+    stages = [
+        Stage("transcribe", func("transcribe")),
+        Stage("minutes", func("minutes"), deps=("transcribe",)),
+        Stage("save_action_items", func("save_action_items"), deps=("minutes",)),
+    ]
+    return checkpointed_stages(run, stages, {stage.name: (lambda out: {"value": out}, restore(stage.name)) for stage in stages})
+
+def test_resubmission_resumes_after_last_finished_stage(run_key):
+    fingerprint = input_fingerprint("https://example.com/video", None)
+    calls = []
+    run = start_pipeline_run(run_key, "user", "meeting", fingerprint)
+    with pytest.raises(RuntimeError):
+        run_dag(pipeline(run, calls, fail_at="save_action_items"))
+    finish_pipeline_run(run_key, error="save_action_items failed")
+    assert calls == ["transcribe", "minutes", "save_action_items"]
+
+    calls = []
+    run = start_pipeline_run(run_key, "user", "meeting", fingerprint)
+    results = run_dag(pipeline(run, calls))
+    assert calls == ["save_action_items"]
+    assert results == {"transcribe": "t1", "minutes": "m1", "save_action_items": ["a1", "a2"]}
+    assert run["attempts"] == 2
+
+def test_changed_input_starts_over(run_key):
+    run = start_pipeline_run(run_key, "user", "meeting", input_fingerprint(None, "first transcript"))
+    run_dag(pipeline(run, []))
+
+    calls = []
+    run = start_pipeline_run(run_key, "user", "meeting", input_fingerprint(None, "edited transcript"))
+    run_dag(pipeline(run, calls))
+    assert calls == ["transcribe", "minutes", "save_action_items"]
+
+def test_stale_upstream_stage_reruns_its_dependents(run_key):
+    fingerprint = input_fingerprint(None, "transcript")
+    run = start_pipeline_run(run_key, "user", "meeting", fingerprint)
+    run_dag(pipeline(run, []))
+
+    # The minutes were deleted: they are regenerated, and the items saved for the old minutes are not reused
+    calls = []
+    run = start_pipeline_run(run_key, "user", "meeting", fingerprint)
+    outputs = {"transcribe": "t1", "minutes": "m2", "save_action_items": ["b1"]}
+    results = run_dag(pipeline(run, calls, stale=("minutes",), outputs=outputs))
+    assert calls == ["minutes", "save_action_items"]
+    assert results == outputs
+    assert get_pipeline_run(run_key)["checkpoints"] == {stage: {"value": value} for stage, value in outputs.items()}
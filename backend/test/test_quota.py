@@ -0,0 +1,85 @@
+import sys
+import os
+import uuid
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from pymongo.errors import ConnectionFailure
+from lib.database import get_db, get_usage
+from lib.quota import (
+    reserve_free_tier_usage,
+    release_usage,
+    check_free_tier_limits,
+    reserve_automation_cycle,
+    release_automation_cycle,
+    reconcile_usage,
+    FREE_TIER_LIMITS,
+)
+
+@pytest.fixture
+def user_id():
+    try:
+        db = get_db()
+    except (ValueError, ConnectionFailure) as e:
+        pytest.skip(f"MongoDB is not available: {e}")
+    user_id = f"test_quota_{uuid.uuid4().hex}"
+    yield user_id
+    db.usage.delete_many({"user_id": user_id})
+    db.meetings.delete_many({"user_id": user_id})
+
+def add_meetings(user_id, count, created_at=None):
+    docs = [{"user_id": user_id, "title": f"Meeting {i}", "created_at": created_at or datetime.utcnow()} for i in range(count)]
+    return [str(_id) for _id in get_db().meetings.insert_many(docs).inserted_ids]
+
+def test_burst_of_reservations_stops_at_the_limit(user_id):
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        reserved = list(pool.map(lambda _: reserve_free_tier_usage(user_id, "meeting"), range(20)))
+
+    assert reserved.count(True) == FREE_TIER_LIMITS["meeting"]
+    assert get_usage(user_id)["meetings"] == FREE_TIER_LIMITS["meeting"]
+    assert check_free_tier_limits(user_id, "meeting")[0]
+
+def test_released_reservation_can_be_used_again(user_id):
+    for _ in range(FREE_TIER_LIMITS["transcription"]):
+        assert reserve_free_tier_usage(user_id, "transcription")
+    assert not reserve_free_tier_usage(user_id, "transcription")
+
+    release_usage(user_id, "transcription")
+    assert reserve_free_tier_usage(user_id, "transcription")
+
+def test_parallel_automation_submissions_stop_at_the_limit(user_id):
+    limit = FREE_TIER_LIMITS["automation"]
+    meeting_ids = add_meetings(user_id, limit + 3)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        # Every meeting submitted twice at once
+        results = list(pool.map(lambda meeting_id: reserve_automation_cycle(meeting_id, user_id, limit), meeting_ids * 2))
+
+    assert sum(counted for _, counted in results) == limit
+    assert get_usage(user_id)["automation_cycles"] == limit
+
+def test_resubmitted_meeting_is_counted_once_and_released_on_failure(user_id):
+    limit = FREE_TIER_LIMITS["automation"]
+    meeting_ids = add_meetings(user_id, limit)
+    for meeting_id in meeting_ids:
+        assert reserve_automation_cycle(meeting_id, user_id, limit) == (True, True)
+    # At the limit, but this meeting is already counted
+    assert reserve_automation_cycle(meeting_ids[0], user_id, limit) == (True, False)
+
+    assert release_automation_cycle(meeting_ids[0], user_id)
+    assert not release_automation_cycle(meeting_ids[0], user_id)
+    assert get_usage(user_id)["automation_cycles"] == limit - 1
+    with pytest.raises(LookupError):
+        reserve_automation_cycle("not-an-id", user_id, limit)
+
+def test_reconcile_counts_automation_in_the_month_it_was_used(user_id):
+    # Created last month, automated this month
+    meeting_id, = add_meetings(user_id, 1, created_at=datetime(2000, 1, 31))
+    reserve_automation_cycle(meeting_id, user_id)
+    counted = get_usage(user_id)["automation_cycles"]
+
+    reconcile_usage(user_id=user_id)
+    assert counted == get_usage(user_id)["automation_cycles"] == 1
+    reconcile_usage("2000-01", user_id=user_id)
+    assert get_usage(user_id, "2000-01") == {"meetings": 1, "automation_cycles": 0, "transcriptions": 0}
@@ -0,0 +1,67 @@
+import sys
+import os
+import threading
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import uuid
+import pytest
+from pymongo.errors import ServerSelectionTimeoutError, ConnectionFailure
+from lib.database import get_db
+from lib.rate_limiter import RateLimiter, MongoRateLimitStore, PRIORITY_INTERACTIVE, PRIORITY_AUTOMATION
+
+class FlakyStore:
+    """A shared store whose first call fails like an unreachable MongoDB."""
+    def __init__(self):
+        self.calls = 0
+
+    def try_take(self, tokens, priority=None):
+        self.calls += 1
+        if self.calls == 1:
+            raise ServerSelectionTimeoutError("no servers available")
+        return 0.0
+
+def test_store_error_does_not_wedge_the_queue():
+    limiter = RateLimiter("test", rpm=600, tpm=100_000, store=FlakyStore())
+    with pytest.raises(ServerSelectionTimeoutError):
+        limiter.acquire(10)
+
+    # The failed caller's ticket is gone, so later callers are admitted
+    acquired = []
+    threads = [threading.Thread(target=lambda: acquired.append(limiter.acquire(10, timeout=2))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(acquired) == 3
+    assert limiter.get_stats()["queue_depth"] == 0
+
+def test_timeout_leaves_the_queue():
+    limiter = RateLimiter("test", rpm=1, tpm=100_000)
+    limiter.acquire(10)
+    with pytest.raises(TimeoutError):
+        limiter.acquire(10, timeout=0.1)
+    assert limiter.get_stats()["queue_depth"] == 0
+
+@pytest.fixture
+def store():
+    try:
+        db = get_db()
+    except (ValueError, ConnectionFailure) as e:
+        pytest.skip(f"MongoDB is not available: {e}")
+    name = f"test_rate_limiter_{uuid.uuid4().hex}"
+    yield MongoRateLimitStore(name, rpm=8, tpm=100_000, interactive_reserve=0.25)
+    db.rate_limits.delete_many({"_id": {"$regex": f"^{name}:"}})
+
+def test_automation_leaves_a_share_of_the_shared_window_to_interactive_calls(store):
+    # Another process (a worker) fills the window with automation calls
+    admitted = 0
+    while store.try_take(10, PRIORITY_AUTOMATION) == 0:
+        admitted += 1
+        if admitted > 8:
+            pytest.skip("Crossed into a new rate limit window")
+    assert admitted == 6
+
+    # The API process still gets the reserved share
+    assert store.try_take(10, PRIORITY_INTERACTIVE) == 0
+    assert store.try_take(10, PRIORITY_INTERACTIVE) == 0
+    assert store.try_take(10, PRIORITY_INTERACTIVE) > 0
@@ -0,0 +1,49 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from agents.transcription_agent.stitching import stitch_transcripts, parse_words, MIN_OVERLAP_MATCH_WORDS
+
+def test_overlap_words_are_kept_once():
+    chunks = [
+        "Speaker 1: we agreed to ship the release on friday after the review",
+        "Speaker 1: ship the release on friday after the review and then update the docs",
+    ]
+    assert stitch_transcripts(chunks) == "Speaker 1: we agreed to ship the release on friday after the review and then update the docs"
+
+def test_overlap_tolerates_punctuation_and_case():
+    # The earlier window's spelling of the aligned words is kept
+    chunks = ["Speaker 1: Let's review the budget for next quarter.", "Speaker 1: the budget for next Quarter, then hiring."]
+    assert stitch_transcripts(chunks) == "Speaker 1: Let's review the budget for next quarter. then hiring."
+
+def test_speaker_labels_are_remapped_from_the_overlap():
+    # The second window numbered its speakers the other way round
+    chunks = [
+        "Speaker 1: how is the migration going\nSpeaker 2: almost done with the last table",
+        "Speaker 1: almost done with the last table\nSpeaker 2: great let us move on",
+    ]
+    assert stitch_transcripts(chunks) == (
+        "Speaker 1: how is the migration going\n"
+        "Speaker 2: almost done with the last table\n"
+        "Speaker 3: great let us move on"
+    )
+
+def test_named_speakers_keep_their_names():
+    chunks = [
+        "Alice: the launch moves to monday morning\nBob: fine by me if qa signs off",
+        "Bob: fine by me if qa signs off\nCarol: I will tell marketing",
+    ]
+    assert stitch_transcripts(chunks) == "Alice: the launch moves to monday morning\nBob: fine by me if qa signs off\nCarol: I will tell marketing"
+
+def test_chunks_without_enough_overlap_are_appended():
+    short_overlap = " ".join(["word"] * (MIN_OVERLAP_MATCH_WORDS - 1))
+    chunks = [f"Alice: first part {short_overlap}", f"Alice: {short_overlap} second part"]
+    assert [word for _, word in parse_words(stitch_transcripts(chunks))] == (
+        ["first", "part"] + short_overlap.split() * 2 + ["second", "part"]
+    )
+
+def test_empty_chunks_are_skipped():
+    assert stitch_transcripts(["", "Alice: hello everyone", None, "   "]) == "Alice: hello everyone"
+
+def test_unlabeled_text():
+    assert stitch_transcripts(["one two three four five six", "three four five six seven"]) == "one two three four five six seven"
@@ -0,0 +1,60 @@
+import sys
+import os
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from lib.token_verifier import JWKSCache, TokenVerifier, TokenVerificationError, make_stub_jwks
+
+class CountingFetcher:
+    """Serves a stub JWKS and counts how often it is fetched."""
+    def __init__(self, jwks):
+        self.jwks = jwks
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.jwks
+
+def claims(sub="user_1", expires_in=600):
+    return {"sub": sub, "exp": int(time.time()) + expires_in}
+
+def test_verifies_and_memoizes_token():
+    jwks, sign = make_stub_jwks()
+    fetch = CountingFetcher(jwks)
+    verifier = TokenVerifier(JWKSCache(fetch))
+    token = sign(claims())
+
+    assert verifier.get_cached(token) is None
+    assert verifier.verify(token)["sub"] == "user_1"
+    assert verifier.get_cached(token)["sub"] == "user_1"
+    assert verifier.verify(sign(claims("user_2")))["sub"] == "user_2"
+    assert fetch.calls == 1
+
+def test_rejects_expired_and_forged_tokens():
+    jwks, sign = make_stub_jwks()
+    _, forge = make_stub_jwks()  # same kid, different private key
+    verifier = TokenVerifier(JWKSCache(CountingFetcher(jwks)))
+
+    with pytest.raises(TokenVerificationError):
+        verifier.verify(sign(claims(expires_in=-60)))
+    with pytest.raises(TokenVerificationError):
+        verifier.verify(forge(claims()))
+
+def test_refreshes_keys_when_kid_rotates():
+    old_jwks, old_sign = make_stub_jwks(kid="old")
+    new_jwks, new_sign = make_stub_jwks(kid="new")
+    fetch = CountingFetcher(old_jwks)
+    verifier = TokenVerifier(JWKSCache(fetch, min_refresh=0))
+    verifier.verify(old_sign(claims()))
+
+    fetch.jwks = {"keys": old_jwks["keys"] + new_jwks["keys"]}
+    assert verifier.verify(new_sign(claims("user_2")))["sub"] == "user_2"
+    assert fetch.calls == 2
+
+def test_rejects_unauthorized_party():
+    jwks, sign = make_stub_jwks()
+    verifier = TokenVerifier(JWKSCache(CountingFetcher(jwks)), authorized_parties=["https://app.example.com"])
+    with pytest.raises(TokenVerificationError):
+        verifier.verify(sign({**claims(), "azp": "https://evil.example.com"}))
+    assert verifier.verify(sign({**claims(), "azp": "https://app.example.com"}))["sub"] == "user_1"
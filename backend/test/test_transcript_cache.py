@@ -0,0 +1,34 @@
+import sys
+import os
+import uuid
+from datetime import datetime
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from pymongo.errors import ConnectionFailure
+from lib.database import get_db
+from lib.transcript_cache import find_cached_transcript
+
+@pytest.fixture
+def users():
+    try:
+        db = get_db()
+    except (ValueError, ConnectionFailure) as e:
+        pytest.skip(f"MongoDB is not available: {e}")
+    owner, other = f"test_cache_{uuid.uuid4().hex}", f"test_cache_{uuid.uuid4().hex}"
+    db.transcripts.insert_one({
+        "user_id": owner, "transcript": "Speaker 1: hello", "created_at": datetime.utcnow(),
+        "source_key": "source-1", "audio_prefix_hash": "prefix-1", "audio_hash": "audio-1",
+    })
+    yield owner, other
+    db.transcripts.delete_many({"user_id": {"$in": [owner, other]}})
+
+def test_cache_is_scoped_to_the_user(users):
+    owner, other = users
+    assert find_cached_transcript(owner, source_key="source-1", count_miss=False)["transcript"] == "Speaker 1: hello"
+    assert find_cached_transcript(other, source_key="source-1", count_miss=False) is None
+
+def test_prefix_match_carries_the_full_audio_hash(users):
+    owner, _ = users
+    candidate = find_cached_transcript(owner, audio_prefix_hash="prefix-1", count_miss=False)
+    assert candidate["audio_hash"] == "audio-1"
@@ -0,0 +1,48 @@
+import sys
+import os
+import uuid
+from datetime import datetime, timedelta
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from pymongo.errors import ConnectionFailure
+from lib import cache_stats, two_tier_cache
+from lib.database import get_db
+from lib.cache_stats import CacheStats
+from lib.two_tier_cache import TwoTierCache
+
+def test_recording_does_not_touch_the_database(monkeypatch):
+    writes = []
+    monkeypatch.setattr(cache_stats, "get_db", lambda: writes.append(1))
+    stats = CacheStats("test", flush_seconds=60)
+    for _ in range(1000):
+        stats.record("hits")
+    assert writes == []
+    assert stats._counts["hits"] == 1000
+
+@pytest.fixture
+def cache():
+    try:
+        db = get_db()
+    except (ValueError, ConnectionFailure) as e:
+        pytest.skip(f"MongoDB is not available: {e}")
+    collection = f"test_two_tier_cache_{uuid.uuid4().hex}"
+    yield TwoTierCache("test", collection, ttl_hours=1, memory_entries=10), db[collection]
+    db.drop_collection(collection)
+
+def test_store_errors_are_cache_misses(monkeypatch):
+    def unreachable():
+        raise ConnectionFailure("no servers available")
+    monkeypatch.setattr(two_tier_cache, "get_db", unreachable)
+    cache = TwoTierCache("test", "test_two_tier_cache", ttl_hours=1, memory_entries=10)
+    assert cache.get("key") is None
+    cache.set("key", "value")
+    assert cache.get("key") == "value"  # still served from memory
+
+def test_malformed_entries(cache):
+    cache, collection = cache
+    collection.insert_one({"_id": "empty", "expires_at": datetime.utcnow() + timedelta(hours=1)})
+    assert cache.get("empty") is None
+
+    cache.set("new", "new text")
+    assert collection.find_one({"_id": "new"})["value"] == "new text"
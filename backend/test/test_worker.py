@@ -0,0 +1,82 @@
+import sys
+import os
+import uuid
+from datetime import datetime, timedelta
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import ConnectionFailure
+from lib.database import get_db
+from lib.jobs import enqueue_job, claim_next_job, complete_job, fail_job, heartbeat_job, LeaseLostError, STATUS_RUNNING
+import worker
+
+@pytest.fixture
+def db():
+    try:
+        return get_db()
+    except (ValueError, ConnectionFailure) as e:
+        pytest.skip(f"MongoDB is not available: {e}")
+
+@pytest.fixture
+def job_id(db):
+    # Runs before anything else due, so claim_next_job picks it up
+    job_id = enqueue_job("test_worker", f"test_worker_{uuid.uuid4().hex}", {})
+    db.jobs.update_one({"_id": ObjectId(job_id)}, {"$set": {"run_after": datetime(2000, 1, 1)}})
+    yield job_id
+    db.jobs.delete_one({"_id": ObjectId(job_id)})
+
+def take_over(db, job_id):
+    """Expires the current lease and lets a second worker claim the job."""
+    db.jobs.update_one({"_id": ObjectId(job_id)}, {"$set": {"lease_expires_at": datetime.utcnow() - timedelta(seconds=1)}})
+    job = claim_next_job("second")
+    assert job["_id"] == job_id
+    return job
+
+def test_stale_owner_cannot_write_after_takeover(db, job_id):
+    first = claim_next_job("first")
+    second = take_over(db, job_id)
+
+    assert not heartbeat_job(job_id, first["lease_owner"])
+    assert not complete_job(job_id, first["lease_owner"], {"minutes_id": "stale"})
+    assert fail_job(job_id, first["lease_owner"], "stale error") is None
+    # Same worker id claiming again is a different owner too
+    assert not complete_job(job_id, f"second:{uuid.uuid4().hex}")
+
+    job = db.jobs.find_one({"_id": ObjectId(job_id)})
+    assert job["status"] == STATUS_RUNNING and job["lease_owner"] == second["lease_owner"]
+    assert job["result"] is None and job["last_error"] is None
+    assert complete_job(job_id, second["lease_owner"], {"minutes_id": "m1"})
+
+def test_heartbeat_notices_lost_lease(db, job_id):
+    job = claim_next_job("first")
+    heartbeat = worker._Heartbeat(job_id, "first", job["lease_owner"], lease_seconds=0.15)
+    heartbeat.start()
+    heartbeat.ensure_owned()
+    take_over(db, job_id)
+    heartbeat.join(timeout=2)
+    with pytest.raises(LeaseLostError):
+        heartbeat.ensure_owned()
+
+def test_failure_after_takeover_is_not_recorded(db, job_id, monkeypatch):
+    def run_job(job, ensure_active=None):
+        take_over(db, job_id)
+        raise RuntimeError("minutes failed")
+
+    monkeypatch.setattr(worker, "run_job", run_job)
+    assert worker.process_one("first")
+
+    job = db.jobs.find_one({"_id": ObjectId(job_id)})
+    assert job["status"] == STATUS_RUNNING and job["worker_id"] == "second"
+    assert job["last_error"] is None and job["attempts"] == 2
+
+def test_lost_lease_aborts_without_marking_the_job(db, job_id, monkeypatch):
+    def run_job(job, ensure_active=None):
+        take_over(db, job_id)
+        raise LeaseLostError("Lost lease.")
+
+    monkeypatch.setattr(worker, "run_job", run_job)
+    assert worker.process_one("first")
+
+    job = db.jobs.find_one({"_id": ObjectId(job_id)})
+    assert job["status"] == STATUS_RUNNING and job["worker_id"] == "second"
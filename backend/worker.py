@@ -0,0 +1,165 @@
+import os
+import time
+import socket
+import argparse
+import threading
+import traceback
+import multiprocessing
+from lib.rate_limiter import set_default_priority, PRIORITY_AUTOMATION
+from lib.indexes import ensure_indexes
+from lib.quota import release_automation_cycle
+from lib.jobs import (
+    JOB_LEASE_SECONDS,
+    STATUS_FAILED,
+    LeaseLostError,
+    claim_next_job,
+    heartbeat_job,
+    record_job_stage,
+    complete_job,
+    fail_job,
+)
+
+# --- Automation Job Worker ---
+# Run alongside the API to process jobs enqueued by /process-automated:
+#   python worker.py --concurrency 4
+# Throughput scales with the number of worker processes (on one or many hosts),
+# independently of how many API replicas are running.
+WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", "2"))
+WORKER_POLL_INTERVAL = float(os.getenv("WORKER_POLL_INTERVAL", "2"))  # seconds
+
+class _Heartbeat(threading.Thread):
+    """Keeps a job's lease alive while the worker is busy running it."""
+    def __init__(self, job_id: str, worker_id: str, lease_owner: str, lease_seconds: int = JOB_LEASE_SECONDS):
+        super().__init__(daemon=True)
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.lease_owner = lease_owner
+        self.lease_seconds = lease_seconds
+        self.lost_lease = False
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.lease_seconds / 3):
+            try:
+                if not heartbeat_job(self.job_id, self.lease_owner, self.lease_seconds):
+                    print(f"⚠️ [{self.worker_id}] Lost lease on job {self.job_id}.")
+                    self.lost_lease = True
+                    return
+            except Exception as e:
+                print(f"⚠️ [{self.worker_id}] Heartbeat failed for job {self.job_id}: {e}")
+
+    def stop(self):
+        self._stop_event.set()
+
+    def ensure_owned(self):
+        """Raises LeaseLostError once another worker has taken the job over."""
+        if self.lost_lease:
+            raise LeaseLostError(f"Lost lease on job {self.job_id}.")
+
+def run_job(job: dict, ensure_active=None):
+    """Dispatches a claimed job to the function that handles its type."""
+    from automation import AUTOMATION_JOB_TYPE, execute_automation_flow
+    from lib.notifications import AutomationNotifier
+
+    if job["type"] != AUTOMATION_JOB_TYPE:
+        raise ValueError(f"Unknown job type: {job['type']}")
+
+    payload = job.get("payload") or {}
+    notifier = AutomationNotifier(job["user_id"], job.get("meeting_id"))
+    return execute_automation_flow(
+        user_id=job["user_id"],
+        meeting_id=job.get("meeting_id"),
+        video_url=payload.get("video_url"),
+        transcript_text=payload.get("transcript_text"),
+        notifier=notifier,
+        on_stage=lambda stage, timing: record_job_stage(job["_id"], job["lease_owner"], stage, timing),
+        ensure_active=ensure_active,
+    )
+
+def process_one(worker_id: str) -> bool:
+    """Claims and runs a single job. Returns False if the queue was empty."""
+    job = claim_next_job(worker_id)
+    if not job:
+        return False
+
+    job_id = job["_id"]
+    print(f"🛠️ [{worker_id}] Claimed job {job_id} (attempt {job['attempts']}/{job['max_attempts']})")
+    lease_owner = job["lease_owner"]
+    heartbeat = _Heartbeat(job_id, worker_id, lease_owner)
+    heartbeat.start()
+    try:
+        result = run_job(job, ensure_active=heartbeat.ensure_owned)
+        heartbeat.stop()
+        if complete_job(job_id, lease_owner, result):
+            print(f"✅ [{worker_id}] Job {job_id} succeeded.")
+        else:
+            print(f"⚠️ [{worker_id}] Job {job_id} finished after its lease was lost; not marking it.")
+    except LeaseLostError as e:
+        heartbeat.stop()
+        print(f"⚠️ [{worker_id}] Aborted job {job_id}: {e} Another worker owns it now.")
+    except Exception as e:
+        heartbeat.stop()
+        error_reason = str(e)
+        traceback.print_exc()
+        status = fail_job(job_id, lease_owner, error_reason)
+        if status is None:
+            print(f"⚠️ [{worker_id}] Job {job_id} failed after its lease was lost; not marking it: {error_reason}")
+            return True
+        print(f"❌ [{worker_id}] Job {job_id} failed: {error_reason}. New status: {status}")
+        if status == STATUS_FAILED:
+            from lib.notifications import AutomationNotifier
+            if (job.get("payload") or {}).get("automation_cycle_counted"):
+                try:
+                    release_automation_cycle(job["meeting_id"], job["user_id"])
+                except Exception as e:
+                    print(f"⚠️ [{worker_id}] Could not release the automation cycle of job {job_id}: {e}")
+            AutomationNotifier(job["user_id"], job.get("meeting_id")).error(error_reason)
+    return True
+
+def worker_loop(worker_id: str, poll_interval: float = WORKER_POLL_INTERVAL):
+    """Polls the queue forever, sleeping only when there is no work."""
+    # Interactive API calls get Gemini quota before background jobs
+    set_default_priority(PRIORITY_AUTOMATION)
+    print(f"👷 Worker {worker_id} started.")
+    while True:
+        try:
+            if not process_one(worker_id):
+                time.sleep(poll_interval)
+        except Exception as e:
+            # Never let a DB hiccup kill the worker process
+            print(f"⚠️ [{worker_id}] Worker loop error: {e}")
+            time.sleep(poll_interval)
+
+def main():
+    parser = argparse.ArgumentParser(description="Run MinuteMe automation job workers.")
+    parser.add_argument("--concurrency", type=int, default=WORKER_CONCURRENCY, help="Number of worker processes.")
+    args = parser.parse_args()
+
+    try:
+        ensure_indexes()
+    except Exception as e:
+        print(f"⚠️ Could not ensure MongoDB indexes: {e}")
+
+    host = socket.gethostname()
+    if args.concurrency <= 1:
+        worker_loop(f"{host}-{os.getpid()}-0")
+        return
+
+    # "spawn" gives every worker its own MongoClient (pymongo is not fork-safe)
+    ctx = multiprocessing.get_context("spawn")
+    processes = []
+    for i in range(args.concurrency):
+        p = ctx.Process(target=worker_loop, args=(f"{host}-{os.getpid()}-{i}",), daemon=True)
+        p.start()
+        processes.append(p)
+    print(f"👷 Started {len(processes)} worker processes.")
+    try:
+        for p in processes:
+            p.join()
+    except KeyboardInterrupt:
+        print("Stopping workers...")
+        for p in processes:
+            p.terminate()
+
+if __name__ == "__main__":
+    main()
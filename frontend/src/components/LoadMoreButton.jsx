@@ -0,0 +1,13 @@
+function LoadMoreButton({ nextCursor, loading, onClick }) {
+    if (!nextCursor) return null;
+
+    return (
+        <div className="load-more">
+            <button className="form-submit-btn" onClick={onClick} disabled={loading}>
+                {loading ? "Loading..." : "Load more"}
+            </button>
+        </div>
+    );
+}
+
+export default LoadMoreButton;
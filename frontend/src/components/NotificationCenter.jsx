@@ -1,7 +1,8 @@
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef } from "react";
 import { useUserRole } from "../hooks/useUserRole";
 import { useAutomation } from "../context/AutomationContext"; // Import the automation context
 import api from "../lib/axios";
+import { streamNotifications } from "../lib/notificationStream";
 
 function NotificationCenter() {
     const [notifications, setNotifications] = useState([]);
@@ -9,13 +10,55 @@ function NotificationCenter() {
     const [unreadCount, setUnreadCount] = useState(0);
     const { isPremium } = useUserRole();
     const { startAutomation, updateAutomation, endAutomation } = useAutomation(); // Get automation functions
+    const streaming = useRef(false);
     
     useEffect(() => {
-        fetchNotifications();
-        // Poll for new notifications every 30 seconds
-        const interval = setInterval(fetchNotifications, 30000);
-        return () => clearInterval(interval);
+        // New notifications are pushed over the stream; polling only runs while it is down
+        const controller = new AbortController();
+        let retryTimer;
+        const connect = async () => {
+            try {
+                const stream = streamNotifications(handleNewNotification, controller.signal);
+                streaming.current = true;
+                fetchNotifications();
+                await stream;
+            } catch (error) {
+                if (controller.signal.aborted) return;
+                console.error("Notification stream disconnected:", error);
+            }
+            streaming.current = false;
+            if (!controller.signal.aborted) retryTimer = setTimeout(connect, 5000);
+        };
+        connect();
+
+        const interval = setInterval(() => {
+            if (!streaming.current) fetchNotifications();
+        }, 30000);
+        return () => {
+            controller.abort();
+            clearTimeout(retryTimer);
+            clearInterval(interval);
+        };
     }, []);
+
+    const applyAutomationUpdate = (notification) => {
+        if (notification.type === 'success') {
+            endAutomation('success', notification.message);
+        } else if (notification.type === 'error') {
+            endAutomation('error', notification.message);
+        } else {
+            // It's a running process
+            updateAutomation(notification.message);
+        }
+    };
+
+    const handleNewNotification = (notification) => {
+        setNotifications(prev => [notification, ...prev.filter(n => n.id !== notification.id)]);
+        setUnreadCount(prev => prev + 1);
+        if (notification.related_id) {
+            applyAutomationUpdate(notification);
+        }
+    };
     
     const fetchNotifications = async () => {
         try {
@@ -30,14 +73,7 @@ function NotificationCenter() {
                 .sort((a, b) => new Date(b.created_at) - new Date(a.created_at))[0];
 
             if (latestAutomationNotification) {
-                if (latestAutomationNotification.type === 'success') {
-                    endAutomation('success', latestAutomationNotification.message);
-                } else if (latestAutomationNotification.type === 'error') {
-                    endAutomation('error', latestAutomationNotification.message);
-                } else {
-                    // It's a running process
-                    updateAutomation(latestAutomationNotification.message);
-                }
+                applyAutomationUpdate(latestAutomationNotification);
             }
 
         } catch (error) {
@@ -7,7 +7,12 @@ const api = axios.create({
     },
 });
 
+let authTokenGetter = null;
+
+export const getAuthToken = async () => (authTokenGetter ? authTokenGetter() : null);
+
 export const setupAxiosInterceptors = (getAuthToken) => {
+    authTokenGetter = getAuthToken;
     api.interceptors.request.use(
         async (config) => {
             try {
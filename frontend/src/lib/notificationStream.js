@@ -0,0 +1,28 @@
+import api, { getAuthToken } from "./axios";
+
+// Reads the /notifications/stream Server-Sent Events with fetch, because
+// EventSource cannot send the Authorization header.
+export const streamNotifications = async (onNotification, signal) => {
+    const token = await getAuthToken();
+    const res = await fetch(`${api.defaults.baseURL}/notifications/stream`, {
+        headers: token ? { Authorization: `Bearer ${token}` } : {},
+        signal,
+    });
+    if (!res.ok || !res.body) {
+        throw new Error(`Notification stream failed with status ${res.status}`);
+    }
+
+    const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+    let buffer = "";
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) return;
+        buffer += value;
+        const events = buffer.split("\n\n");
+        buffer = events.pop();
+        for (const event of events) {
+            const data = event.split("\n").filter(line => line.startsWith("data: ")).map(line => line.slice(6)).join("\n");
+            if (data) onNotification(JSON.parse(data));
+        }
+    }
+};
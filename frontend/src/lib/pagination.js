@@ -0,0 +1,8 @@
+import api from "./axios";
+
+// List endpoints return one page (newest first). The cursor of the next page,
+// if there is one, comes in the X-Next-Cursor header; pass it back as `after`.
+export const fetchPage = async (path, after = null) => {
+    const response = await api.get(path, { params: after ? { after } : {} });
+    return { items: response.data, nextCursor: response.headers["x-next-cursor"] || null };
+};
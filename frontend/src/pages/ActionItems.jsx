@@ -1,5 +1,7 @@
 import { useState, useEffect } from "react";
 import api from "../lib/axios";
+import { fetchPage } from "../lib/pagination";
+import LoadMoreButton from "../components/LoadMoreButton";
 // --- NEW: Import hooks and icons ---
 import { Link, useNavigate } from "react-router-dom";
 import { useUserRole } from "../hooks/useUserRole";
@@ -13,6 +15,8 @@ function ActionItems() {
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState(null);
     const [filter, setFilter] = useState("all"); // all, pending, completed
+    const [nextCursor, setNextCursor] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
     // --- NEW: Get user tier and navigation function ---
     const { isPremium } = useUserRole();
     const navigate = useNavigate();
@@ -21,23 +25,21 @@ function ActionItems() {
         fetchActionItems();
     }, []);
 
+    const formatItems = (data) => data.map((item) => ({
+        id: item._id,
+        task: item.task || item.action,
+        owner: item.owner || item.assignee,
+        deadline: item.deadline || item.due_date || "TBD",
+        status: item.status || "pending",
+        minutes_id: item.minutes_id || null,
+    }));
+
     const fetchActionItems = async () => {
         try {
             setLoading(true);
-            const response = await api.get("/action-items");
-            const data = response.data;
-
-            if (data) {
-                const formattedItems = data.map((item) => ({
-                    id: item._id,
-                    task: item.task || item.action,
-                    owner: item.owner || item.assignee,
-                    deadline: item.deadline || item.due_date || "TBD",
-                    status: item.status || "pending",
-                    minutes_id: item.minutes_id || null,
-                }));
-                setActionItems(formattedItems);
-            }
+            const page = await fetchPage("/action-items");
+            setActionItems(formatItems(page.items || []));
+            setNextCursor(page.nextCursor);
         } catch (error) {
             console.error("Error fetching action items:", error);
             setError("Failed to load action items");
@@ -46,6 +48,20 @@ function ActionItems() {
         }
     };
 
+    const loadMoreActionItems = async () => {
+        try {
+            setLoadingMore(true);
+            const page = await fetchPage("/action-items", nextCursor);
+            setActionItems(items => [...items, ...formatItems(page.items || [])]);
+            setNextCursor(page.nextCursor);
+        } catch (error) {
+            console.error("Error fetching more action items:", error);
+            setError("Failed to load action items");
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     const handleStatusChange = async (id, newStatus) => {
         try {
             await api.patch(`/action-items/${id}`, { status: newStatus });
@@ -251,6 +267,8 @@ function ActionItems() {
                     <p>Action items will appear here after processing a meeting</p>
                 </div>
             )}
+
+            <LoadMoreButton nextCursor={nextCursor} loading={loadingMore} onClick={loadMoreActionItems} />
         </div>
     );
 }
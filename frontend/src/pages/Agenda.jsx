@@ -1,7 +1,9 @@
 import { useState, useEffect } from "react";
 import { useLocation } from "react-router-dom";
 import api from "../lib/axios";
+import { fetchPage } from "../lib/pagination";
 import AgendaForm from "../components/AgendaForm";
+import LoadMoreButton from "../components/LoadMoreButton";
 
 function Agenda() {
   const [agendas, setAgendas] = useState([]);
@@ -9,13 +11,16 @@ function Agenda() {
   const [message, setMessage] = useState("");
   const [editAgenda, setEditAgenda] = useState(null);
   const [isCreateModalOpen, setIsCreateModalOpen] = useState(false);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const location = useLocation();
 
   const fetchAgendas = async () => {
     try {
       setLoading(true);
-      const response = await api.get("/agendas");
-      setAgendas(response.data);
+      const page = await fetchPage("/agendas");
+      setAgendas(page.items);
+      setNextCursor(page.nextCursor);
     } catch (error) {
       console.error("Failed to fetch agendas", error);
       setMessage("Failed to load agendas.");
@@ -24,6 +29,20 @@ function Agenda() {
     }
   };
 
+  const loadMoreAgendas = async () => {
+    try {
+      setLoadingMore(true);
+      const page = await fetchPage("/agendas", nextCursor);
+      setAgendas(current => [...current, ...page.items]);
+      setNextCursor(page.nextCursor);
+    } catch (error) {
+      console.error("Failed to fetch more agendas", error);
+      setMessage("Failed to load more agendas.");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     fetchAgendas();
     // Check for state passed from dashboard to open the modal automatically
@@ -189,6 +208,8 @@ function Agenda() {
         </div>
       )}
 
+      <LoadMoreButton nextCursor={nextCursor} loading={loadingMore} onClick={loadMoreAgendas} />
+
       {/* Create Modal */}
       {isCreateModalOpen && (
         <div className="modal-overlay">
@@ -52,11 +52,15 @@ function Calendar() {
     const { isPremium } = useUserRole();
     const navigate = useNavigate();
 
+    // Fetch only the visible month (plus the overflow weeks); the backend answers
+    // unchanged ranges with 304 via ETag, so revisiting a month is cheap.
+    const rangeStart = moment(date).startOf("month").subtract(7, "days").format("YYYY-MM-DD");
+    const rangeEnd = moment(date).endOf("month").add(8, "days").format("YYYY-MM-DD");
+
     useEffect(() => {
         const fetchEvents = async () => {
             try {
-                setLoading(true);
-                const response = await api.get("/events");
+                const response = await api.get("/events", { params: { start: rangeStart, end: rangeEnd } });
                 const formattedEvents = response.data.map((event) => ({
                     ...event,
                     start: new Date(event.start),
@@ -70,7 +74,7 @@ function Calendar() {
             }
         };
         fetchEvents();
-    }, []);
+    }, [rangeStart, rangeEnd]);
 
     // 2. Add a handler for when the user navigates months
     const handleNavigate = (newDate) => {
@@ -10,6 +10,7 @@ function Dashboard() {
     const [isModalOpen, setIsModalOpen] = useState(false);
     const [recentMinutes, setRecentMinutes] = useState([]);
     const [upcomingActions, setUpcomingActions] = useState([]);
+    const [pendingActionCount, setPendingActionCount] = useState(0);
     const [agendaCount, setAgendaCount] = useState(0);
     const [loading, setLoading] = useState(true);
     const [autoMode, setAutoMode] = useState(false);
@@ -22,26 +23,13 @@ function Dashboard() {
             try {
                 setLoading(true);
                 
-                // Get recent minutes
-                const minutesRes = await api.get("/minutes");
-                // Sort by date and take the first 3
-                const sortedMinutes = minutesRes.data
-                    .sort((a, b) => new Date(b.created_at) - new Date(a.created_at))
-                    .slice(0, 3);
-                setRecentMinutes(sortedMinutes);
-                
-                // Get upcoming action items
-                const actionsRes = await api.get("/action-items");
-                // Filter to only pending items and sort by deadline
-                const pendingActions = actionsRes.data
-                    .filter(item => item.status !== "completed")
-                    .sort((a, b) => new Date(a.deadline) - new Date(b.deadline))
-                    .slice(0, 5);
-                setUpcomingActions(pendingActions);
-                
-                // Get agenda count
-                const agendasRes = await api.get("/agendas");
-                setAgendaCount(agendasRes.data.length);
+                // Recent minutes, upcoming action items and counts, computed over
+                // everything the user has (the list endpoints only return one page)
+                const summaryRes = await api.get("/dashboard/summary");
+                setRecentMinutes(summaryRes.data.recent_minutes);
+                setUpcomingActions(summaryRes.data.upcoming_actions);
+                setPendingActionCount(summaryRes.data.pending_action_count);
+                setAgendaCount(summaryRes.data.agenda_count);
                 
                 // Get automation quota for free users
                 if (!isPremium) {
@@ -107,7 +95,7 @@ function Dashboard() {
                     <div className="stat-label">Recent Minutes</div>
                 </div>
                 <div className="stat-card">
-                    <div className="stat-number">{upcomingActions.length}</div>
+                    <div className="stat-number">{pendingActionCount}</div>
                     <div className="stat-label">Pending Actions</div>
                 </div>
                 <div className="stat-card">
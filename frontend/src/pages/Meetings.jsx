@@ -1,5 +1,7 @@
 import { useState, useEffect } from "react";
 import api from "../lib/axios";
+import { fetchPage } from "../lib/pagination";
+import LoadMoreButton from "../components/LoadMoreButton";
 import { useUserRole } from "../hooks/useUserRole";
 import ProcessingModeToggle from "../components/ProcessingModeToggle";
 
@@ -15,13 +17,16 @@ function Meetings() {
     const { isPremium } = useUserRole();
     const [autoMode, setAutoMode] = useState(false);
     const [automationQuota, setAutomationQuota] = useState(5);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
 
     useEffect(() => {
         async function fetchPageData() {
             try {
                 setLoading(true);
-                const meetingsRes = await api.get("/meetings");
-                setMeetings(meetingsRes.data);
+                const page = await fetchPage("/meetings");
+                setMeetings(page.items);
+                setNextCursor(page.nextCursor);
 
                 if (!isPremium) {
                     const quotaRes = await api.get("/user/automation-quota");
@@ -36,6 +41,19 @@ function Meetings() {
         fetchPageData();
     }, [isPremium]);
 
+    const loadMoreMeetings = async () => {
+        try {
+            setLoadingMore(true);
+            const page = await fetchPage("/meetings", nextCursor);
+            setMeetings(current => [...current, ...page.items]);
+            setNextCursor(page.nextCursor);
+        } catch (error) {
+            setMessage("Failed to load more meetings.");
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     const handleStatusChange = async (meeting, status) => {
         console.log(`[DEBUG] Changing status for meeting ${meeting._id} to ${status}`);
         try {
@@ -156,6 +174,8 @@ function Meetings() {
                 <p>No meetings scheduled.</p>
             )}
 
+            <LoadMoreButton nextCursor={nextCursor} loading={loadingMore} onClick={loadMoreMeetings} />
+
             {/* Transcribe Modal */}
             {showTranscribeModal && (
                 <div className="modal-overlay">
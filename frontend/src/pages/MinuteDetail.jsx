@@ -64,7 +64,7 @@ function MinuteDetail() {
         setMessage("Generating and scheduling action items... This may take a moment.");
         try {
             const response = await api.post("/generate-action-items", { minutes_id: id });
-            const newActionItems = response.data;
+            const newActionItems = response.data.action_items || [];
 
             // Update the minute state with the new action items to display them immediately
             setMinute(prevMinute => ({
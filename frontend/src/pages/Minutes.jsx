@@ -1,20 +1,23 @@
 import { useState, useEffect } from "react";
 import { Link } from "react-router-dom";
-import api from "../lib/axios";
+import { fetchPage } from "../lib/pagination";
+import LoadMoreButton from "../components/LoadMoreButton";
 import { formatDistanceToNow } from "date-fns";
 
 function MinutesList() {
     const [minutes, setMinutes] = useState([]);
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState(null);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
 
     const fetchMinutes = async () => {
         try {
             setLoading(true);
-            const response = await api.get("/minutes");
-            // Sort by most recent first
-            const sortedMinutes = response.data.sort((a, b) => new Date(b.created_at) - new Date(a.created_at));
-            setMinutes(sortedMinutes);
+            // Pages come most recent first
+            const page = await fetchPage("/minutes");
+            setMinutes(page.items);
+            setNextCursor(page.nextCursor);
             setError(null);
         } catch (error) {
             console.error("Failed to fetch minutes", error);
@@ -24,6 +27,20 @@ function MinutesList() {
         }
     };
 
+    const loadMoreMinutes = async () => {
+        try {
+            setLoadingMore(true);
+            const page = await fetchPage("/minutes", nextCursor);
+            setMinutes(current => [...current, ...page.items]);
+            setNextCursor(page.nextCursor);
+        } catch (error) {
+            console.error("Failed to fetch more minutes", error);
+            setError("Could not load more minutes. Please try again later.");
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     useEffect(() => {
         fetchMinutes();
 
@@ -82,6 +99,8 @@ function MinutesList() {
                     <p>Go to the Dashboard or Transcripts page to analyze a meeting.</p>
                 </div>
             )}
+
+            <LoadMoreButton nextCursor={nextCursor} loading={loadingMore} onClick={loadMoreMinutes} />
         </div>
     );
 }
@@ -1,6 +1,8 @@
 import { useState, useEffect } from "react";
 import { useNavigate } from "react-router-dom"; // Import useNavigate
 import api from "../lib/axios";
+import { fetchPage } from "../lib/pagination";
+import LoadMoreButton from "../components/LoadMoreButton";
 import { formatDistanceToNow } from "date-fns";
 import { useUserRole } from "../hooks/useUserRole";
 import ProcessingModeToggle from "../components/ProcessingModeToggle";
@@ -12,14 +14,17 @@ function Transcripts() {
     const { isPremium } = useUserRole();
     const [autoMode, setAutoMode] = useState(false);
     const [automationQuota, setAutomationQuota] = useState(5);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
     const navigate = useNavigate(); // Initialize navigate
 
     useEffect(() => {
         async function fetchPageData() {
             try {
                 setLoading(true);
-                const transcriptsRes = await api.get("/transcripts");
-                setTranscripts(transcriptsRes.data);
+                const page = await fetchPage("/transcripts");
+                setTranscripts(page.items);
+                setNextCursor(page.nextCursor);
 
                 if (!isPremium) {
                     const quotaRes = await api.get("/user/automation-quota");
@@ -34,13 +39,48 @@ function Transcripts() {
         fetchPageData();
     }, [isPremium]);
 
+    const loadMoreTranscripts = async () => {
+        try {
+            setLoadingMore(true);
+            const page = await fetchPage("/transcripts", nextCursor);
+            setTranscripts(current => [...current, ...page.items]);
+            setNextCursor(page.nextCursor);
+        } catch (error) {
+            setMessage("Failed to load more transcripts.");
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
+    // The list only carries a preview; fetch the full text when it is needed
+    const fetchTranscriptText = async (transcriptId) => {
+        const response = await api.get(`/transcripts/${transcriptId}`);
+        return response.data.transcript;
+    };
+
+    const handleDownloadTranscript = async (transcript) => {
+        try {
+            const text = await fetchTranscriptText(transcript._id);
+            const blob = new Blob([text], { type: "text/plain" });
+            const url = URL.createObjectURL(blob);
+            const a = document.createElement("a");
+            a.href = url;
+            a.download = `${transcript.meeting_name || "transcript"}.txt`;
+            a.click();
+            URL.revokeObjectURL(url);
+        } catch (error) {
+            const errorDetail = error.response?.data?.detail || "An unknown error occurred.";
+            setMessage(`❌ Error: ${errorDetail}`);
+        }
+    };
+
     const handleGenerateMinutes = async (transcript) => {
         setMessage(`Processing minutes for ${transcript.meeting_name}...`);
         try {
             if (autoMode) {
                 // --- AUTOMATED FLOW ---
                 await api.post("/process-automated", { 
-                    transcript_text: transcript.transcript,
+                    transcript_text: await fetchTranscriptText(transcript._id),
                     meeting_id: transcript.meeting_id 
                 });
                 setMessage("✅ Automation started! You'll get a notification when it's done.");
@@ -125,7 +165,7 @@ function Transcripts() {
                                 </div>
                                 
                                 <div className="transcript-preview">
-                                    {formatTranscriptPreview(transcript.transcript)}
+                                    {formatTranscriptPreview(transcript.transcript_preview)}
                                 </div>
                                 
                                 <div className="card-actions">
@@ -136,15 +176,7 @@ function Transcripts() {
                                         {autoMode ? "🚀 Start Automation" : "Generate Minutes"}
                                     </button>
                                     <button
-                                        onClick={() => {
-                                            const blob = new Blob([transcript.transcript], { type: "text/plain" });
-                                            const url = URL.createObjectURL(blob);
-                                            const a = document.createElement("a");
-                                            a.href = url;
-                                            a.download = `${transcript.meeting_name || "transcript"}.txt`;
-                                            a.click();
-                                            URL.revokeObjectURL(url);
-                                        }}
+                                        onClick={() => handleDownloadTranscript(transcript)}
                                         className="form-submit-btn"
                                         style={{ marginLeft: "8px" }}
                                     >
@@ -169,6 +201,8 @@ function Transcripts() {
                     <p>Upload a meeting recording from the dashboard to get started</p>
                 </div>
             )}
+
+            <LoadMoreButton nextCursor={nextCursor} loading={loadingMore} onClick={loadMoreTranscripts} />
         </div>
     );
 }